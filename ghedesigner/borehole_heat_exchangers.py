@@ -512,3 +512,35 @@ def get_bhe_object(
         return CoaxialPipe(m_flow_borehole, fluid, _borehole, pipe, grout, soil)
     else:
         raise TypeError("BHE type not implemented")
+
+
+def _freeze(value):
+    # lists of pipe positions, radii, etc. become hashable tuples
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def borehole_model_key(
+    bhe_type: BHPipeType,
+    m_flow_borehole: float,
+    fluid: GHEFluid,
+    _borehole: GHEBorehole,
+    pipe: Pipe,
+    grout: Grout,
+    soil: Soil,
+) -> tuple:
+    """
+    Returns a hashable key describing every input of a borehole heat exchanger model, i.e. the
+    arguments of get_bhe_object. Models with equal keys have identical equivalent single U-tubes
+    and short time step responses.
+    """
+    return (
+        bhe_type,
+        m_flow_borehole,
+        (fluid.fluid_type, fluid.concentration_percent, fluid.temperature),
+        (_borehole.H, _borehole.D, _borehole.r_b, _borehole.tilt, _borehole.orientation),
+        _freeze([pipe.pos, pipe.r_in, pipe.r_out, pipe.s, pipe.roughness, pipe.k, pipe.rhoCp]),
+        (grout.k, grout.rhoCp),
+        (soil.k, soil.rhoCp, soil.ugt),
+    )
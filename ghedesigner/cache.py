@@ -0,0 +1,321 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, suppress
+from json import JSONDecodeError, dumps, loads
+from pathlib import Path
+from sys import exit
+from tempfile import NamedTemporaryFile
+
+import click
+import numpy as np
+
+from ghedesigner import VERSION
+
+# Bump this whenever the layout or meaning of a stored entry changes; entries written under
+# a different format version are never read back.
+CACHE_FORMAT_VERSION = 1
+
+CACHE_DIR_ENV_VAR = "GHEDESIGNER_CACHE_DIR"
+CACHE_MAX_SIZE_ENV_VAR = "GHEDESIGNER_CACHE_MAX_MB"
+DEFAULT_MAX_SIZE_MB = 512.0
+
+ENTRY_SUFFIX = ".json"
+LOCK_FILE_NAME = ".lock"
+SIZE_INDEX_FILE_NAME = ".size"
+BYTES_IN_MB = 1024 * 1024
+# Eviction on put frees space down to this fraction of the cap, so the puts that follow do not each scan the cache
+EVICTION_TARGET_FRACTION = 0.9
+
+
+def _json_default(obj):
+    # numpy scalars and arrays show up in coordinates and pipe definitions
+    if isinstance(obj, (np.ndarray, np.generic)):
+        return obj.tolist()
+    if hasattr(obj, "name"):  # enums
+        return obj.name
+    raise TypeError(f"Object of type {type(obj).__name__} cannot be used in a cache key")
+
+
+def default_cache_directory() -> Path:
+    env_dir = os.environ.get(CACHE_DIR_ENV_VAR)
+    if env_dir:
+        return Path(env_dir).expanduser()
+    if sys.platform == "win32":
+        base_dir = Path(os.environ.get("LOCALAPPDATA", Path.home() / "AppData" / "Local"))
+    else:
+        base_dir = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
+    return base_dir / "ghedesigner"
+
+
+def default_max_size_mb() -> float:
+    env_size = os.environ.get(CACHE_MAX_SIZE_ENV_VAR)
+    if env_size:
+        return float(env_size)
+    return DEFAULT_MAX_SIZE_MB
+
+
+@contextmanager
+def _locked(lock_path: Path):
+    # Advisory inter-process lock guarding writes and evictions. Readers do not take the lock
+    # since entries are only ever published through an atomic rename.
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, "a+b") as f:
+        if sys.platform == "win32":
+            import msvcrt
+
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class DiskCache:
+    """
+    Content-addressed, versioned on-disk cache.
+
+    Entries are JSON documents stored under ``<directory>/<namespace>/<key[:2]>/<key>.json``, where the
+    key is the SHA-256 digest of the (namespace, payload) pair together with the cache format and
+    GHEDesigner versions. Reading an entry refreshes its modification time, so eviction by oldest
+    modification time gives least-recently-used behavior once the total size exceeds the cap.
+
+    The total size is kept in a small index file, so a put only scans the cache directory when the total
+    goes over the cap, or when the index is missing.
+    """
+
+    def __init__(self, directory: Path | str, max_size_mb: float | None = None):
+        self.directory = Path(directory).expanduser()
+        if max_size_mb is None:
+            max_size_mb = default_max_size_mb()
+        self.max_size_bytes = int(max_size_mb * BYTES_IN_MB)
+        self.lock_path = self.directory / LOCK_FILE_NAME
+        self.size_index_path = self.directory / SIZE_INDEX_FILE_NAME
+
+    @staticmethod
+    def make_key(namespace: str, payload) -> str:
+        document = {
+            "cache_format_version": CACHE_FORMAT_VERSION,
+            "ghedesigner_version": VERSION,
+            "namespace": namespace,
+            "payload": payload,
+        }
+        text = dumps(document, sort_keys=True, default=_json_default)
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def entry_path(self, namespace: str, key: str) -> Path:
+        return self.directory / namespace / key[:2] / f"{key}{ENTRY_SUFFIX}"
+
+    def get(self, namespace: str, payload):
+        key = self.make_key(namespace, payload)
+        path = self.entry_path(namespace, key)
+        try:
+            entry = loads(path.read_text())
+        except FileNotFoundError:
+            return None
+        except (JSONDecodeError, UnicodeDecodeError, OSError):
+            # partially written or corrupted entries are treated as a miss and dropped
+            self._remove(path)
+            return None
+
+        if entry.get("cache_format_version") != CACHE_FORMAT_VERSION or entry.get("key") != key:
+            return None
+
+        with suppress(OSError):
+            os.utime(path)
+
+        return entry["value"]
+
+    def put(self, namespace: str, payload, value) -> None:
+        key = self.make_key(namespace, payload)
+        path = self.entry_path(namespace, key)
+        entry = {"cache_format_version": CACHE_FORMAT_VERSION, "key": key, "value": value}
+        text = dumps(entry, default=_json_default)
+
+        with _locked(self.lock_path):
+            total_size = self._read_size_index()
+            if total_size is None:
+                total_size = self.size()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with suppress(FileNotFoundError):
+                total_size -= path.stat().st_size
+            with NamedTemporaryFile("w", dir=path.parent, suffix=".tmp", delete=False) as f:
+                f.write(text)
+                tmp_path = Path(f.name)
+            total_size += tmp_path.stat().st_size
+            os.replace(tmp_path, path)
+            if total_size > self.max_size_bytes:
+                _, total_size = self._evict(int(EVICTION_TARGET_FRACTION * self.max_size_bytes))
+            self._write_size_index(total_size)
+
+    def entries(self, namespace: str | None = None) -> list:
+        """
+        Returns a list of (path, size in bytes, last access time) tuples, oldest first.
+        """
+        root = self.directory if namespace is None else self.directory / namespace
+        if not root.exists():
+            return []
+
+        entries = []
+        for path in root.rglob(f"*{ENTRY_SUFFIX}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+        entries.sort(key=lambda x: x[2])
+        return entries
+
+    def size(self, namespace: str | None = None) -> int:
+        return sum(x[1] for x in self.entries(namespace))
+
+    def prune(self, max_size_mb: float | None = None) -> int:
+        """
+        Evicts least-recently-used entries until the cache fits in max_size_mb (defaults to the
+        configured cap). Returns the number of entries removed.
+        """
+        max_size_bytes = self.max_size_bytes if max_size_mb is None else int(max_size_mb * BYTES_IN_MB)
+        with _locked(self.lock_path):
+            num_removed, total_size = self._evict(max_size_bytes)
+            self._write_size_index(total_size)
+            return num_removed
+
+    def clear(self, namespace: str | None = None) -> int:
+        with _locked(self.lock_path):
+            entries = self.entries(namespace)
+            for path, _, _ in entries:
+                self._remove(path)
+            # entries of other namespaces may be left
+            self._remove(self.size_index_path)
+            return len(entries)
+
+    def _evict(self, max_size_bytes: int) -> tuple:
+        # Returns the number of entries removed and the total size of the remaining ones
+        entries = self.entries()
+        total_size = sum(x[1] for x in entries)
+        num_removed = 0
+        for path, size, _ in entries:
+            if total_size <= max_size_bytes:
+                break
+            self._remove(path)
+            total_size -= size
+            num_removed += 1
+        return num_removed, total_size
+
+    def _read_size_index(self) -> int | None:
+        try:
+            return int(self.size_index_path.read_text())
+        except (FileNotFoundError, ValueError, OSError):
+            return None
+
+    def _write_size_index(self, total_size: int) -> None:
+        self.size_index_path.write_text(str(total_size))
+
+    @staticmethod
+    def _remove(path: Path) -> None:
+        with suppress(FileNotFoundError):
+            path.unlink()
+
+
+_CACHE: DiskCache | None = None
+
+
+def set_cache_directory(directory: Path | str | None, max_size_mb: float | None = None) -> DiskCache | None:
+    """
+    Enables the persistent cache in the given directory, or disables it when directory is None.
+    """
+    global _CACHE  # noqa: PLW0603
+    _CACHE = None if directory is None else DiskCache(directory, max_size_mb)
+    return _CACHE
+
+
+def get_cache() -> DiskCache | None:
+    """
+    Returns the active persistent cache, or None if caching is disabled. The cache is enabled either
+    explicitly through set_cache_directory, or by setting the GHEDESIGNER_CACHE_DIR environment variable.
+    """
+    if _CACHE is not None:
+        return _CACHE
+    if os.environ.get(CACHE_DIR_ENV_VAR):
+        return DiskCache(default_cache_directory())
+    return None
+
+
+def worker_pool(max_workers: int, mp_context=None) -> ProcessPoolExecutor:
+    """
+    Returns a process pool whose workers use the active persistent cache. Workers that are spawned rather than
+    forked do not inherit the set_cache_directory setting, so it is applied again when each worker starts.
+    """
+    cache = get_cache()
+    initargs = (None,) if cache is None else (cache.directory, cache.max_size_bytes / BYTES_IN_MB)
+    return ProcessPoolExecutor(
+        max_workers=max_workers, mp_context=mp_context, initializer=set_cache_directory, initargs=initargs
+    )
+
+
+@click.group(name="GHEDesignerCache")
+@click.version_option(VERSION)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False),
+    default=None,
+    help=f"Cache directory. Defaults to ${CACHE_DIR_ENV_VAR} or the user cache directory.",
+)
+@click.pass_context
+def run_cache_cli(ctx, cache_dir):
+    ctx.obj = DiskCache(cache_dir if cache_dir is not None else default_cache_directory())
+
+
+@run_cache_cli.command(name="info")
+@click.pass_obj
+def _cache_info(cache: DiskCache):
+    """Show the cache location, size and number of entries."""
+    print(f"Cache directory: {cache.directory}")
+    print(f"Size cap: {cache.max_size_bytes / BYTES_IN_MB:0.1f} MB")
+    namespaces = sorted(p.name for p in cache.directory.iterdir() if p.is_dir()) if cache.directory.exists() else []
+    total_entries = 0
+    total_size = 0
+    for namespace in namespaces:
+        entries = cache.entries(namespace)
+        size = sum(x[1] for x in entries)
+        total_entries += len(entries)
+        total_size += size
+        print(f"  {namespace}: {len(entries)} entries, {size / BYTES_IN_MB:0.2f} MB")
+    print(f"Total: {total_entries} entries, {total_size / BYTES_IN_MB:0.2f} MB")
+
+
+@run_cache_cli.command(name="prune")
+@click.option("--max-size-mb", type=float, default=None, help="Target size. Defaults to the configured cap.")
+@click.pass_obj
+def _cache_prune(cache: DiskCache, max_size_mb):
+    """Evict least-recently-used entries until the cache fits the size cap."""
+    if max_size_mb is not None and max_size_mb < 0:
+        raise click.BadParameter("Maximum cache size must be non-negative.", param_hint="--max-size-mb")
+    num_removed = cache.prune(max_size_mb)
+    print(f"Removed {num_removed} entries.")
+
+
+@run_cache_cli.command(name="clear")
+@click.option("--namespace", default=None, help="Only clear entries in this namespace, e.g. 'g_function'.")
+@click.pass_obj
+def _cache_clear(cache: DiskCache, namespace):
+    """Remove all cache entries."""
+    num_removed = cache.clear(namespace)
+    print(f"Removed {num_removed} entries.")
+
+
+if __name__ == "__main__":
+    exit(run_cache_cli())
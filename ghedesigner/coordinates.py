@@ -1,11 +1,25 @@
-from typing import List, Tuple, Union
+import hashlib
+from typing import Union
 
+import numpy as np
 
-def transpose_coordinates(coordinates) -> List[Tuple[float, float]]:
-    coordinates_transposed = []
-    for x, y in coordinates:
-        coordinates_transposed.append((y, x))
-    return coordinates_transposed
+
+def transpose_coordinates(coordinates) -> np.ndarray:
+    """
+    Swaps the x and y coordinates of a borehole field. For an array of coordinates,
+    the result is a view of the same data.
+    """
+    return np.asarray(coordinates, dtype=float).reshape(-1, 2)[:, ::-1]
+
+
+def coordinates_hash(coordinates) -> str:
+    """
+    Returns a digest of the borehole coordinates which, unlike hash(), is the same in every
+    process and session, so it can be used in cache keys.
+    """
+    # adding 0.0 turns -0.0 into 0.0, so that both give the same digest
+    xy = np.ascontiguousarray(np.asarray(coordinates, dtype=float).reshape(-1, 2) + 0.0)
+    return hashlib.sha256(xy.tobytes()).hexdigest()
 
 
 def rectangle(
@@ -14,7 +28,7 @@ def rectangle(
     spacing_x: Union[int, float],
     spacing_y: Union[int, float],
     origin=(0, 0),
-) -> List[Tuple[float, float]]:
+) -> np.ndarray:
     """
     Creates a rectangular borehole field.
 
@@ -31,22 +45,24 @@ def rectangle(
         origin: coordinates for origin at lower-left corner
 
     Returns:
-        list of tuples (x, y) containing borehole coordinates
+        n x 2 array containing the (x, y) borehole coordinates
     """
 
-    r = []
-    x_0 = origin[0]
-    y_0 = origin[1]
-    for i in range(num_bh_x):
-        for j in range(num_bh_y):
-            r.append((x_0 + i * spacing_x, y_0 + j * spacing_y))
+    x = origin[0] + np.arange(num_bh_x) * float(spacing_x)
+    y = origin[1] + np.arange(num_bh_y) * float(spacing_y)
+
+    return np.column_stack((np.repeat(x, len(y)), np.tile(y, len(x))))
 
-    return r
+
+def _row(x, y) -> np.ndarray:
+    # boreholes at the given x and y coordinates, one of which may be a scalar
+    x, y = np.broadcast_arrays(np.asarray(x, dtype=float), np.asarray(y, dtype=float))
+    return np.column_stack((x.ravel(), y.ravel()))
 
 
 def open_rectangle(
     num_bh_x: int, num_bh_y: int, spacing_x: Union[int, float], spacing_y: Union[int, float]
-) -> List[Tuple[float, float]]:
+) -> np.ndarray:
     """
     Creates a rectangular borehole field without center boreholes.
 
@@ -62,18 +78,15 @@ def open_rectangle(
         spacing_y: spacing between borehole rows in y-direction
 
     Returns:
-        list of tuples (x, y) containing borehole coordinates
+        n x 2 array containing the (x, y) borehole coordinates
     """
 
-    open_r = []
     if num_bh_x > 2 and num_bh_y > 2:  # noqa: PLR2004
-        for i in range(num_bh_x):
-            open_r.append((i * spacing_x, 0.0))
-        for j in range(1, num_bh_y - 1):
-            open_r.append((0, j * spacing_y))
-            open_r.append(((num_bh_x - 1) * spacing_x, j * spacing_y))
-        for i in range(num_bh_x):
-            open_r.append((i * spacing_x, (num_bh_y - 1) * spacing_y))
+        x = np.arange(num_bh_x) * float(spacing_x)
+        y = np.arange(1, num_bh_y - 1) * float(spacing_y)
+        # the sides alternate between the left and the right borehole of each row
+        sides = np.column_stack((_row(0.0, y), _row(x[-1], y))).reshape(-1, 2)
+        open_r = np.vstack((_row(x, 0.0), sides, _row(x, (num_bh_y - 1) * float(spacing_y))))
         # nbh = num_bh_y * 2 + (num_bh_x - 2) * 2
     else:
         open_r = rectangle(num_bh_x, num_bh_y, spacing_x, spacing_y)
@@ -82,52 +95,38 @@ def open_rectangle(
     return open_r
 
 
-def c_shape(
-    n_x_1: int, n_y: int, b_x: Union[int, float], b_y: Union[int, float], n_x_2: int
-) -> List[Tuple[float, float]]:
-    c = []
-    for i in range(n_x_1):
-        c.append((i * b_x, 0.0))
+def c_shape(n_x_1: int, n_y: int, b_x: Union[int, float], b_y: Union[int, float], n_x_2: int) -> np.ndarray:
     x_loc = (n_x_1 - 1) * b_x
-    for j in range(1, n_y):
-        c.append((0.0, j * b_y))
-    for j in range(1, n_y):
-        c.append((x_loc, j * b_y))
+    y = np.arange(1, n_y) * float(b_y)
     y_loc = (n_y - 1) * b_y
-    for i in range(1, n_x_2 + 1):
-        c.append((i * b_x, y_loc))
-
-    return c
+    return np.vstack(
+        (
+            _row(np.arange(n_x_1) * float(b_x), 0.0),
+            _row(0.0, y),
+            _row(x_loc, y),
+            _row(np.arange(1, n_x_2 + 1) * float(b_x), y_loc),
+        )
+    )
 
 
-def lop_u(
-    n_x: int, n_y_1: int, b_x: Union[int, float], b_y: Union[int, float], n_y_2: int
-) -> List[Tuple[float, float]]:
-    _lop_u = []
-    for i in range(n_x):
-        _lop_u.append((i * b_x, 0.0))
-    for j in range(1, n_y_1):
-        _lop_u.append((0.0, j * b_y))
+def lop_u(n_x: int, n_y_1: int, b_x: Union[int, float], b_y: Union[int, float], n_y_2: int) -> np.ndarray:
     x_loc = (n_x - 1) * b_x
-    for j in range(1, n_y_2):
-        _lop_u.append((x_loc, j * b_y))
-
-    return _lop_u
-
+    return np.vstack(
+        (
+            _row(np.arange(n_x) * float(b_x), 0.0),
+            _row(0.0, np.arange(1, n_y_1) * float(b_y)),
+            _row(x_loc, np.arange(1, n_y_2) * float(b_y)),
+        )
+    )
 
-def l_shape(n_x: int, n_y: int, b_x: Union[int, float], b_y: Union[int, float]) -> List[Tuple[float, float]]:
-    l_shape_object = []
-    for i in range(n_x):
-        l_shape_object.append((i * b_x, 0.0))
-    for j in range(1, n_y):
-        l_shape_object.append((0.0, j * b_y))
 
-    return l_shape_object
+def l_shape(n_x: int, n_y: int, b_x: Union[int, float], b_y: Union[int, float]) -> np.ndarray:
+    return np.vstack((_row(np.arange(n_x) * float(b_x), 0.0), _row(0.0, np.arange(1, n_y) * float(b_y))))
 
 
 def zoned_rectangle(
     n_x: int, n_y: int, b_x: Union[int, float], b_y: Union[int, float], n_ix: int, n_it: int
-) -> List[Tuple[float, float]]:
+) -> np.ndarray:
     """
     Create a zoned rectangle
 
@@ -145,16 +144,9 @@ def zoned_rectangle(
     if n_it > (n_y - 2):
         raise ValueError("Too many interior y boreholes.")
 
-    # Create a list of (x, y) coordinates
-    zoned = []
-
-    # Boreholes on the perimeter
-    zoned.extend(open_rectangle(n_x, n_y, b_x, b_y))
-
     # Create the interior coordinates
     bix = (n_x - 1) * b_x / (n_ix + 1)
     biy = (n_y - 1) * b_y / (n_it + 1)
 
-    zoned.extend(rectangle(n_ix, n_it, bix, biy, origin=(bix, biy)))
-
-    return zoned
+    # Boreholes on the perimeter, then the interior ones
+    return np.vstack((open_rectangle(n_x, n_y, b_x, b_y), rectangle(n_ix, n_it, bix, biy, origin=(bix, biy))))
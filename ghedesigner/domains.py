@@ -1,7 +1,80 @@
+from collections import OrderedDict
+from collections.abc import Sequence
+from functools import partial
 from math import ceil, floor
 
+import numpy as np
+
 from ghedesigner.coordinates import c_shape, l_shape, lop_u, rectangle, transpose_coordinates, zoned_rectangle
-from ghedesigner.feature_recognition import determine_largest_rectangle, remove_cutout
+from ghedesigner.feature_recognition import cutout_keep_mask, determine_largest_rectangle, remove_cutout
+
+
+class LazyDomain(Sequence):
+    """
+    A domain of borehole fields which builds the coordinates of a field when it is accessed.
+
+    Each field is described by a recipe, the arguments that are passed to builder to create its coordinates.
+    The searches only visit a few fields of a domain, so the most recently accessed fields are kept and the
+    others are never built. Iterating over the domain builds every field without keeping them.
+    """
+
+    def __init__(self, builder, recipes, sizes=None, max_cached_fields=32):
+        self.builder = builder
+        self.recipes = list(recipes)
+        # number of boreholes in each field, if known without building the fields
+        self.sizes = None if sizes is None else list(sizes)
+        self.max_cached_fields = max_cached_fields
+        self._fields = OrderedDict()
+
+    def __len__(self):
+        return len(self.recipes)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.select(range(len(self))[index])
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("LazyDomain index out of range")
+
+        if index in self._fields:
+            self._fields.move_to_end(index)
+            return self._fields[index]
+
+        coordinates = self.builder(*self.recipes[index])
+        self._fields[index] = coordinates
+        if len(self._fields) > self.max_cached_fields:
+            self._fields.popitem(last=False)
+        return coordinates
+
+    def __iter__(self):
+        for recipe in self.recipes:
+            yield self.builder(*recipe)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_fields"] = OrderedDict()
+        return state
+
+    def select(self, indices):
+        """Returns a domain of the fields at the given indices, in that order."""
+        indices = list(indices)
+        sizes = None if self.sizes is None else [self.sizes[i] for i in indices]
+        return LazyDomain(self.builder, [self.recipes[i] for i in indices], sizes, self.max_cached_fields)
+
+
+def build_field(shape, args, transpose=False):
+    coordinates = shape(*args)
+    if transpose:
+        coordinates = transpose_coordinates(coordinates)
+    return coordinates
+
+
+def field_sizes(domain) -> list:
+    """Number of boreholes in each field of a domain, without building the fields of a LazyDomain if possible."""
+    if isinstance(domain, LazyDomain) and domain.sizes is not None:
+        return list(domain.sizes)
+    return [len(coordinates) for coordinates in domain]
 
 
 def square_and_near_square(lower: int, upper: int, b: float):
@@ -11,7 +84,8 @@ def square_and_near_square(lower: int, upper: int, b: float):
         raise ValueError("The lower argument should be less than or equal to" "the upper.")
 
     field_descriptors = []
-    coordinates_domain = []
+    recipes = []
+    sizes = []
     # field_descriptors = ["1X1", "1X2", "1X3"]
     # coordinates_domain = [
     #     [[0, 0]],
@@ -21,12 +95,11 @@ def square_and_near_square(lower: int, upper: int, b: float):
 
     for i in range(lower, upper + 1):
         for j in range(2):
-            coordinates = rectangle(i, i + j, b, b)
-
-            coordinates_domain.append(coordinates)
+            recipes.append((rectangle, (i, i + j, b, b)))
+            sizes.append(i * (i + j))
             field_descriptors.append(f"{i}X{i + j}")
 
-    return coordinates_domain, field_descriptors
+    return LazyDomain(build_field, recipes, sizes), field_descriptors
 
 
 def rectangular(length_x: float, length_y: float, b_min: float, b_max: float, disp: bool = False):
@@ -40,7 +113,8 @@ def rectangular(length_x: float, length_y: float, b_min: float, b_max: float, di
         length_2 = length_x
         transpose = True
 
-    rectangle_domain = []
+    recipes = []
+    sizes = []
     field_descriptors = []
     # find the maximum number of boreholes as a float
     n_1_max = (length_1 / b_min) + 1
@@ -64,34 +138,28 @@ def rectangular(length_x: float, length_y: float, b_min: float, b_max: float, di
 
         if _iter == 0:
             for i in range(1, n_min):
-                r = rectangle(i, 1, b, b)
-                if transpose:
-                    r = transpose_coordinates(r)
-                rectangle_domain.append(r)
+                recipes.append((rectangle, (i, 1, b, b), transpose))
+                sizes.append(i)
                 field_descriptors.append(f"{i}X{1}_B{b:0.2f}")
             for j in range(1, n_2):
-                r = rectangle(n_min, j, b, b)
-                if transpose:
-                    r = transpose_coordinates(r)
-                rectangle_domain.append(r)
+                recipes.append((rectangle, (n_min, j, b, b), transpose))
+                sizes.append(n_min * j)
                 field_descriptors.append(f"{n_min}X{j}_B{b:0.2f}")
 
             _iter += 1
         if n_2_old == n_2:
             pass
         else:
-            r = rectangle(num_borehole, n_2, b, b)
             if disp:
                 print(f"{num_borehole}\t{n_2}\t{b}\t{b}")
-            if transpose:
-                r = transpose_coordinates(r)
-            rectangle_domain.append(r)
+            recipes.append((rectangle, (num_borehole, n_2, b, b), transpose))
+            sizes.append(num_borehole * n_2)
             field_descriptors.append(f"{num_borehole}X{n_2}_B{b:0.2f}")
             n_2_old = n_2
 
         num_borehole += 1  # noqa: PLW2901
 
-    return rectangle_domain, field_descriptors
+    return LazyDomain(build_field, recipes, sizes), field_descriptors
 
 
 def bi_rectangular(length_x, length_y, b_min, b_max_x, b_max_y, transpose=False, disp=False):
@@ -107,7 +175,8 @@ def bi_rectangular(length_x, length_y, b_min, b_max_x, b_max_y, transpose=False,
         b_max_1 = b_max_y
         b_max_2 = b_max_x
 
-    bi_rectangle_domain = []
+    recipes = []
+    sizes = []
     field_descriptors = []
     # find the maximum number of boreholes as a float
     n_1_max = (length_1 / b_min) + 1
@@ -127,16 +196,12 @@ def bi_rectangular(length_x, length_y, b_min, b_max_x, b_max_y, transpose=False,
 
         if _iter == 0:
             for i in range(1, n_1):
-                coordinates = rectangle(i, 1, b_1, b_2)
-                if transpose:
-                    coordinates = transpose_coordinates(coordinates)
-                bi_rectangle_domain.append(coordinates)
+                recipes.append((rectangle, (i, 1, b_1, b_2), transpose))
+                sizes.append(i)
                 field_descriptors.append(f"{i}X{1}_B1{b_1:0.2f}_B2{b_2:0.2f}")
             for j in range(1, n_2):
-                coordinates = rectangle(n_1, j, b_1, b_2)
-                if transpose:
-                    coordinates = transpose_coordinates(coordinates)
-                bi_rectangle_domain.append(coordinates)
+                recipes.append((rectangle, (n_1, j, b_1, b_2), transpose))
+                sizes.append(n_1 * j)
                 field_descriptors.append(f"{n_1}X{j}_B1{b_1:0.2f}_B2{b_2:0.2f}")
 
             _iter += 1
@@ -144,15 +209,13 @@ def bi_rectangular(length_x, length_y, b_min, b_max_x, b_max_y, transpose=False,
         if disp:
             print(f"{n_1}x{n_2} with {b_1:0.1f}x{b_2:0.1f}")
 
-        coordinates = rectangle(n_1, n_2, b_1, b_2)
-        if transpose:
-            coordinates = transpose_coordinates(coordinates)
-        bi_rectangle_domain.append(coordinates)
+        recipes.append((rectangle, (n_1, n_2, b_1, b_2), transpose))
+        sizes.append(n_1 * n_2)
         field_descriptors.append(f"{n_1}X{n_2}_B1{b_1:0.2f}_B2{b_2:0.2f}")
 
         n_1 += 1  # noqa: PLW2901
 
-    return bi_rectangle_domain, field_descriptors
+    return LazyDomain(build_field, recipes, sizes), field_descriptors
 
 
 def bi_rectangle_nested(length_x, length_y, b_min, b_max_x, b_max_y, disp=False):
@@ -211,14 +274,13 @@ def zoned_rectangle_domain(length_x, length_y, n_x, n_y, transpose=False):
     b_1 = length_1 / (n_1 - 1)
     b_2 = length_2 / (n_2 - 1)
 
-    _zoned_rectangle_domain = []
+    recipes = []
     field_descriptors = []
 
     n_i1 = 1
     n_i2 = 1
 
-    z = zoned_rectangle(n_1, n_2, b_1, b_2, n_i1, n_i2)
-    _zoned_rectangle_domain.append(z)
+    recipes.append((zoned_rectangle, (n_1, n_2, b_1, b_2, n_i1, n_i2)))
     field_descriptors.append(f"{n_1}X{n_2}_{n_i1}X{n_i2}_B1{b_1:0.2f}_B2{b_2:0.2f}")
 
     while n_i1 < (n_1 - 2) or n_i2 < (n_2 - 2):
@@ -248,13 +310,10 @@ def zoned_rectangle_domain(length_x, length_y, n_x, n_y, transpose=False):
                 "this point, there may be a problem with the "
                 "inputs."
             )
-        z = zoned_rectangle(n_1, n_2, b_1, b_2, n_i1, n_i2)
-        if transpose:
-            z = transpose_coordinates(z)
-        _zoned_rectangle_domain.append(z)
+        recipes.append((zoned_rectangle, (n_1, n_2, b_1, b_2, n_i1, n_i2), transpose))
         field_descriptors.append(f"{n_1}X{n_2}_{n_i1}X{n_i2}_B1{b_1:0.2f}_B2{b_2:0.2f}")
 
-    return _zoned_rectangle_domain, field_descriptors
+    return LazyDomain(build_field, recipes), field_descriptors
 
 
 def bi_rectangle_zoned_nested(length_x, length_y, b_min, b_max_x, b_max_y):
@@ -304,34 +363,22 @@ def bi_rectangle_zoned_nested(length_x, length_y, b_min, b_max_x, b_max_y):
 
             # go from one borehole to a line
             for index_l in range(1, n_min_1 + 1):
-                r = rectangle(index_l, 1, b_x, b_y)
-                if transpose:
-                    r = transpose_coordinates(r)
-                domain.append(r)
+                domain.append((rectangle, (index_l, 1, b_x, b_y), transpose))
                 f_d.append(f"{index_l}X{1}_{b_x:0.2f}X{b_y:0.2f}")
 
             # go from a line to an L
             for index_l in range(2, n_min_2 + 1):
-                l_shape_object = l_shape(n_min_1, index_l, b_x, b_y)
-                if transpose:
-                    l_shape_object = transpose_coordinates(l_shape_object)
-                domain.append(l_shape_object)
+                domain.append((l_shape, (n_min_1, index_l, b_x, b_y), transpose))
                 f_d.append(f"{n_min_1}X{index_l}_{b_x:0.2f}X{b_y:0.2f}")
 
             # go from an L to a U
             for index_l in range(2, n_min_2 + 1):
-                lop_u_field = lop_u(n_min_1, n_min_2, b_x, b_y, index_l)
-                if transpose:
-                    lop_u_field = transpose_coordinates(lop_u_field)
-                domain.append(lop_u_field)
+                domain.append((lop_u, (n_min_1, n_min_2, b_x, b_y, index_l), transpose))
                 f_d.append(f"{n_min_1}X{n_min_2}_{b_x:0.2f}X{b_y:0.2f}")
 
             # go from a U to an open
             for index_l in range(1, n_min_1 - 1):
-                c = c_shape(n_min_1, n_min_2, b_x, b_y, index_l)
-                if transpose:
-                    c = transpose_coordinates(c)
-                domain.append(c)
+                domain.append((c_shape, (n_min_1, n_min_2, b_x, b_y, index_l), transpose))
                 f_d.append(f"{n_min_1}X{n_min_2}_{b_x:0.2f}X{b_y:0.2f}")
 
             index_l += 1
@@ -340,7 +387,7 @@ def bi_rectangle_zoned_nested(length_x, length_y, b_min, b_max_x, b_max_y):
             bi_rectangle_zoned_domain, f_ds = zoned_rectangle_domain(
                 length_1, length_2, n_1_values[j], n_2_values[k], transpose=transpose
             )
-            domain.extend(bi_rectangle_zoned_domain)
+            domain.extend(bi_rectangle_zoned_domain.recipes)
             f_d.extend(f_ds)
             if j < len(n_1_values) - 1:
                 j += 1
@@ -350,14 +397,14 @@ def bi_rectangle_zoned_nested(length_x, length_y, b_min, b_max_x, b_max_y):
             bi_rectangle_zoned_domain, f_ds = zoned_rectangle_domain(
                 length_1, length_2, n_1_values[j], n_2_values[k], transpose=transpose
             )
-            domain.extend(bi_rectangle_zoned_domain)
+            domain.extend(bi_rectangle_zoned_domain.recipes)
             f_d.extend(f_ds)
             if k < len(n_2_values) - 1:
                 k += 1
             else:
                 j += 1
 
-    bi_rectangle_zoned_nested_domain.append(domain)
+    bi_rectangle_zoned_nested_domain.append(LazyDomain(build_field, domain))
     field_descriptors.append(f_d)
 
     return bi_rectangle_zoned_nested_domain, field_descriptors
@@ -376,44 +423,99 @@ def polygonal_land_constraint(
     width = max(y)
     coordinates_domain_nested, field_descriptors = bi_rectangle_nested(length, width, b_min, b_max_x, b_max_y)
 
-    coordinates_domain_nested_cutout = []
-
-    for domain in coordinates_domain_nested:
-        new_coordinates_domain = []
-        for coordinates in domain:
-            # Remove boreholes outside of property
-            new_coordinates = remove_cutout(
-                coordinates, property_boundary, remove_inside=False, keep_contour=keep_contour[0]
-            )
-            if len(new_coordinates) == 0:
-                continue
-            # Remove boreholes inside of building
-            if len(no_go_boundaries) > 0:
-                new_coordinates = remove_cutout(
-                    new_coordinates, no_go_boundaries, remove_inside=True, keep_contour=keep_contour[1]
-                )
-            if len(new_coordinates) == 0:
-                continue
-            new_coordinates_domain.append(new_coordinates)
-        coordinates_domain_nested_cutout.append(new_coordinates_domain)
-
     coordinates_domain_nested_cutout_reordered = []
     field_descriptors_reordered = []
-    for idx, domain in enumerate(coordinates_domain_nested_cutout):
-        domain_reordered, f_d_reordered = reorder_domain(domain, field_descriptors[idx])
+
+    # The nested domains share most of their grid points, which are classified once. The fields are only
+    # built when they are accessed.
+    cutout_cache = {}
+    build_cutout_field = partial(cutout_field, property_boundary, no_go_boundaries, keep_contour, cache=cutout_cache)
+    for domain, descriptors in zip(coordinates_domain_nested, field_descriptors):
+        sizes = cutout_sizes(domain.recipes, property_boundary, no_go_boundaries, keep_contour, cache=cutout_cache)
+
+        kept = [idx for idx, size in enumerate(sizes) if size > 0]
+        cutout_domain = LazyDomain(
+            build_cutout_field, [domain.recipes[idx] for idx in kept], [sizes[idx] for idx in kept]
+        )
+        domain_reordered, f_d_reordered = reorder_domain(cutout_domain, [descriptors[idx] for idx in kept])
         coordinates_domain_nested_cutout_reordered.append(domain_reordered)
         field_descriptors_reordered.append(f_d_reordered)
 
     return coordinates_domain_nested_cutout_reordered, field_descriptors_reordered
 
 
+def remove_cutouts(coordinates, property_boundary, no_go_boundaries, keep_contour, cache=None):
+    # Remove boreholes outside of property
+    coordinates = remove_cutout(
+        coordinates, property_boundary, remove_inside=False, keep_contour=keep_contour[0], cache=cache
+    )
+    # Remove boreholes inside of building
+    if len(coordinates) > 0 and len(no_go_boundaries) > 0:
+        coordinates = remove_cutout(
+            coordinates, no_go_boundaries, remove_inside=True, keep_contour=keep_contour[1], cache=cache
+        )
+    return coordinates
+
+
+def cutout_keep(coordinates, property_boundary, no_go_boundaries, keep_contour, cache=None) -> np.ndarray:
+    # Whether remove_cutouts keeps each borehole
+    keep = cutout_keep_mask(
+        coordinates, property_boundary, remove_inside=False, keep_contour=keep_contour[0], cache=cache
+    )
+    if len(no_go_boundaries) > 0:
+        keep &= cutout_keep_mask(
+            coordinates, no_go_boundaries, remove_inside=True, keep_contour=keep_contour[1], cache=cache
+        )
+    return keep
+
+
+def cutout_sizes(recipes, property_boundary, no_go_boundaries, keep_contour, cache=None) -> list:
+    """
+    Number of boreholes remove_cutouts keeps in the field of each build_field recipe. The rectangular fields of a
+    spacing are the lower left corners of the largest one, so only that one is built and classified, and the
+    boreholes kept in each corner are read from the running sums of its kept boreholes.
+    """
+    grid_shapes = {}
+    for shape, args, *transpose in recipes:
+        if shape is rectangle and len(args) == 4:  # noqa: PLR2004
+            grid = (*args[2:], *transpose)
+            n_x, n_y = grid_shapes.get(grid, (0, 0))
+            grid_shapes[grid] = (max(n_x, args[0]), max(n_y, args[1]))
+
+    # all grids are classified in one call, which adds their points to the cache at once
+    grids = list(grid_shapes)
+    coordinates = [build_field(rectangle, (*grid_shapes[grid], *grid[:2]), *grid[2:]) for grid in grids]
+    keep = np.empty(0, dtype=bool)
+    if len(coordinates) > 0:
+        keep = cutout_keep(np.concatenate(coordinates), property_boundary, no_go_boundaries, keep_contour, cache=cache)
+    kept_sums = {}
+    for grid, grid_keep in zip(grids, np.split(keep, np.cumsum([len(c) for c in coordinates])[:-1])):
+        kept_sums[grid] = grid_keep.reshape(grid_shapes[grid]).cumsum(axis=0).cumsum(axis=1)
+
+    sizes = []
+    for shape, args, *transpose in recipes:
+        if shape is rectangle and len(args) == 4:  # noqa: PLR2004
+            sizes.append(int(kept_sums[(*args[2:], *transpose)][args[0] - 1, args[1] - 1]))
+        else:
+            coordinates = build_field(shape, args, *transpose)
+            sizes.append(int(cutout_keep(coordinates, property_boundary, no_go_boundaries, keep_contour, cache).sum()))
+    return sizes
+
+
+def cutout_field(property_boundary, no_go_boundaries, keep_contour, shape, args, transpose=False, cache=None):
+    return remove_cutouts(
+        build_field(shape, args, transpose), property_boundary, no_go_boundaries, keep_contour, cache=cache
+    )
+
+
 def reorder_domain(domain, descriptors):
     """
-    Sort domains by length. Rearrange descriptors accordingly.
-    Solution from: https://stackoverflow.com/a/9764364
+    Sort the fields of a domain by their number of boreholes. Rearrange descriptors accordingly.
 
     # TODO: Investigate whether this is needed.
     # TODO: Domains may already be presorted by the nature of the preceding algorithms.
     """
 
-    return zip(*sorted(zip(domain, descriptors), key=lambda x: len(x[0])))
+    sizes = field_sizes(domain)
+    order = sorted(range(len(domain)), key=lambda idx: sizes[idx])
+    return domain.select(order), [descriptors[idx] for idx in order]
@@ -13,7 +13,18 @@ class DoubleUTubeConnType(Enum):
     SERIES = auto()
 
 
+class STSSolverType(Enum):
+    MARCHING = auto()
+    MODAL = auto()
+
+
+class RotationSearchType(Enum):
+    COARSETOFINE = auto()
+    EXHAUSTIVE = auto()
+
+
 class TimestepType(Enum):
+    AGGREGATEDHOURLY = auto()
     HOURLY = auto()
     HYBRID = auto()
 
@@ -1,24 +1,78 @@
-from ghedesigner.shape import point_polygon_check
+from __future__ import annotations
 
+import numpy as np
+
+from ghedesigner.shape import points_polygon_check
+
+# Coordinates are rounded to this many decimals (1 nm) before the remove_cutout cache lookup
+CUTOUT_CACHE_DECIMALS = 9
+
+
+def remove_cutout(
+    coordinates, boundaries, remove_inside=True, keep_contour=True, on_edge_tolerance=0.01, cache: dict | None = None
+):
+    keep = cutout_keep_mask(coordinates, boundaries, remove_inside, keep_contour, on_edge_tolerance, cache=cache)
+
+    if isinstance(coordinates, np.ndarray):
+        return coordinates[keep]
+
+    new_coordinates = [coordinate for coordinate, k in zip(coordinates, keep) if k]
+
+    return new_coordinates
 
-def remove_cutout(coordinates, boundaries, remove_inside=True, keep_contour=True, on_edge_tolerance=0.01):
-    if isinstance(boundaries[0][0], (int, float)):
-        boundaries = [boundaries]
 
-    new_coordinates = []
+def cutout_keep_mask(
+    coordinates, boundaries, remove_inside=True, keep_contour=True, on_edge_tolerance=0.01, cache: dict | None = None
+) -> np.ndarray:
+    """
+    Returns whether remove_cutout keeps each of the coordinates.
+    """
     inside = 1
     on_edge = 0
-    for coordinate in coordinates:
-        boundary_results = []
-        for boundary in boundaries:
-            boundary_results.append(point_polygon_check(boundary, coordinate, on_edge_tolerance=on_edge_tolerance))
-        if remove_inside:
-            if (inside not in boundary_results) and not (on_edge in boundary_results and not keep_contour):
-                new_coordinates.append(coordinate)
-        elif (inside in boundary_results) or (on_edge in boundary_results and keep_contour):
-            new_coordinates.append(coordinate)
+    boundary_results = classify_points(coordinates, boundaries, on_edge_tolerance=on_edge_tolerance, cache=cache)
+    any_inside = np.any(boundary_results == inside, axis=0)
+    any_on_edge = np.any(boundary_results == on_edge, axis=0)
+    if remove_inside:
+        return ~any_inside & ~(any_on_edge & (not keep_contour))
+    return any_inside | (any_on_edge & keep_contour)
 
-    return new_coordinates
+
+def classify_points(coordinates, boundaries, on_edge_tolerance=0.01, cache: dict | None = None):
+    """
+    Classifies the coordinates against each boundary, see points_polygon_check.
+
+    The optional cache maps the boundaries and tolerance to the points classified so far, keyed by the rounded point,
+    so that only points that are not in the cache yet are classified.
+    """
+    if isinstance(boundaries[0][0], (int, float)):
+        boundaries = [boundaries]
+
+    if cache is None:
+        return points_polygon_check(boundaries, coordinates, on_edge_tolerance=on_edge_tolerance)
+
+    boundary_key = (tuple(tuple(map(tuple, boundary)) for boundary in boundaries), on_edge_tolerance)
+    # sorted rounded points (as x + iy, which numpy orders by x then y) and their classifications
+    cached_keys, cached_results = cache.get(boundary_key, (np.empty(0, dtype=complex), np.empty((len(boundaries), 0))))
+
+    points = np.asarray(coordinates, dtype=float).reshape(-1, 2)
+    rounded = np.round(points, CUTOUT_CACHE_DECIMALS)
+    keys = rounded[:, 0] + 1j * rounded[:, 1]
+    idx = np.searchsorted(cached_keys, keys)
+    found = idx < len(cached_keys)
+    found[found] = cached_keys[idx[found]] == keys[found]
+
+    if not np.all(found):
+        missing_keys, first = np.unique(keys[~found], return_index=True)
+        missing_results = points_polygon_check(boundaries, points[~found][first], on_edge_tolerance)
+        cached_keys = np.concatenate((cached_keys, missing_keys))
+        cached_results = np.concatenate((cached_results, missing_results), axis=1)
+        order = np.argsort(cached_keys, kind="stable")
+        cached_keys = cached_keys[order]
+        cached_results = cached_results[:, order].astype(int)
+        cache[boundary_key] = (cached_keys, cached_results)
+        idx = np.searchsorted(cached_keys, keys)
+
+    return cached_results[:, idx]
 
 
 def determine_largest_rectangle(property_boundary):
@@ -1,7 +1,7 @@
 from abc import abstractmethod
 
 from ghedesigner.constants import RAD_TO_DEG
-from ghedesigner.enums import DesignGeomType
+from ghedesigner.enums import DesignGeomType, RotationSearchType
 
 
 class GeometricConstraints:
@@ -146,6 +146,7 @@ class GeometricConstraintsRowWise(GeometricConstraints):
         rotate_step: float,
         property_boundary,
         no_go_boundaries,
+        rotate_search: RotationSearchType = RotationSearchType.EXHAUSTIVE,
     ):
         super().__init__()
         self.perimeter_spacing_ratio = perimeter_spacing_ratio
@@ -155,6 +156,7 @@ class GeometricConstraintsRowWise(GeometricConstraints):
         self.min_rotation = min_rotation
         self.max_rotation = max_rotation
         self.rotate_step = rotate_step
+        self.rotate_search = rotate_search
         self.property_boundary = property_boundary
         self.no_go_boundaries = no_go_boundaries
         self.type = DesignGeomType.ROWWISE
@@ -168,6 +170,7 @@ class GeometricConstraintsRowWise(GeometricConstraints):
             'min_rotation': self.min_rotation * RAD_TO_DEG,
             'max_rotation': self.max_rotation * RAD_TO_DEG,
             'rotate_step': self.rotate_step,
+            'rotate_search': self.rotate_search.name,
             'property_boundary': self.property_boundary,
             'no_go_boundaries': self.no_go_boundaries,
             'method': DesignGeomType.ROWWISE.name,
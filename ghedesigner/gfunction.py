@@ -1,4 +1,6 @@
 import warnings
+from functools import partial
+from importlib.metadata import PackageNotFoundError, version
 from math import log
 
 import numpy as np
@@ -7,8 +9,17 @@ from scipy.interpolate import interp1d, lagrange
 
 from ghedesigner.borehole import GHEBorehole
 from ghedesigner.borehole_heat_exchangers import get_bhe_object
+from ghedesigner.cache import get_cache, worker_pool
+from ghedesigner.coordinates import coordinates_hash
 from ghedesigner.enums import BHPipeType
 
+G_FUNCTION_CACHE_NAMESPACE = "g_function"
+
+try:
+    PYGFUNCTION_VERSION = version("pygfunction")
+except PackageNotFoundError:
+    PYGFUNCTION_VERSION = "unknown"
+
 
 def calculate_g_function(
     m_flow_borehole,
@@ -88,6 +99,93 @@ def calculate_g_function(
     return gfunc
 
 
+def g_function_cache_payload(
+    m_flow_borehole,
+    bhe_type: BHPipeType,
+    log_time,
+    coordinates,
+    borehole,
+    fluid,
+    pipe,
+    grout,
+    soil,
+    n_segments=8,
+    end_length_ratio=0.02,
+    segments="unequal",
+    solver="equivalent",
+    boundary="MIFT",
+    segment_ratios=None,
+) -> dict:
+    """
+    Collects every input that affects the result of calculate_g_function into a
+    JSON-serializable description, used to address the persistent g-function cache.
+    """
+    return {
+        "pygfunction_version": PYGFUNCTION_VERSION,
+        "coordinates": coordinates_hash(coordinates),
+        "borehole": [borehole.H, borehole.D, borehole.r_b, borehole.tilt, borehole.orientation],
+        "log_time": np.asarray(log_time, dtype=float).tolist(),
+        "m_flow_borehole": m_flow_borehole,
+        "bhe_type": bhe_type.name,
+        "fluid": [fluid.fluid_type.name, fluid.concentration_percent, fluid.temperature],
+        "pipe": [pipe.pos, pipe.r_in, pipe.r_out, pipe.s, pipe.roughness, pipe.k, pipe.rhoCp],
+        "grout": [grout.k, grout.rhoCp],
+        "soil": [soil.k, soil.rhoCp],
+        "n_segments": n_segments,
+        "end_length_ratio": end_length_ratio,
+        "segments": segments.lower(),
+        "solver": solver,
+        "boundary": boundary,
+        "segment_ratios": None if segment_ratios is None else np.asarray(segment_ratios, dtype=float).tolist(),
+    }
+
+
+def _g_function_values_for_height(
+    h,
+    depth,
+    r_b,
+    m_flow_borehole,
+    bhe_type: BHPipeType,
+    log_time,
+    coordinates,
+    fluid,
+    pipe,
+    grout,
+    soil,
+    n_segments=8,
+    segments="unequal",
+    solver="equivalent",
+    boundary="MIFT",
+    segment_ratios=None,
+) -> list:
+    # module level so that it can be dispatched to worker processes
+    _borehole = GHEBorehole(h, depth, r_b, 0.0, 0.0)
+
+    alpha = soil.k / soil.rhoCp
+
+    ts = h**2 / (9.0 * alpha)  # Bore field characteristic time
+    time_values = np.exp(log_time) * ts
+
+    gfunc = calculate_g_function(
+        m_flow_borehole,
+        bhe_type,
+        time_values,
+        coordinates,
+        _borehole,
+        fluid,
+        pipe,
+        grout,
+        soil,
+        n_segments=n_segments,
+        segments=segments,
+        solver=solver,
+        boundary=boundary,
+        segment_ratios=segment_ratios,
+    )
+
+    return gfunc.gFunc.tolist()
+
+
 def calc_g_func_for_multiple_lengths(
     b: float,
     h_values: list,
@@ -106,37 +204,71 @@ def calc_g_func_for_multiple_lengths(
     solver="equivalent",
     boundary="MIFT",
     segment_ratios=None,
+    workers=1,
 ):
     d = {"g": {}, "bore_locations": coordinates, "logtime": log_time}
 
-    for h in h_values:
-        _borehole = GHEBorehole(h, depth, r_b, 0.0, 0.0)
-
-        alpha = soil.k / soil.rhoCp
-
-        ts = h**2 / (9.0 * alpha)  # Bore field characteristic time
-        time_values = np.exp(log_time) * ts
-
-        gfunc = calculate_g_function(
-            m_flow_borehole,
-            bhe_type,
-            time_values,
-            coordinates,
-            _borehole,
-            fluid,
-            pipe,
-            grout,
-            soil,
-            n_segments=n_segments,
-            segments=segments,
-            solver=solver,
-            boundary=boundary,
-            segment_ratios=segment_ratios,
-        )
+    # previously computed g-functions are reused from the persistent cache, when enabled
+    cache = get_cache()
+    cache_payloads = {}
+    g_values = {}
+
+    if cache is not None:
+        for h in h_values:
+            cache_payloads[h] = g_function_cache_payload(
+                m_flow_borehole,
+                bhe_type,
+                log_time,
+                coordinates,
+                GHEBorehole(h, depth, r_b, 0.0, 0.0),
+                fluid,
+                pipe,
+                grout,
+                soil,
+                n_segments=n_segments,
+                segments=segments,
+                solver=solver,
+                boundary=boundary,
+                segment_ratios=segment_ratios,
+            )
+            g_cached = cache.get(G_FUNCTION_CACHE_NAMESPACE, cache_payloads[h])
+            if g_cached is not None:
+                g_values[h] = g_cached
+
+    # the heights are independent of each other, so they can be computed concurrently
+    h_to_compute = list(dict.fromkeys(h for h in h_values if h not in g_values))
+    compute = partial(
+        _g_function_values_for_height,
+        depth=depth,
+        r_b=r_b,
+        m_flow_borehole=m_flow_borehole,
+        bhe_type=bhe_type,
+        log_time=log_time,
+        coordinates=coordinates,
+        fluid=fluid,
+        pipe=pipe,
+        grout=grout,
+        soil=soil,
+        n_segments=n_segments,
+        segments=segments,
+        solver=solver,
+        boundary=boundary,
+        segment_ratios=segment_ratios,
+    )
+    if workers > 1 and len(h_to_compute) > 1:
+        with worker_pool(min(workers, len(h_to_compute))) as executor:
+            computed = list(executor.map(compute, h_to_compute))
+    else:
+        computed = [compute(h) for h in h_to_compute]
 
-        key = f"{b}_{h}_{r_b}_{d}"
+    for h, g in zip(h_to_compute, computed):
+        g_values[h] = g
+        if cache is not None:
+            cache.put(G_FUNCTION_CACHE_NAMESPACE, cache_payloads[h], g)
 
-        d["g"][key] = gfunc.gFunc.tolist()
+    for h in h_values:
+        key = f"{b}_{h}_{r_b}_{depth}"
+        d["g"][key] = g_values[h]
 
     geothermal_g_input = GFunction.configure_database_file_for_usage(d)
     # Initialize the gFunction object
@@ -159,34 +291,39 @@ class GFunction:
         # r_b (borehole radius) value keyed by height
         self.r_b_values: dict = r_b_values
         self.D_values: dict = d_values  # D (burial depth) value keyed by height
-        self.g_lts: dict = g_lts  # g-functions (LTS) keyed by height
+        # heights at which the g-functions (LTS) are known
+        self.heights: np.ndarray = np.array([float(h) for h in g_lts], dtype=float)
+        # g-functions (LTS), one row per height and one column per ln(t/ts) value
+        self.g_lts: np.ndarray = np.array([g_lts[h] for h in g_lts], dtype=float)
         # ln(t/ts) values that apply to all the heights
         self.log_time: list = log_time
         # (x, y) coordinates of boreholes
         self.bore_locations: list = bore_locations
         # self.time: dict = {}  # the time values in years
 
-        # an interpolation table for B/H ratios, D, r_b (used in the method
-        # g_function_interpolation)
+        # interpolants for the g-function, D and r_b by height, keyed by the
+        # interpolation kind and fill mode (used in the method g_function_interpolation)
         self.interpolation_table: dict = {}
 
     def g_function_interpolation(self, b_over_h: float, kind="default"):
-        # the g-functions are stored in a dictionary based on heights, so an
+        # the g-functions are stored in an array by heights, so an
         # equivalent height can be found
         h_eq = 1 / b_over_h * self.B
 
         tolerance = 0.001
 
         # Determine if we are out of range and need to extrapolate
-        height_values = list(self.g_lts.keys())
+        height_values = self.heights
+        min_height = height_values[0]
+        max_height = height_values[-1]
         # If we are close to the outer bounds, then set H_eq as outer bounds
         close_tolerance = 1.0e-6
-        if abs(h_eq - max(height_values)) < close_tolerance:
-            h_eq = max(height_values)
-        if abs(h_eq - min(height_values)) < close_tolerance:
-            h_eq = min(height_values)
+        if abs(h_eq - max_height) < close_tolerance:
+            h_eq = max_height
+        if abs(h_eq - min_height) < close_tolerance:
+            h_eq = min_height
 
-        if min(height_values) <= h_eq <= max(height_values) or abs(min(height_values) - h_eq) < tolerance:
+        if min_height <= h_eq <= max_height or abs(min_height - h_eq) < tolerance:
             fill_value = ""
         else:
             fill_value = "extrapolate"
@@ -203,10 +340,10 @@ class GFunction:
                 kind = "quadratic"
             elif num_curves == 2:  # noqa: PLR2004
                 kind = "linear"
-            elif (h_eq - height_values[0]) / height_values[0] < tolerance or min(height_values) - h_eq < tolerance:
-                g_function = self.g_lts[height_values[0]]
-                rb = self.r_b_values[height_values[0]]
-                d = self.D_values[height_values[0]]
+            elif (h_eq - height_values[0]) / height_values[0] < tolerance or min_height - h_eq < tolerance:
+                g_function = self.g_lts[0]
+                rb = self.r_b_values[next(iter(self.r_b_values))]
+                d = self.D_values[next(iter(self.D_values))]
                 return g_function, rb, d, h_eq
             else:
                 raise ValueError(
@@ -226,63 +363,74 @@ class GFunction:
             if required_curves > len(height_values):
                 kind = curves_by_kind[len(height_values)]
 
-        # if the interpolation table is not yet know, build it
-        if len(self.interpolation_table) == 0:
-            # create an interpolation for the g-function which takes the height
-            # (or equivalent height) as an input the g-function needs to be
-            # interpolated at each point in dimensionless time
-            self.interpolation_table["g"] = []
-            for i, _ in enumerate(self.log_time):
-                x = []
-                y = []
-                for key in self.g_lts:
-                    height_value = float(key)
-                    g_value = self.g_lts[key][i]
-                    x.append(height_value)
-                    y.append(g_value)
-                f = lagrange(x, y) if kind == "lagrange" else interp1d(x, y, kind=kind, fill_value=fill_value)
-                self.interpolation_table["g"].append(f)
-            # create interpolation tables for 'D' and 'r_b' by height
-            keys = list(self.r_b_values.keys())
-            height_values: list = []
-            rb_values: list = []
-            d_values: list = []
-            for h in keys:
-                height_values.append(float(h))
-                rb_values.append(self.r_b_values[h])
-                try:
-                    d_values.append(self.D_values[h])
-                except Exception as e:  # noqa: BLE001
-                    print(e)
-            if kind == "lagrange":
-                rb_f = lagrange(height_values, rb_values)
-            else:
-                # interpolation function for rb values by H equivalent
-                rb_f = interp1d(height_values, rb_values, kind=kind, fill_value=fill_value)
-            self.interpolation_table["rb"] = rb_f
-            try:
-                if kind == "lagrange":
-                    d_f = lagrange(height_values, d_values)
-                else:
-                    d_f = interp1d(height_values, d_values, kind=kind, fill_value=fill_value)
-                self.interpolation_table["D"] = d_f
-            except Exception as e:  # noqa: BLE001
-                print(e)
+        # if the interpolants for this kind and fill mode are not yet known, build them
+        table_key = (kind, fill_value)
+        if table_key not in self.interpolation_table:
+            self.interpolation_table[table_key] = self._build_interpolants(kind, fill_value)
+        table = self.interpolation_table[table_key]
 
-        # create the g-function by interpolating at each ln(t/ts) value
-        rb_value = self.interpolation_table["rb"](h_eq)
+        # create the g-function by interpolating at every ln(t/ts) value at once
+        rb_value = table["rb"](h_eq)
         try:
-            d_value = self.interpolation_table["D"](h_eq)
+            d_value = table["D"](h_eq)
         except Exception as e:  # noqa: BLE001
             print(f"Error occurred while interpolating D: {e}")
             d_value = None
-        g_function: list = []
-        for i in range(len(self.log_time)):
-            f = self.interpolation_table["g"][i]
-            g = f(h_eq).tolist()
-            g_function.append(g)
+        # 1-D linear interpolation returns the end point exactly, keep that behavior
+        g_function = self.g_lts[-1].copy() if kind == "linear" and h_eq == max_height else table["g"](h_eq)
         return g_function, rb_value, d_value, h_eq
 
+    def _build_interpolants(self, kind: str, fill_value) -> dict:
+        # the g-function interpolant takes the height (or equivalent height) as an
+        # input and returns the g-function at each point in dimensionless time
+        table = {}
+        if kind == "lagrange":
+            table["g"] = self._lagrange_rows(self.heights, self.g_lts)
+        else:
+            table["g"] = interp1d(self.heights, self.g_lts, kind=kind, axis=0, fill_value=fill_value)
+
+        # create interpolation tables for 'D' and 'r_b' by height
+        keys = list(self.r_b_values.keys())
+        height_values: list = []
+        rb_values: list = []
+        d_values: list = []
+        for h in keys:
+            height_values.append(float(h))
+            rb_values.append(self.r_b_values[h])
+            try:
+                d_values.append(self.D_values[h])
+            except Exception as e:  # noqa: BLE001
+                print(e)
+        if kind == "lagrange":
+            rb_f = lagrange(height_values, rb_values)
+        else:
+            # interpolation function for rb values by H equivalent
+            rb_f = interp1d(height_values, rb_values, kind=kind, fill_value=fill_value)
+        table["rb"] = rb_f
+        try:
+            if kind == "lagrange":
+                d_f = lagrange(height_values, d_values)
+            else:
+                d_f = interp1d(height_values, d_values, kind=kind, fill_value=fill_value)
+            table["D"] = d_f
+        except Exception as e:  # noqa: BLE001
+            print(e)
+        return table
+
+    @staticmethod
+    def _lagrange_rows(x: np.ndarray, y: np.ndarray):
+        # Lagrange interpolation of every column of y at once, evaluated through the
+        # Lagrange basis polynomials of the (shared) heights x
+        def f(x_new):
+            weights = np.ones_like(x)
+            for j in range(len(x)):
+                for m in range(len(x)):
+                    if m != j:
+                        weights[j] *= (x_new - x[m]) / (x[j] - x[m])
+            return weights @ y
+
+        return f
+
     @staticmethod
     def borehole_radius_correction(g_function: list, rb: float, rb_star: float):
         r"""
@@ -292,7 +440,7 @@ class GFunction:
             g(\dfrac{t}{t_s}, \dfrac{r_b}{H}) - ln(\dfrac{r_b^*}{r_b})
         Parameters
         ----------
-        g_function: list
+        g_function: np.ndarray
             A g-function
         rb: float
             The current borehole radius
@@ -300,13 +448,10 @@ class GFunction:
             The borehole radius that is being corrected to
         Returns
         -------
-        g_function_corrected: list
+        g_function_corrected: np.ndarray
             A corrected g_function
         """
-        g_function_corrected = []
-        for g in g_function:
-            g_function_corrected.append(g - log(rb_star / rb))
-        return g_function_corrected
+        return np.asarray(g_function, dtype=float) - log(rb_star / rb)
 
     @staticmethod
     def configure_database_file_for_usage(data) -> dict:
@@ -1,11 +1,14 @@
+from collections import OrderedDict
 from math import ceil, floor
+from typing import ClassVar, Optional
 
 import numpy as np
 from scipy.interpolate import interp1d
+from scipy.signal import fftconvolve
 
 from ghedesigner import VERSION
 from ghedesigner.borehole import GHEBorehole
-from ghedesigner.borehole_heat_exchangers import get_bhe_object
+from ghedesigner.borehole_heat_exchangers import borehole_model_key, get_bhe_object
 from ghedesigner.constants import SEC_IN_HR, TWO_PI
 from ghedesigner.enums import BHPipeType, TimestepType
 from ghedesigner.gfunction import GFunction, calc_g_func_for_multiple_lengths
@@ -17,6 +20,17 @@ from ghedesigner.utilities import solve_root
 
 
 class BaseGHE:
+    # Equivalent single U-tubes and short time step models, keyed by borehole_model_key and
+    # shared by all GHE objects. Sizing and searches revisit the same models many times.
+    _sts_memo: ClassVar[OrderedDict] = OrderedDict()
+    _sts_memo_max_size = 256
+
+    # Load aggregation used by TimestepType.AGGREGATEDHOURLY: the most recent hours are superposed
+    # exactly, older hours are lumped into blocks whose widths grow geometrically with their age.
+    aggregation_immediate_hours = 168
+    aggregation_first_block_hours = 24
+    aggregation_growth_factor = 1.2
+
     def __init__(
         self,
         v_flow_system: float,
@@ -46,12 +60,10 @@ class BaseGHE:
         self.bhe_type = bhe_type
         self.bhe = get_bhe_object(bhe_type, m_flow_borehole, fluid, borehole, pipe, grout, soil)
 
-        # Equivalent borehole Heat Exchanger
-        self.bhe_eq = self.bhe.to_single()
-
-        # Radial numerical short time step
-        self.radial_numerical = RadialNumericalBH(self.bhe_eq)
-        self.radial_numerical.calc_sts_g_functions(self.bhe_eq)
+        # Equivalent borehole Heat Exchanger and radial numerical short time step
+        self.bhe_eq = None
+        self.radial_numerical = None
+        self.update_short_time_step()
 
         # gFunction object
         self.gFunction = g_function
@@ -62,6 +74,36 @@ class BaseGHE:
         self.hourly_extraction_ground_loads = hourly_extraction_ground_loads
         self.times = []
         self.loading = None
+        # worst-case error of the last TimestepType.AGGREGATEDHOURLY simulation (C)
+        self.aggregation_error_bound = None
+
+    def update_short_time_step(self) -> None:
+        # Solve for the equivalent single U-tube and its short time step g-function,
+        # reusing a previous solution for the same borehole model when available
+        key = borehole_model_key(
+            self.bhe_type,
+            self.m_flow_borehole,
+            self.bhe.fluid,
+            self.bhe.b,
+            self.bhe.pipe,
+            self.bhe.grout,
+            self.bhe.soil,
+        )
+        memo = BaseGHE._sts_memo
+        if key in memo:
+            memo.move_to_end(key)
+            bhe_eq, radial_numerical = memo[key]
+        else:
+            bhe_eq = self.bhe.to_single()
+            radial_numerical = RadialNumericalBH(bhe_eq)
+            radial_numerical.calc_sts_g_functions(bhe_eq)
+            memo[key] = (bhe_eq, radial_numerical)
+            if len(memo) > BaseGHE._sts_memo_max_size:
+                memo.popitem(last=False)
+
+        # a single U-tube is its own equivalent, and its borehole is updated during sizing
+        self.bhe_eq = self.bhe if self.bhe_type == BHPipeType.SINGLEUTUBE else bhe_eq
+        self.radial_numerical = radial_numerical
 
     def as_dict(self) -> dict:
         output = {}
@@ -75,14 +117,14 @@ class BaseGHE:
         return output
 
     @staticmethod
-    def combine_sts_lts(log_time_lts: list, g_lts: list, log_time_sts: list, g_sts: list) -> interp1d:
+    def combine_sts_lts(log_time_lts: list, g_lts, log_time_sts: list, g_sts) -> interp1d:
         # make sure the short time step doesn't overlap with the long time step
         max_log_time_sts = max(log_time_sts)
         min_log_time_lts = min(log_time_lts)
 
         if max_log_time_sts < min_log_time_lts:
             log_time = log_time_sts + log_time_lts
-            g = g_sts + g_lts
+            g = np.concatenate((g_sts, g_lts))
         else:
             # find where to stop in sts
             i = 0
@@ -91,7 +133,7 @@ class BaseGHE:
                 i += 1
                 value = log_time_sts[i]
             log_time = log_time_sts[0:i] + log_time_lts
-            g = g_sts[0:i] + g_lts
+            g = np.concatenate((g_sts[0:i], g_lts))
         g = interp1d(log_time, g)
 
         return g
@@ -126,6 +168,122 @@ class BaseGHE:
         t_excess = max(delta_t_max, delta_t_min)
         return t_excess
 
+    @staticmethod
+    def _superpose_uniform(q_dot_b_dt: np.ndarray, time_values: np.ndarray, g: interp1d, ts: float) -> np.ndarray:
+        # On a uniform time grid the response to the step applied at time_values[j] only depends on
+        # i - j, so the superposition sum is a discrete convolution of the load steps with
+        # g(k * dt), k = 1..n, which FFT evaluates in O(n log n).
+        n = q_dot_b_dt.size
+        g_values = g(np.log((time_values[1 : n + 1] * SEC_IN_HR) / ts))
+        return fftconvolve(q_dot_b_dt, g_values)[:n]
+
+    @staticmethod
+    def _superpose(q_dot_b_dt: np.ndarray, time_values: np.ndarray, g: interp1d, ts: float) -> np.ndarray:
+        # General, non-uniform time grid (e.g. the hybrid time steps)
+        n = q_dot_b_dt.size
+        delta_tb = np.empty(n)
+        for i in range(1, n + 1):
+            # Take the last i elements of the reversed time array
+            _time = time_values[i] - time_values[0:i]
+            g_values = g(np.log((_time * SEC_IN_HR) / ts))
+            # Tb = Tg + (q_dt * g)  (Equation 2.12)
+            delta_tb[i - 1] = q_dot_b_dt[0:i].dot(g_values)
+        return delta_tb
+
+    @classmethod
+    def aggregation_block_edges(cls, n_hours: int) -> np.ndarray:
+        # Lags (hours) bounding the aggregated blocks, starting at the end of the immediate window
+        # and ending at the start of the simulation.
+        edges = [min(cls.aggregation_immediate_hours, n_hours)]
+        width = float(cls.aggregation_first_block_hours)
+        while edges[-1] < n_hours:
+            edges.append(min(edges[-1] + max(round(width), 1), n_hours))
+            width *= cls.aggregation_growth_factor
+        return np.array(edges)
+
+    def _simulate_aggregated(self, q_dot: np.ndarray, g: interp1d):
+        """
+        Hourly simulation with multiple load aggregation.
+
+        The borehole wall temperature change at hour i is the superposition of the hourly loads
+        q_(i-k+1) applied over lags k = 1..i,
+
+            dTb_i = sum_k q_(i-k+1) * (G(k) - G(k-1)) / (2 pi k_s H),   G(k) = g(ln(k dt / ts))
+
+        Lags inside the immediate window are superposed exactly. Older lags are grouped into blocks
+        [E_b + 1, E_b+1] whose width w_b = E_b+1 - E_b grows geometrically. Within a block, dG_k =
+        G(k) - G(k-1) is replaced by its least squares line a_b + s_b * (k - k_b), so the block only
+        needs the sums of q_m and m * q_m over the hours it covers, which come from prefix sums of the
+        loads. The cost is O(n * (immediate hours + number of blocks)), i.e. near linear in the
+        simulated hours, and a constant load is reproduced exactly.
+
+        Accuracy: the residuals r_k of the fit sum to zero over each block, so the error versus the
+        full superposition at any hour is
+
+            |error| = |sum_b sum_k (q_k - c) * r_k| / (2 pi k_s H)
+                   <= sum_b w_b * (q_max - q_min) / 2 * max_k |r_k| / (2 pi k_s H)
+
+        with q_max - q_min the range of the borehole loads. This bound is stored in
+        self.aggregation_error_bound (C). It is a worst case; for the annual load profiles in the
+        test suite the actual error in the fluid temperatures is below 0.1 C.
+        """
+
+        n = q_dot.size
+
+        # Average borehole wall rejection rate
+        q_dot_b = q_dot / float(self.nbh)
+
+        ts = self.radial_numerical.t_s  # (-)
+        two_pi_k = TWO_PI * self.bhe.soil.k  # (W/m.K)
+        h = self.bhe.b.H  # (meters)
+        tg = self.bhe.soil.ugt  # (Celsius)
+        rb = self.bhe.calc_effective_borehole_resistance()  # (m.K/W)
+        m_dot = self.bhe.m_flow_borehole  # (kg/s)
+        cp = self.bhe.fluid.cp  # (J/kg.s)
+
+        # G(k) for k = 0..n, with G(0) = 0
+        g_values = np.hstack((0.0, g(np.log((np.arange(1, n + 1) * SEC_IN_HR) / ts))))
+        d_g = np.diff(g_values)
+
+        # immediate window
+        edges = self.aggregation_block_edges(n)
+        delta_tb = np.convolve(q_dot_b, d_g[: edges[0]])[:n]
+
+        # aggregated blocks, from prefix sums of the loads (no load before the first hour)
+        hours = np.arange(1, n + 1)
+        load_sums = np.hstack((0.0, np.add.accumulate(q_dot_b)))
+        moment_sums = np.hstack((0.0, np.add.accumulate(hours * q_dot_b)))
+        error_bound = 0.0
+        for lag_start, lag_end in zip(edges[:-1], edges[1:]):
+            # least squares linear fit of dG over the block lags, centered on the block
+            lags = np.arange(lag_start + 1, lag_end + 1) - (lag_start + 1 + lag_end) / 2.0
+            block_d_g = d_g[lag_start:lag_end]
+            mean_d_g = (g_values[lag_end] - g_values[lag_start]) / (lag_end - lag_start)
+            lag_sq_sum = lags.dot(lags)
+            slope = lags.dot(block_d_g - mean_d_g) / lag_sq_sum if lag_sq_sum > 0 else 0.0
+            residual = block_d_g - mean_d_g - slope * lags
+            error_bound += (lag_end - lag_start) * np.abs(residual).max()
+
+            # the loads applied at hours i - lag_end + 1 .. i - lag_start
+            upper = np.maximum(hours - lag_start, 0)
+            lower = np.maximum(hours - lag_end, 0)
+            load_sum = load_sums[upper] - load_sums[lower]
+            moment_sum = moment_sums[upper] - moment_sums[lower]
+            # sum of q_m * (mean_d_g + slope * (k - k_center)), with lag k = i + 1 - m
+            lag_offset = hours + 1 - (lag_start + 1 + lag_end) / 2.0
+            delta_tb += mean_d_g * load_sum + slope * (lag_offset * load_sum - moment_sum)
+
+        delta_tb /= h * two_pi_k
+        self.aggregation_error_bound = error_bound * (q_dot_b.max() - q_dot_b.min()) / 2.0 / (h * two_pi_k)
+
+        tb = tg + delta_tb
+        # Tf = Tb + q_i * R_b^* (Equation 2.13)
+        tf_bulk = tb + q_dot_b / h * rb
+        # T_out = T_f - Q / (2 * m_dot cp)  (Equation 2.14)
+        hp_eft = tf_bulk - q_dot_b / (2 * m_dot * cp)
+
+        return hp_eft.tolist(), delta_tb.tolist()
+
     def _simulate_detailed(self, q_dot: np.ndarray, time_values: np.ndarray, g: interp1d):
         # Perform a detailed simulation based on a numpy array of heat rejection
         # rates, Q_dot (Watts) where each load is applied at the time_value
@@ -138,7 +296,7 @@ class BaseGHE:
         # borehole wall rejection rate
         # At time t=0, make the heat rejection rate 0.
         q_dot_b = np.hstack((0.0, q_dot / float(self.nbh)))
-        time_values = np.hstack((0.0, time_values))
+        time_values = np.hstack((0.0, time_values))[: n + 1]
 
         q_dot_b_dt = np.hstack(q_dot_b[1:] - q_dot_b[:-1])
 
@@ -150,25 +308,20 @@ class BaseGHE:
         m_dot = self.bhe.m_flow_borehole  # (kg/s)
         cp = self.bhe.fluid.cp  # (J/kg.s)
 
-        hp_eft = []
-        delta_tb = []
-        for i in range(1, n + 1):
-            # Take the last i elements of the reversed time array
-            _time = time_values[i] - time_values[0:i]
-            # _time = time_values_reversed[n - i:n]
-            g_values = g(np.log((_time * SEC_IN_HR) / ts))
-            # Tb = Tg + (q_dt * g)  (Equation 2.12)
-            delta_tb_i = (q_dot_b_dt[0:i] / h / two_pi_k).dot(g_values)
-            # Tf = Tb + q_i * R_b^* (Equation 2.13)
-            tb = tg + delta_tb_i
-            # Bulk fluid temperature
-            tf_bulk = tb + q_dot_b[i] / h * rb
-            # T_out = T_f - Q / (2 * m_dot cp)  (Equation 2.14)
-            tf_out = tf_bulk - q_dot_b[i] / (2 * m_dot * cp)
-            hp_eft.append(tf_out)
-            delta_tb.append(delta_tb_i)
-
-        return hp_eft, delta_tb
+        # Tb = Tg + (q_dt * g)  (Equation 2.12)
+        time_steps = np.diff(time_values)
+        if n > 1 and np.all(time_steps == time_steps[0]):
+            delta_tb = self._superpose_uniform(q_dot_b_dt / h / two_pi_k, time_values, g, ts)
+        else:
+            delta_tb = self._superpose(q_dot_b_dt / h / two_pi_k, time_values, g, ts)
+
+        tb = tg + delta_tb
+        # Tf = Tb + q_i * R_b^* (Equation 2.13)
+        tf_bulk = tb + q_dot_b[1:] / h * rb
+        # T_out = T_f - Q / (2 * m_dot cp)  (Equation 2.14)
+        hp_eft = tf_bulk - q_dot_b[1:] / (2 * m_dot * cp)
+
+        return hp_eft.tolist(), delta_tb.tolist()
 
     def compute_g_functions(self):
         # Compute g-functions for a bracketed solution, based on min and max
@@ -194,12 +347,18 @@ class BaseGHE:
             self.bhe.pipe,
             self.bhe.grout,
             self.bhe.soil,
+            workers=self.sim_params.workers,
         )
 
         self.gFunction = g_function
 
 
 class GHE(BaseGHE):
+    # Searches alternate between few borehole models (e.g. the minimum and maximum heights)
+    hybrid_load_cache_max_size = 4
+    # Secant steps taken from a prior solution before size falls back to the full range of heights
+    warm_start_max_steps = 4
+
     def __init__(
         self,
         v_flow_system: float,
@@ -216,7 +375,13 @@ class GHE(BaseGHE):
         field_type="N/A",
         field_specifier="N/A",
         load_years=None,
+        hybrid_load_cache: Optional[dict] = None,
     ):
+        """
+        :param hybrid_load_cache: optional dict shared by GHE objects built from the same hourly loads, e.g.
+            the candidate fields of a search. The HybridLoad only depends on the equivalent borehole model,
+            the simulation months and the load years, so it is reused whenever those match.
+        """
         BaseGHE.__init__(
             self,
             v_flow_system,
@@ -239,9 +404,22 @@ class GHE(BaseGHE):
         if load_years is None:
             load_years = [2019]
 
-        hybrid_load = HybridLoad(
-            self.hourly_extraction_ground_loads, self.bhe_eq, self.radial_numerical, sim_params, years=load_years
+        hybrid_load_key = (
+            borehole_model_key(self.bhe_type, self.m_flow_borehole, fluid, borehole, pipe, grout, soil),
+            sim_params.start_month,
+            sim_params.end_month,
+            tuple(load_years),
         )
+        if hybrid_load_cache is not None and hybrid_load_key in hybrid_load_cache:
+            hybrid_load = hybrid_load_cache[hybrid_load_key]
+        else:
+            hybrid_load = HybridLoad(
+                self.hourly_extraction_ground_loads, self.bhe_eq, self.radial_numerical, sim_params, years=load_years
+            )
+            if hybrid_load_cache is not None:
+                if len(hybrid_load_cache) >= self.hybrid_load_cache_max_size:
+                    del hybrid_load_cache[next(iter(hybrid_load_cache))]
+                hybrid_load_cache[hybrid_load_key] = hybrid_load
 
         # hybrid load object
         self.hybrid_load = hybrid_load
@@ -250,6 +428,8 @@ class GHE(BaseGHE):
         self.hp_eft = []
         # list of change in borehole wall temperatures
         self.dTb = []
+        # (height, slope of the excess temperature) found by the last call to size, see size
+        self.sizing_state = None
 
     def as_dict(self) -> dict:
         output = {}
@@ -294,10 +474,8 @@ class GHE(BaseGHE):
         b = self.B_spacing
         b_over_h = b / self.bhe.b.H
 
-        # Solve for equivalent single U-tube
-        self.bhe_eq = self.bhe.to_single()
-        # Update short time step object with equivalent single u-tube
-        self.radial_numerical.calc_sts_g_functions(self.bhe_eq)
+        # Solve for equivalent single U-tube and update the short time step
+        self.update_short_time_step()
         # Combine the short and long-term g-functions. The long term g-function
         # is interpolated for specific B/H and rb/H values.
         g, _ = self.grab_g_function(b_over_h)
@@ -310,16 +488,7 @@ class GHE(BaseGHE):
 
             hp_eft, d_tb = self._simulate_detailed(q_dot, time_values, g)
         elif method == TimestepType.HOURLY:
-            n_months = self.sim_params.end_month - self.sim_params.start_month + 1
-            n_hours = int(n_months / 12.0 * 8760.0)
-            q_dot = self.hourly_extraction_ground_loads
-            # How many times does q need to be repeated?
-            n_years = ceil(n_hours / 8760)
-            if len(q_dot) // 8760 < n_years:
-                q_dot = q_dot * n_years
-            else:
-                n_hours = len(q_dot)
-            q_dot = -1.0 * np.array(q_dot)  # Convert loads to rejection
+            q_dot, n_hours = self.hourly_rejection_loads()
             # print("Times:",self.times)
             if len(self.times) == 0:
                 self.times = np.arange(1, n_hours + 1, 1)
@@ -327,33 +496,114 @@ class GHE(BaseGHE):
             self.loading = q_dot
 
             hp_eft, d_tb = self._simulate_detailed(q_dot, t, g)
+        elif method == TimestepType.AGGREGATEDHOURLY:
+            q_dot, _ = self.hourly_rejection_loads()
+            self.times = np.arange(1, q_dot.size + 1, 1)
+            self.loading = q_dot
+
+            hp_eft, d_tb = self._simulate_aggregated(q_dot, g)
         else:
-            raise ValueError("Only hybrid or hourly methods available.")
+            raise ValueError("Only hybrid, hourly or aggregated hourly methods available.")
 
         self.hp_eft = hp_eft
         self.dTb = d_tb
 
         return max(hp_eft), min(hp_eft)
 
-    def size(self, method: TimestepType) -> None:
+    def hourly_rejection_loads(self) -> tuple:
+        # The hourly loads repeated over the simulation period and converted to rejection, and the number of
+        # hours simulated
+        n_months = self.sim_params.end_month - self.sim_params.start_month + 1
+        n_hours = int(n_months / 12.0 * 8760.0)
+        q_dot = self.hourly_extraction_ground_loads
+        # How many times does q need to be repeated?
+        n_years = ceil(n_hours / 8760)
+        if len(q_dot) // 8760 < n_years:
+            q_dot = q_dot * n_years
+        else:
+            n_hours = len(q_dot)
+        q_dot = -1.0 * np.array(q_dot)  # Convert loads to rejection
+        return q_dot, n_hours
+
+    def size(self, method: TimestepType, prior: Optional[tuple] = None) -> None:
+        """
+        Sizes the borehole height for a zero excess fluid temperature, within the minimum and maximum heights.
+        Afterwards, sizing_state holds the sized height and the slope of the excess temperature there (C/m),
+        or None when the excess temperature has the same sign over all heights.
+
+        :param prior: optional (height, slope) solution of a similar GHE, e.g. the sizing_state of the previous
+            field of a search. Secant steps from this solution usually converge within a few simulations, and the
+            full range of heights is only searched when no simulated heights bracket the root.
+        """
         # Size the ground heat exchanger
+        t_excess = {}
+
         def local_objective(h):
-            self.bhe.b.H = h
-            max_hp_eft, min_hp_eft = self.simulate(method=method)
-            t_excess = self.cost(max_hp_eft, min_hp_eft)
-            return t_excess
-
-        # Make the initial guess variable the average of the heights given
-        self.bhe.b.H = (self.sim_params.max_height + self.sim_params.min_height) / 2.0
-        # bhe.b.H is updated during sizing
-        returned_height = solve_root(
-            self.bhe.b.H,
-            local_objective,
-            lower=self.sim_params.min_height,
-            upper=self.sim_params.max_height,
-            abs_tol=1.0e-6,
-            rel_tol=1.0e-6,
-            max_iter=50,
-        )
+            if h not in t_excess:
+                self.bhe.b.H = h
+                max_hp_eft, min_hp_eft = self.simulate(method=method)
+                t_excess[h] = self.cost(max_hp_eft, min_hp_eft)
+            return t_excess[h]
+
+        returned_height = None
+        if prior is not None:
+            returned_height = self.solve_from_prior(local_objective, t_excess, prior, abs_tol=1.0e-6, rel_tol=1.0e-6)
+
+        if returned_height is None:
+            # Make the initial guess variable the average of the heights given
+            self.bhe.b.H = (self.sim_params.max_height + self.sim_params.min_height) / 2.0
+            # bhe.b.H is updated during sizing
+            returned_height = solve_root(
+                self.bhe.b.H,
+                local_objective,
+                lower=self.sim_params.min_height,
+                upper=self.sim_params.max_height,
+                abs_tol=1.0e-6,
+                rel_tol=1.0e-6,
+                max_iter=50,
+            )
 
         self.bhe.b.H = returned_height
+        self.update_sizing_state(t_excess)
+
+    def solve_from_prior(
+        self, objective, t_excess: dict, prior: tuple, abs_tol: float, rel_tol: float
+    ) -> Optional[float]:
+        # Secant steps from a prior (height, slope) solution, until the next step is within the tolerance of
+        # solve_root. If they do not converge in warm_start_max_steps steps, the root is refined between the
+        # closest evaluated heights that bracket it. Returns None if no heights bracket the root. The objective
+        # stores its values in t_excess.
+        lower = self.sim_params.min_height
+        upper = self.sim_params.max_height
+        h_0, slope = prior
+        h_0 = min(max(h_0, lower), upper)
+        t_0 = objective(h_0)
+        for step in range(self.warm_start_max_steps + 1):
+            if t_0 == 0.0:
+                return h_0
+            if not np.isfinite(slope) or slope == 0.0:
+                break
+            # at the minimum or maximum height, the step may be cut to zero, as in solve_root without a root
+            h_1 = min(max(h_0 - t_0 / slope, lower), upper)
+            if abs(h_1 - h_0) <= abs_tol + rel_tol * abs(h_0):
+                return h_0
+            if step == self.warm_start_max_steps:
+                break
+            t_1 = objective(h_1)
+            slope = (t_1 - t_0) / (h_1 - h_0)
+            h_0, t_0 = h_1, t_1
+
+        evaluated = sorted(t_excess.items())
+        for (h_a, t_a), (h_b, t_b) in zip(evaluated[:-1], evaluated[1:]):
+            if (t_a < 0.0) != (t_b < 0.0):
+                return solve_root(h_a, objective, lower=h_a, upper=h_b, abs_tol=abs_tol, rel_tol=rel_tol)
+        return None
+
+    def update_sizing_state(self, t_excess: dict) -> None:
+        # The slope at the sized height is that of the secant through the two evaluated heights closest to it
+        if not (min(t_excess.values()) < 0.0 < max(t_excess.values())):
+            self.sizing_state = None
+            return
+        height = self.bhe.b.H
+        h_a, h_b = sorted(t_excess, key=lambda h: abs(h - height))[:2]
+        self.sizing_state = (height, (t_excess[h_b] - t_excess[h_a]) / (h_b - h_a))
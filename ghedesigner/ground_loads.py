@@ -1,18 +1,60 @@
+import hashlib
 import warnings
 from calendar import monthrange
+from collections import OrderedDict
+from itertools import accumulate
 from json import dumps
-from math import floor
+from typing import ClassVar
 
 import numpy as np
 from scipy.interpolate import interp1d
 
 from ghedesigner.borehole_heat_exchangers import SingleUTube
+from ghedesigner.cache import DiskCache, get_cache
 from ghedesigner.constants import HRS_IN_DAY, SEC_IN_HR, TWO_PI
 from ghedesigner.radial_numerical_borehole import RadialNumericalBH
 from ghedesigner.simulation import SimulationParameters
 
+PEAK_DURATION_CACHE_NAMESPACE = "peak_durations"
+
+# HybridLoad attributes set by the peak duration analysis
+PEAK_ANALYSIS_ATTRIBUTES = (
+    "monthly_peak_cl_duration",
+    "monthly_peak_hl_duration",
+    "two_day_fluid_temps_cl_pk",
+    "two_day_fluid_temps_cl_nm",
+    "two_day_fluid_temps_hl_pk",
+    "two_day_fluid_temps_hl_nm",
+)
+
+
+def peak_duration_cache_payload(
+    hourly_rejection_loads, hourly_extraction_loads, years, resist_bh_effective, soil_k, g_sts, ts
+) -> dict:
+    """
+    Collects every input that affects the result of HybridLoad.find_peak_durations into a
+    JSON-serializable description, used to address the peak duration caches. The borehole
+    field itself does not enter the analysis.
+    """
+    loads = hashlib.sha256(np.ascontiguousarray(hourly_rejection_loads, dtype=float).tobytes())
+    loads.update(np.ascontiguousarray(hourly_extraction_loads, dtype=float).tobytes())
+    return {
+        "loads": loads.hexdigest(),
+        "years": list(years),
+        "resist_bh_effective": resist_bh_effective,
+        "soil_k": soil_k,
+        "g_sts": [np.asarray(g_sts.x, dtype=float).tolist(), np.asarray(g_sts.y, dtype=float).tolist()],
+        "t_s": ts,
+    }
+
 
 class HybridLoad:
+    # Peak duration analyses keyed by the DiskCache key of peak_duration_cache_payload and shared by
+    # all HybridLoad objects. Searches build a HybridLoad for each borehole model they visit, many of
+    # which share the loads and the short time step response.
+    _peak_duration_memo: ClassVar[OrderedDict] = OrderedDict()
+    _peak_duration_memo_max_size = 256
+
     def __init__(
         self,
         raw_loads: list,
@@ -49,11 +91,6 @@ class HybridLoad:
         for year in years:
             self.days_in_month.extend([monthrange(year, i)[1] for i in range(1, 13)])
 
-        # TODO: verify whether errors are possible here and raise exception if needed
-        # assert (len(hourly_rejection_loads) == sum(self.days_in_month) * 24.0
-        #         and len(hourly_extraction_loads) == sum(self.days_in_month) * 24.0), (
-        #     "The total number of hours in the year are not equal. Is this a leap year?")
-
         # This block of data holds the compact monthly representation of the
         # loads. The intention is that these loads will usually repeat. It's
         # possible that for validation or design purposes, users may wish to
@@ -134,58 +171,57 @@ class HybridLoad:
         :param raw_loads: raw loads entered by the user, in Watts
         :return: Loads split into heating and cooling
         """
-        hourly_extraction_loads = [x / 1000.0 if x >= 0.0 else 0.0 for x in raw_loads]
-        hourly_rejection_loads = [abs(x) / 1000.0 if x < 0.0 else 0.0 for x in raw_loads]
+        raw_loads = np.asarray(raw_loads, dtype=float)
+        hourly_extraction_loads = np.where(raw_loads >= 0.0, raw_loads / 1000.0, 0.0)
+        hourly_rejection_loads = np.where(raw_loads < 0.0, np.abs(raw_loads) / 1000.0, 0.0)
 
         return hourly_rejection_loads, hourly_extraction_loads
 
     def split_loads_by_month(self) -> None:
         # Split the loads into peak, total and average loads for each month
 
-        # Store the index of the last months hours
-        hours_in_previous_months = 0
-        for i in range(1, len(self.days_in_month)):
-            hours_in_month = HRS_IN_DAY * self.days_in_month[i]
-            # Slice the hours in this current month
-            month_rejection_loads = self.hourly_rejection_loads[
-                hours_in_previous_months : hours_in_previous_months + hours_in_month
-            ]
-            month_extraction_loads = self.hourly_extraction_loads[
-                hours_in_previous_months : hours_in_previous_months + hours_in_month
-            ]
-
-            # TODO: verify whether errors are possible here and raise exception if needed
-            # assert (len(month_extraction_loads) == hours_in_month and len(month_rejection_loads) == hours_in_month)
-
-            # Sum
-            # monthly cooling loads (or heat rejection) in kWh
-            self.monthly_cl[i] = sum(month_rejection_loads)
-            # monthly heating loads (or heat extraction) in kWh
-            self.monthly_hl[i] = sum(month_extraction_loads)
-
-            # Peak
-            # monthly peak cooling load (or heat rejection) in kW
-            self.monthly_peak_cl[i] = max(month_rejection_loads)
-            # monthly peak heating load (or heat extraction) in kW
-            self.monthly_peak_hl[i] = max(month_extraction_loads)
-
-            # Average
-            # monthly average cooling load (or heat rejection) in kW
-            self.monthly_avg_cl[i] = self.monthly_cl[i] / len(month_rejection_loads)
-            # monthly average heating load (or heat extraction) in kW
-            self.monthly_avg_hl[i] = self.monthly_hl[i] / len(month_extraction_loads)
-
-            # Day of month the peak heating load occurs
-            # day of the month on which peak clg load occurs (e.g. 1-31)
-            self.monthly_peak_cl_day[i] = floor(month_rejection_loads.index(self.monthly_peak_cl[i]) / HRS_IN_DAY)
-            # day of the month on which peak clg load occurs (e.g. 1-31)
-            self.monthly_peak_hl_day[i] = floor(month_extraction_loads.index(self.monthly_peak_hl[i]) / HRS_IN_DAY)
-            # print("Monthly Peak HL Hour",month_extraction_loads.index(
-            # self.monthly_peak_hl[i]) / HRS_IN_DAY)
-            # print("Monthly Peak HL Day: ",self.monthly_peak_hl_day[i])
-            # print("")
-
-            hours_in_previous_months += hours_in_month
+        # Lay the hours of each month out in a row, padded with zero loads up to the longest month. Loads
+        # shorter than the years, such as 8760 hours in a leap year, leave the last month short.
+        hours_in_month = HRS_IN_DAY * np.array(self.days_in_month[1:])
+        hours_in_previous_months = np.cumsum(hours_in_month) - hours_in_month
+        hour_of_month = np.arange(hours_in_month.max())
+        hour_index = hours_in_previous_months[:, None] + hour_of_month
+        num_hours = min(len(self.hourly_rejection_loads), len(self.hourly_extraction_loads))
+        in_month = (hour_of_month < hours_in_month[:, None]) & (hour_index < num_hours)
+        if not in_month[:, 0].all():
+            raise ValueError(f"The {num_hours} hourly loads do not reach into every month of the load years.")
+        hour_index = np.minimum(hour_index, num_hours - 1)
+
+        for hourly_loads, monthly_total, monthly_peak, monthly_avg, monthly_peak_day in (
+            (
+                self.hourly_rejection_loads,
+                self.monthly_cl,
+                self.monthly_peak_cl,
+                self.monthly_avg_cl,
+                self.monthly_peak_cl_day,
+            ),
+            (
+                self.hourly_extraction_loads,
+                self.monthly_hl,
+                self.monthly_peak_hl,
+                self.monthly_avg_hl,
+                self.monthly_peak_hl_day,
+            ),
+        ):
+            month_loads = np.where(in_month, hourly_loads[hour_index], 0.0)
+            # Sum, in kWh. The running sum adds the hours in order, as sum() does, so the
+            # totals are exactly the same
+            total = np.add.accumulate(month_loads, axis=1)[:, -1]
+            # Peak, in kW, and the day of the month on which it first occurs (e.g. 1-31)
+            peak = month_loads.max(axis=1)
+            peak_day = month_loads.argmax(axis=1) // HRS_IN_DAY
+            # Average, in kW
+            avg = total / in_month.sum(axis=1)
+
+            monthly_total[1:] = total.tolist()
+            monthly_peak[1:] = peak.tolist()
+            monthly_avg[1:] = avg.tolist()
+            monthly_peak_day[1:] = peak_day.tolist()
 
     def process_two_day_loads(self) -> None:
         # The two day (48 hour) two day loads are selected by locating the day
@@ -198,9 +234,11 @@ class HybridLoad:
         # for the possibility that a peak load occurs on the first day of the
         # year
 
-        hourly_rejection_loads = self.hourly_rejection_loads[hours_in_year - HRS_IN_DAY :] + self.hourly_rejection_loads
-        hourly_extraction_loads = (
-            self.hourly_extraction_loads[hours_in_year - HRS_IN_DAY :] + self.hourly_extraction_loads
+        hourly_rejection_loads = np.concatenate(
+            (self.hourly_rejection_loads[hours_in_year - HRS_IN_DAY :], self.hourly_rejection_loads)
+        )
+        hourly_extraction_loads = np.concatenate(
+            (self.hourly_extraction_loads[hours_in_year - HRS_IN_DAY :], self.hourly_extraction_loads)
         )
 
         # Keep track of how many hours are in
@@ -229,9 +267,9 @@ class HybridLoad:
             ]
 
             # monthly cooling loads (or heat rejection) in kWh
-            self.two_day_hourly_peak_cl_loads.append(two_day_hourly_peak_cl_load)
+            self.two_day_hourly_peak_cl_loads.append(two_day_hourly_peak_cl_load.tolist())
             # monthly heating loads (or heat extraction) in kWh
-            self.two_day_hourly_peak_hl_loads.append(two_day_hourly_peak_hl_load)
+            self.two_day_hourly_peak_hl_loads.append(two_day_hourly_peak_hl_load.tolist())
 
             hours_in_previous_months += hours_in_month
 
@@ -256,121 +294,165 @@ class HybridLoad:
 
         return delta_t_fluid
 
-    def perform_current_month_simulation(
-        self,
-        two_day_hourly_peak_load,
-        peak_load,
-        avg_load,
-        two_day_fluid_temps_pk,
-        two_day_fluid_temps_nm,
-    ):
-        ts = self.radial_numerical.t_s
-        two_pi_k = TWO_PI * self.bhe.soil.k
+    @staticmethod
+    def hourly_response_matrix(hour_time, g_sts, resist_bh, two_pi_k, ts):
+        # Matrix of the fluid temperature response of simulate_hourly to the loads q, so that
+        # simulate_hourly(hour_time, q, ...) equals response @ q up to round-off
+
+        num_hours = len(hour_time)
+        # g-function value of the load step after hour j at hour n, for j < n
+        lags = hour_time[:, None] - hour_time[None, :-1]
+        earlier = np.tril(np.ones(lags.shape, dtype=bool), k=-1)
+        g_steps = np.zeros(lags.shape)
+        g_steps[earlier] = g_sts(np.log((lags[earlier] * SEC_IN_HR) / ts)) / two_pi_k
+
+        # The load steps are the differences of consecutive loads, q[j + 1] - q[j]
+        response = np.zeros((num_hours, num_hours))
+        response[:, 1:] += g_steps
+        response[:, :-1] -= g_steps
+        response[1:, 1:] += resist_bh * np.eye(num_hours - 1)
+        return response
+
+    def find_peak_durations(self) -> None:
+        # Find the peak durations, reusing the results of an earlier analysis with the same loads and
+        # borehole response when available
         resist_bh_effective = self.bhe.calc_effective_borehole_resistance()
-        g_sts = self.radial_numerical.g_sts
-
-        hour_time = np.array(range(2 * HRS_IN_DAY + 1))
-        # Two day peak cooling load scaled down by average (q_max - q_avg)
-        q_peak = np.array([0.0] + [peak_load - avg_load] * (2 * HRS_IN_DAY))
-        # Two day nominal cooling load (q_i - q_avg) / q_max * q_i
-        q_nominal = np.array(
-            [0.0]
-            + [
-                (two_day_hourly_peak_load[i] - avg_load) / peak_load * two_day_hourly_peak_load[i]
-                for i in range(1, len(q_peak))
-            ]
+        payload = peak_duration_cache_payload(
+            self.hourly_rejection_loads,
+            self.hourly_extraction_loads,
+            self.years,
+            resist_bh_effective,
+            self.bhe.soil.k,
+            self.radial_numerical.g_sts,
+            self.radial_numerical.t_s,
         )
-        # Get peak fluid temperatures using peak load
-        delta_t_fluid_peak = self.simulate_hourly(hour_time, q_peak, g_sts, resist_bh_effective, two_pi_k, ts)
-        two_day_fluid_temps_pk.append(delta_t_fluid_peak)
-        # Get nominal fluid temperatures using nominal load
-        delta_t_fluid_nom = self.simulate_hourly(hour_time, q_nominal, g_sts, resist_bh_effective, two_pi_k, ts)
-        two_day_fluid_temps_nm.append(delta_t_fluid_nom)
-
-        delta_t_fluid_nom_max = max(delta_t_fluid_nom)
-
-        if delta_t_fluid_nom_max > 0.0:
-            f = interp1d(delta_t_fluid_peak, hour_time, fill_value="extrapolate")
-            peak_duration = f(delta_t_fluid_nom_max).tolist()
-        else:
-            peak_duration = 1.0e-6
-
-        return peak_duration, q_peak, q_nominal
+        key = DiskCache.make_key(PEAK_DURATION_CACHE_NAMESPACE, payload)
 
-    def find_peak_durations(self) -> None:
+        memo = HybridLoad._peak_duration_memo
+        if key in memo:
+            memo.move_to_end(key)
+            peak_analysis = memo[key]
+        else:
+            cache = get_cache()
+            peak_analysis = None if cache is None else cache.get(PEAK_DURATION_CACHE_NAMESPACE, payload)
+            if peak_analysis is None:
+                self.simulate_peak_durations(resist_bh_effective)
+                peak_analysis = {name: getattr(self, name) for name in PEAK_ANALYSIS_ATTRIBUTES}
+                if cache is not None:
+                    cache.put(PEAK_DURATION_CACHE_NAMESPACE, payload, peak_analysis)
+            memo[key] = peak_analysis
+            if len(memo) > HybridLoad._peak_duration_memo_max_size:
+                memo.popitem(last=False)
+
+        # the lists are extended later on, e.g. by process_month_loads, while their items are never modified
+        for name in PEAK_ANALYSIS_ATTRIBUTES:
+            setattr(self, name, list(peak_analysis[name]))
+
+    def simulate_peak_durations(self, resist_bh_effective: float) -> None:
         # Find the peak durations using hourly simulations for 2 days
 
-        for i in range(1, len(self.days_in_month)):
-            # Scale all the loads by the peak load
-            # Perform an hourly simulation with the scaled loads
-            # Perform an hourly simulation with a load of 1, or the peak loads
-            # divided by the peak
-
-            # two day cooling loads (or heat rejection) in kWh
-            current_two_day_cl_load = [0.0] + self.two_day_hourly_peak_cl_loads[i]
-
-            # This tolerance applies to the difference between the current
-            # months peak load and the maximum of the two-day load. If the
-            # absolute value of the difference between the current months
-            # peak load and the current two-day peak load is within this
-            # tolerance, then the maximum of the two-day load is equal to the
-            # maximum of the current month. If the absolute difference is
-            # greater than the tolerance, then the two-day peak load contains
-            # a load greater than the current months peak load. The tolerance
-            # could ONLY be exceeded when the first 24 hours is located in the
-            # previous month.
-            tol = 0.1
-
-            # Ensure the peak load for the two-day load profile is the same or
-            # greater than the monthly peak load. This check is done in case
-            # the previous month contains a higher load than the current month.
-            load_diff = self.monthly_peak_cl[i] - max(current_two_day_cl_load)
-            # monthly peak cooling load (or heat rejection) in kW
-            current_month_peak_cl = self.monthly_peak_cl[i] if abs(load_diff) < tol else max(current_two_day_cl_load)
-
-            # monthly average cooling load (or heat rejection) in kW
-            current_month_avg_cl = self.monthly_avg_cl[i]
-
-            if current_month_peak_cl != 0.0:
-                peak_duration, _, _ = self.perform_current_month_simulation(
-                    current_two_day_cl_load,
-                    current_month_peak_cl,
-                    current_month_avg_cl,
-                    self.two_day_fluid_temps_cl_pk,
-                    self.two_day_fluid_temps_cl_nm,
-                )
-            else:
-                peak_duration = 1.0e-6
+        # Scale all the loads by the peak load
+        # Perform an hourly simulation with the scaled loads
+        # Perform an hourly simulation with a load of 1, or the peak loads
+        # divided by the peak
+        # All these simulations share the time grid and the borehole, so they are done at once, as a product with
+        # the response matrix of the simulation
+        hour_time = np.arange(2 * HRS_IN_DAY + 1)
+        response = self.hourly_response_matrix(
+            hour_time,
+            self.radial_numerical.g_sts,
+            resist_bh_effective,
+            TWO_PI * self.bhe.soil.k,
+            self.radial_numerical.t_s,
+        )
 
-            # Set the monthly cooling load duration
-            self.monthly_peak_cl_duration[i] = peak_duration
+        # This tolerance applies to the difference between the current
+        # months peak load and the maximum of the two-day load. If the
+        # absolute value of the difference between the current months
+        # peak load and the current two-day peak load is within this
+        # tolerance, then the maximum of the two-day load is equal to the
+        # maximum of the current month. If the absolute difference is
+        # greater than the tolerance, then the two-day peak load contains
+        # a load greater than the current months peak load. The tolerance
+        # could ONLY be exceeded when the first 24 hours is located in the
+        # previous month.
+        tol = 0.1
+
+        peak_analyses = (
+            (
+                self.two_day_hourly_peak_cl_loads,
+                self.monthly_peak_cl,
+                self.monthly_avg_cl,
+                self.monthly_peak_cl_duration,
+                self.two_day_fluid_temps_cl_pk,
+                self.two_day_fluid_temps_cl_nm,
+            ),
+            (
+                self.two_day_hourly_peak_hl_loads,
+                self.monthly_peak_hl,
+                self.monthly_avg_hl,
+                self.monthly_peak_hl_duration,
+                self.two_day_fluid_temps_hl_pk,
+                self.two_day_fluid_temps_hl_nm,
+            ),
+        )
 
-            # two day heating loads (or heat extraction) in kWh
-            current_two_day_hl_load = [0.0] + self.two_day_hourly_peak_hl_loads[i]
+        num_months = len(self.days_in_month) - 1
+        q_peak = []
+        q_nominal = []
+        simulated = []
+        for two_day_hourly_peak_loads, monthly_peak, monthly_avg, *_ in peak_analyses:
+            # two day loads in kWh, after a zero load at hour 0
+            two_day_loads = np.zeros((num_months, len(hour_time)))
+            two_day_loads[:, 1:] = two_day_hourly_peak_loads[1:]
+            month_peak = np.array(monthly_peak[1 : num_months + 1])
+            month_avg = np.array(monthly_avg[1 : num_months + 1])
 
             # Ensure the peak load for the two-day load profile is the same or
             # greater than the monthly peak load. This check is done in case
             # the previous month contains a higher load than the current month.
-            load_diff = self.monthly_peak_hl[i] - max(current_two_day_hl_load)
-            # monthly peak cooling load (or heat rejection) in kW
-            current_month_peak_hl = self.monthly_peak_hl[i] if abs(load_diff) < tol else max(current_two_day_hl_load)
-
-            # monthly average heating load (or heat extraction) in kW
-            current_month_avg_hl = self.monthly_avg_hl[i]
-
-            if current_month_peak_hl != 0.0:
-                peak_duration, _, _ = self.perform_current_month_simulation(
-                    current_two_day_hl_load,
-                    current_month_peak_hl,
-                    current_month_avg_hl,
-                    self.two_day_fluid_temps_hl_pk,
-                    self.two_day_fluid_temps_hl_nm,
-                )
-            else:
-                peak_duration = 1.0e-6
-
-            # Set the monthly cooling load duration
-            self.monthly_peak_hl_duration[i] = peak_duration
+            two_day_peak = two_day_loads.max(axis=1)
+            load_diff = month_peak - two_day_peak
+            current_month_peak = np.where(np.abs(load_diff) < tol, month_peak, two_day_peak)
+            has_peak = current_month_peak != 0.0
+
+            # Two day peak load scaled down by average (q_max - q_avg)
+            peak = np.zeros_like(two_day_loads)
+            peak[:, 1:] = (current_month_peak - month_avg)[:, None]
+            # Two day nominal load (q_i - q_avg) / q_max * q_i
+            nominal = np.zeros_like(two_day_loads)
+            nominal[has_peak, 1:] = (
+                (two_day_loads[has_peak, 1:] - month_avg[has_peak, None])
+                / current_month_peak[has_peak, None]
+                * two_day_loads[has_peak, 1:]
+            )
+
+            q_peak.append(peak)
+            q_nominal.append(nominal)
+            simulated.append(has_peak)
+
+        # Get the fluid temperatures of every month, using the peak and the nominal loads
+        delta_t_fluid_peak = np.vstack(q_peak) @ response.T
+        delta_t_fluid_nom = np.vstack(q_nominal) @ response.T
+
+        for idx, (*_, monthly_peak_duration, two_day_fluid_temps_pk, two_day_fluid_temps_nm) in enumerate(
+            peak_analyses
+        ):
+            for i in range(1, num_months + 1):
+                if not simulated[idx][i - 1]:
+                    monthly_peak_duration[i] = 1.0e-6
+                    continue
+
+                row = idx * num_months + i - 1
+                two_day_fluid_temps_pk.append(delta_t_fluid_peak[row].tolist())
+                two_day_fluid_temps_nm.append(delta_t_fluid_nom[row].tolist())
+
+                delta_t_fluid_nom_max = delta_t_fluid_nom[row].max()
+                if delta_t_fluid_nom_max > 0.0:
+                    f = interp1d(delta_t_fluid_peak[row], hour_time, fill_value="extrapolate")
+                    monthly_peak_duration[i] = f(delta_t_fluid_nom_max).tolist()
+                else:
+                    monthly_peak_duration[i] = 1.0e-6
 
     def create_dataframe_of_peak_analysis(self) -> str:
         # The fields are: sum, peak, avg, peak day, peak duration
@@ -416,10 +498,22 @@ class HybridLoad:
             "This will reduce the accuracy of the simulation."
         )
 
+        first_hours, last_hours = month_hour_bounds(max(self.start_month, self.end_month), self.years)
+
+        # Each month adds at most five periods, which are filled in order
+        load = np.zeros(2 + 5 * max(self.end_month - self.start_month + 1, 0))
+        hour = np.zeros_like(load)
+        num_periods = 1
+
+        def add_period(period_load, period_last_hour):
+            nonlocal num_periods
+            load[num_periods] = period_load
+            hour[num_periods] = period_last_hour
+            num_periods += 1
+
         # First, begin array with zero load before simulation starts.
-        self.load = np.append(self.load, 0)
-        last_zero_hour = first_month_hour(self.start_month, self.years) - 1
-        self.hour = np.append(self.hour, last_zero_hour)
+        last_zero_hour = first_hours[self.start_month] - 1
+        add_period(0, last_zero_hour)
         if len(self.years) <= 1:
             # Second, replicate months. [if we want to add an option where all
             # monthly loads are explicitly given, this code will be in an if block]
@@ -473,7 +567,7 @@ class HybridLoad:
                 # Catch the first and last peak hours to make sure they aren't 0
                 # Could only be 0 when the first month has no load.
                 first_hour_heating_peak = (
-                    first_month_hour(i, self.years)
+                    first_hours[i]
                     + (self.monthly_peak_hl_day[i]) * HRS_IN_DAY
                     + 12
                     - (self.monthly_peak_hl_duration[i] / 2)
@@ -484,7 +578,7 @@ class HybridLoad:
                 if last_hour_heating_peak < 0.0:
                     last_hour_heating_peak = 1.0e-6
                 first_hour_cooling_peak = (
-                    first_month_hour(i, self.years)
+                    first_hours[i]
                     + (self.monthly_peak_cl_day[i]) * HRS_IN_DAY
                     + 12
                     - self.monthly_peak_cl_duration[i] / 2
@@ -508,12 +602,10 @@ class HybridLoad:
                 if self.monthly_peak_cl[i] > 0 and ipf[i]:
                     # last_avg_hour = first_hour_cooling_peak - 1 JDS corrected 20200604
                     last_avg_hour = first_hour_cooling_peak
-                    self.load = np.append(self.load, month_rate)
-                    self.hour = np.append(self.hour, last_avg_hour)
+                    add_period(month_rate, last_avg_hour)
                     # cooling peak
                     # self.load = np.append(self.load, -self.monthly_peak_cl[i]) JDS corrected 20200604
-                    self.load = np.append(self.load, self.monthly_peak_cl[i])
-                    self.hour = np.append(self.hour, last_hour_cooling_peak)
+                    add_period(self.monthly_peak_cl[i], last_hour_cooling_peak)
 
                     if last_avg_hour - peak_last_avg_hour < 0.0:
                         warnings.warn(warn_msg_neg_timestep)
@@ -522,20 +614,17 @@ class HybridLoad:
                 if self.monthly_peak_hl[i] > 0 and ipf[i]:
                     # last_avg_hour = first_hour_heating_peak - 1 JDS corrected 20200604
                     last_avg_hour = first_hour_heating_peak
-                    self.load = np.append(self.load, month_rate)
-                    self.hour = np.append(self.hour, last_avg_hour)
+                    add_period(month_rate, last_avg_hour)
                     # heating peak
                     # self.load = np.append(self.load, self.monthly_peak_hl[i]) JDS corrected 20200604
-                    self.load = np.append(self.load, -self.monthly_peak_hl[i])
-                    self.hour = np.append(self.hour, last_hour_heating_peak)
+                    add_period(-self.monthly_peak_hl[i], last_hour_heating_peak)
 
                     if last_avg_hour - peak_last_avg_hour < 0.0:
                         warnings.warn(warn_msg_neg_timestep)
                     peak_last_avg_hour = last_avg_hour
                 # rest of month
-                last_avg_hour = last_month_hour(i, self.years)
-                self.load = np.append(self.load, month_rate)
-                self.hour = np.append(self.hour, last_avg_hour)
+                last_avg_hour = last_hours[i]
+                add_period(month_rate, last_avg_hour)
 
                 if last_avg_hour - peak_last_avg_hour < 0.0:
                     warnings.warn(warn_msg_neg_timestep)
@@ -546,11 +635,9 @@ class HybridLoad:
                 # monthly average conditions before cooling peak
                 if self.monthly_peak_hl[i] > 0 and ipf[i]:
                     last_avg_hour = first_hour_heating_peak
-                    self.load = np.append(self.load, month_rate)
-                    self.hour = np.append(self.hour, last_avg_hour)
+                    add_period(month_rate, last_avg_hour)
                     # heating peak
-                    self.load = np.append(self.load, -self.monthly_peak_hl[i])
-                    self.hour = np.append(self.hour, last_hour_heating_peak)
+                    add_period(-self.monthly_peak_hl[i], last_hour_heating_peak)
 
                     if last_avg_hour - peak_last_avg_hour < 0.0:
                         warnings.warn(warn_msg_neg_timestep)
@@ -558,19 +645,16 @@ class HybridLoad:
                 # monthly average conditions between heating peak and cooling peak
                 if self.monthly_peak_cl[i] > 0 and ipf[i]:
                     last_avg_hour = first_hour_cooling_peak
-                    self.load = np.append(self.load, month_rate)
-                    self.hour = np.append(self.hour, last_avg_hour)
+                    add_period(month_rate, last_avg_hour)
                     # cooling peak
-                    self.load = np.append(self.load, self.monthly_peak_cl[i])
-                    self.hour = np.append(self.hour, last_hour_cooling_peak)
+                    add_period(self.monthly_peak_cl[i], last_hour_cooling_peak)
 
                     if last_avg_hour - peak_last_avg_hour < 0.0:
                         warnings.warn(warn_msg_neg_timestep)
                     peak_last_avg_hour = last_avg_hour
                 # rest of month
-                last_avg_hour = last_month_hour(i, self.years)
-                self.load = np.append(self.load, month_rate)
-                self.hour = np.append(self.hour, last_avg_hour)
+                last_avg_hour = last_hours[i]
+                add_period(month_rate, last_avg_hour)
 
                 if last_avg_hour - peak_last_avg_hour < 0.0:
                     warnings.warn(warn_msg_neg_timestep)
@@ -585,14 +669,11 @@ class HybridLoad:
                     if self.monthly_peak_cl[i] > 0 and ipf[i]:
                         # last_avg_hour = first_hour_cooling_peak - 1 JDS corrected 20200604
                         last_avg_hour = first_hour_cooling_peak - self.monthly_peak_cl_duration[i] / 2
-                        self.load = np.append(self.load, month_rate)
-                        self.hour = np.append(self.hour, last_avg_hour)
+                        add_period(month_rate, last_avg_hour)
                         # cooling peak
                         # self.load = np.append(self.load, -self.monthly_peak_cl[i]) JDS corrected 20200604
-                        self.load = np.append(self.load, self.monthly_peak_cl[i])
-                        self.hour = np.append(
-                            self.hour,
-                            last_hour_cooling_peak - self.monthly_peak_cl_duration[i] / 2,
+                        add_period(
+                            self.monthly_peak_cl[i], last_hour_cooling_peak - self.monthly_peak_cl_duration[i] / 2
                         )
 
                         if last_avg_hour - peak_last_avg_hour < 0.0:
@@ -603,28 +684,24 @@ class HybridLoad:
                         # heating peak
                         # self.load = np.append(self.load, self.monthly_peak_hl[i]) JDS corrected 20200604
 
-                        self.load = np.append(self.load, -self.monthly_peak_hl[i])
-                        self.hour = np.append(
-                            self.hour,
-                            last_hour_heating_peak + self.monthly_peak_hl_duration[i] / 2,
+                        add_period(
+                            -self.monthly_peak_hl[i], last_hour_heating_peak + self.monthly_peak_hl_duration[i] / 2
                         )
 
                         if last_avg_hour - peak_last_avg_hour < 0.0:
                             warnings.warn(warn_msg_neg_timestep)
                         peak_last_avg_hour = last_avg_hour
                     # rest of month
-                    last_avg_hour = last_month_hour(i, self.years)
-                    self.load = np.append(self.load, month_rate)
-                    self.hour = np.append(self.hour, last_avg_hour)
+                    last_avg_hour = last_hours[i]
+                    add_period(month_rate, last_avg_hour)
 
                     if last_avg_hour - peak_last_avg_hour < 0.0:
                         warnings.warn(warn_msg_neg_timestep)
                     peak_last_avg_hour = last_avg_hour
 
                 else:
-                    last_avg_hour = last_month_hour(i, self.years)
-                    self.load = np.append(self.load, month_rate)
-                    self.hour = np.append(self.hour, last_avg_hour)
+                    last_avg_hour = last_hours[i]
+                    add_period(month_rate, last_avg_hour)
 
                 if last_avg_hour - peak_last_avg_hour < 0.0:
                     warnings.warn(warn_msg_neg_timestep)
@@ -633,12 +710,11 @@ class HybridLoad:
         #       Now fill array containing step function loads
         #       Note they are paired with the ending hour, so the ith load will start with the (i-1)th time
 
-        n = self.hour.size
+        self.load = load[:num_periods]
+        self.hour = hour[:num_periods]
         # Note at this point the load and hour np arrays contain zeroes in indices zero and one, then continue from
         # there.
-        for i in range(1, n):
-            step_load = self.load[i] - self.load[i - 1]
-            self.step_func_load = np.append(self.step_func_load, step_load)
+        self.step_func_load = np.concatenate(([0.0], np.diff(self.load)))
 
 
 def number_to_month(x):
@@ -670,6 +746,28 @@ def monthdays(month, year):
     return num_days[md]
 
 
+def month_hour_bounds(num_months, years):
+    """
+    Returns lists of the first_month_hour and last_month_hour of months 1 to num_months,
+    index 0 is unused.
+    """
+    # Days before each month of a year, for each year. As in first_month_hour and last_month_hour,
+    # all months before a month are counted as months of the year of that month.
+    days_before = {}
+    first_hours = [0] * (num_months + 1)
+    last_hours = [0] * (num_months + 1)
+    for month in range(1, num_months + 1):
+        current_year = years[(month - 1) // 12] if len(years) > 1 else years[0]
+        if current_year not in days_before:
+            days_before[current_year] = list(accumulate((monthdays(i, current_year) for i in range(1, 13)), initial=0))
+        cumulative_days = days_before[current_year]
+        full_years, month_in_year = divmod(month - 1, 12)
+        first_hours[month] = 1 + HRS_IN_DAY * (full_years * cumulative_days[12] + cumulative_days[month_in_year])
+        full_years, month_in_year = divmod(month, 12)
+        last_hours[month] = HRS_IN_DAY * (full_years * cumulative_days[12] + cumulative_days[month_in_year])
+    return first_hours, last_hours
+
+
 def first_month_hour(month, years):
     fmh = 1
     if month > 1:
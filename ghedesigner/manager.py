@@ -10,6 +10,7 @@ from jsonschema import ValidationError
 
 from ghedesigner import VERSION
 from ghedesigner.borehole import GHEBorehole
+from ghedesigner.cache import set_cache_directory
 from ghedesigner.constants import DEG_TO_RAD
 from ghedesigner.design import (
     AnyBisectionType,
@@ -21,7 +22,7 @@ from ghedesigner.design import (
     DesignRectangle,
     DesignRowWise,
 )
-from ghedesigner.enums import BHPipeType, DesignGeomType, FlowConfigType, TimestepType
+from ghedesigner.enums import BHPipeType, DesignGeomType, FlowConfigType, RotationSearchType, TimestepType
 from ghedesigner.geometry import (
     GeometricConstraints,
     GeometricConstraintsBiRectangle,
@@ -320,6 +321,7 @@ class GHEManager:
         min_height: float,
         max_boreholes: int | None = None,
         continue_if_design_unmet: bool = False,
+        workers: int = 1,
     ) -> int:
         """
         Sets the simulation parameters
@@ -331,11 +333,12 @@ class GHEManager:
         :param min_height: minimum height of borehole, in m.
         :param max_boreholes: maximum boreholes in search algorithms.
         :param continue_if_design_unmet: continues to process if design unmet.
+        :param workers: number of worker processes used for independent calculations.
         :returns: Zero if successful, nonzero if failure
         :rtype: int
         """
         self._simulation_parameters = SimulationParameters(
-            1, num_months, max_eft, min_eft, max_height, min_height, max_boreholes, continue_if_design_unmet
+            1, num_months, max_eft, min_eft, max_height, min_height, max_boreholes, continue_if_design_unmet, workers
         )
         return 0
 
@@ -446,6 +449,8 @@ class GHEManager:
         rotate_step: float,
         property_boundary: list,
         no_go_boundaries: list,
+        rotate_search: str = "EXHAUSTIVE",
+        throw: bool = True,
     ) -> int:
         """
         Sets the geometry constraints for the row-wise design method.
@@ -464,10 +469,25 @@ class GHEManager:
         :param rotate_step: step size for field rotation search.
         :param property_boundary: property boundary points.
         :param no_go_boundaries: boundary points for no-go zones.
+        :param rotate_search: rotation search strategy, "EXHAUSTIVE" evaluates every rotation step while
+            "COARSETOFINE" samples a coarse grid of rotations and refines around the best ones.
+        :param throw: By default, function will raise an exception on error, override to false to not raise exception
         :returns: Zero if successful, nonzero if failure
         :rtype: int
         """
 
+        rotate_search = str(rotate_search).upper()
+        if rotate_search == RotationSearchType.EXHAUSTIVE.name:
+            rotate_search_type = RotationSearchType.EXHAUSTIVE
+        elif rotate_search == RotationSearchType.COARSETOFINE.name:
+            rotate_search_type = RotationSearchType.COARSETOFINE
+        else:
+            message = f"Rotation search \"{rotate_search}\" not supported."
+            print(message, file=stderr)
+            if throw:
+                raise ValueError(message)
+            return 1
+
         # convert from degrees to radians
         max_rotation = max_rotation * DEG_TO_RAD
         min_rotation = min_rotation * DEG_TO_RAD
@@ -483,6 +503,7 @@ class GHEManager:
             rotate_step,
             property_boundary,
             no_go_boundaries,
+            rotate_search=rotate_search_type,
         )
         return 0
 
@@ -710,6 +731,8 @@ class GHEManager:
             d_des['max_boreholes'] = self._simulation_parameters.max_boreholes
         if self._simulation_parameters.continue_if_design_unmet is True:
             d_des['continue_if_design_unmet'] = self._simulation_parameters.continue_if_design_unmet
+        if self._simulation_parameters.workers != 1:
+            d_des['workers'] = self._simulation_parameters.workers
 
         # pipe data
         d_pipe = {'rho_cp': self._pipe.rhoCp, 'roughness': self._pipe.roughness}
@@ -766,12 +789,13 @@ class GHEManager:
         return 0
 
 
-def _run_manager_from_cli_worker(input_file_path: Path, output_directory: Path) -> int:
+def _run_manager_from_cli_worker(input_file_path: Path, output_directory: Path, workers: int | None = None) -> int:
     """
     Worker function to run simulation.
 
     :param input_file_path: path to input file. Input file must exist.
     :param output_directory: path to write output files. Output directory must be a valid path.
+    :param workers: number of worker processes. If None, the value from the input file is used.
     """
 
     # validate inputs against schema before doing anything
@@ -850,6 +874,8 @@ def _run_manager_from_cli_worker(input_file_path: Path, output_directory: Path)
     ghe.set_ground_loads_from_hourly_list(ground_load_props)
     max_bh = design_props.get("max_boreholes", None)
     continue_if_design_unmet = design_props.get("continue_if_design_unmet", False)
+    if workers is None:
+        workers = design_props.get("workers", 1)
     ghe.set_simulation_parameters(
         num_months=sim_props["num_months"],
         max_eft=design_props["max_eft"],
@@ -858,6 +884,7 @@ def _run_manager_from_cli_worker(input_file_path: Path, output_directory: Path)
         min_height=constraint_props["min_height"],
         max_boreholes=max_bh,
         continue_if_design_unmet=continue_if_design_unmet,
+        workers=workers,
     )
 
     if ghe.set_design_geometry_type(constraint_props["method"], throw=False) != 0:
@@ -910,6 +937,8 @@ def _run_manager_from_cli_worker(input_file_path: Path, output_directory: Path)
             rotate_step=constraint_props["rotate_step"],
             property_boundary=constraint_props["property_boundary"],
             no_go_boundaries=constraint_props["no_go_boundaries"],
+            rotate_search=constraint_props.get("rotate_search", "EXHAUSTIVE"),
+            throw=False,
         )
     else:
         print("Geometry constraint method not supported.", file=stderr)
@@ -930,7 +959,19 @@ def _run_manager_from_cli_worker(input_file_path: Path, output_directory: Path)
 @click.version_option(VERSION)
 @click.option("--validate-only", default=False, is_flag=True, show_default=False, help="Validate input file and exit.")
 @click.option("-c", "--convert", help="Convert output to specified format. Options supported: 'IDF'.")
-def run_manager_from_cli(input_path, output_directory, validate_only, convert):
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False),
+    default=None,
+    help="Reuse and store computed g-functions in this persistent cache directory.",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of worker processes. Overrides the 'workers' value in the input file.",
+)
+def run_manager_from_cli(input_path, output_directory, validate_only, convert, cache_dir, workers):
     input_path = Path(input_path).resolve()
 
     if validate_only:
@@ -962,7 +1003,10 @@ def run_manager_from_cli(input_path, output_directory, validate_only, convert):
 
     output_path = Path(output_directory).resolve()
 
-    return _run_manager_from_cli_worker(input_path, output_path)
+    if cache_dir is not None:
+        set_cache_directory(Path(cache_dir).resolve())
+
+    return _run_manager_from_cli_worker(input_path, output_path, workers)
 
 
 if __name__ == "__main__":
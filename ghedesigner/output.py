@@ -156,6 +156,8 @@ class OutputManager:
             return TimestepType.HYBRID.name
         if load_method == TimestepType.HOURLY:
             return TimestepType.HOURLY.name
+        if load_method == TimestepType.AGGREGATEDHOURLY:
+            return TimestepType.AGGREGATEDHOURLY.name
         warnings.warn("Load method not implemented")
         return ""
 
@@ -171,17 +173,16 @@ class OutputManager:
     ) -> dict:
         # gFunction LTS Table
         g_function_col_titles = ["ln(t/ts)"]
-        for g_function_name in list(design.ghe.gFunction.g_lts):
-            g_function_col_titles.append("H:" + str(round(g_function_name, 0)) + "m")
+        for height in design.ghe.gFunction.heights.tolist():
+            g_function_col_titles.append("H:" + str(round(height, 0)) + "m")
         g_function_col_titles.append("H:" + str(round(design.ghe.bhe.b.H, 2)) + "m")
         g_function_data = []
         ghe_gf = design.ghe.gFunction.g_function_interpolation(float(design.ghe.B_spacing) / design.ghe.bhe.b.H)[0]
         for i in range(len(design.ghe.gFunction.log_time)):
             gf_row = []
             gf_row.append(design.ghe.gFunction.log_time[i])
-            for g_function_name in list(design.ghe.gFunction.g_lts):
-                gf_row.append(design.ghe.gFunction.g_lts[g_function_name][i])
-            gf_row.append(ghe_gf[i])
+            gf_row.extend(design.ghe.gFunction.g_lts[:, i].tolist())
+            gf_row.append(float(ghe_gf[i]))
             g_function_data.append(gf_row)
 
         def add_with_units(val, units):
@@ -415,8 +416,8 @@ class OutputManager:
         g_function_table_formats.extend(gf_table_ff)
         g_function_col_titles = ["ln(t/ts)"]
 
-        for g_function_name in list(design.ghe.gFunction.g_lts):
-            g_function_col_titles.append("H:" + str(round(g_function_name, 0)) + "m")
+        for height in design.ghe.gFunction.heights.tolist():
+            g_function_col_titles.append("H:" + str(round(height, 0)) + "m")
         g_function_col_titles.append("H:" + str(round(design.ghe.bhe.b.H, 2)) + "m")
 
         g_function_data = []
@@ -424,9 +425,8 @@ class OutputManager:
         for i in range(len(design.ghe.gFunction.log_time)):
             gf_row = []
             gf_row.append(design.ghe.gFunction.log_time[i])
-            for g_function_name in list(design.ghe.gFunction.g_lts):
-                gf_row.append(design.ghe.gFunction.g_lts[g_function_name][i])
-            gf_row.append(ghe_gf[i])
+            gf_row.extend(design.ghe.gFunction.g_lts[:, i].tolist())
+            gf_row.append(float(ghe_gf[i]))
             g_function_data.append(gf_row)
 
         o += self.create_table(
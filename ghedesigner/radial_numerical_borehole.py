@@ -3,10 +3,12 @@ from math import exp, log, pi, sqrt
 
 import numpy as np
 from scipy.interpolate import interp1d
+from scipy.linalg import eigh_tridiagonal
 from scipy.linalg.lapack import dgtsv
 
 from ghedesigner.borehole_heat_exchangers import SingleUTube
 from ghedesigner.constants import SEC_IN_HR, TWO_PI
+from ghedesigner.enums import STSSolverType
 
 
 class CellProps(IntEnum):
@@ -25,10 +27,20 @@ class RadialNumericalBH:
     Exchangers with Variable Convective Resistance and Thermal Mass of the
     Fluid.' in Proceedings of the 10th International Conference on Thermal
     Energy Storage-EcoStock. Pomona, NJ, May 31-June 2.
+
+    The short time step response can be computed with either of two solvers:
+
+    - STSSolverType.MARCHING steps the implicit finite volume equations forward
+      in time, one 120 s step at a time.
+    - STSSolverType.MODAL diagonalizes the same constant-coefficient system once
+      and evaluates the implicit time steps in closed form, only at the samples
+      needed for the resampled g-function. It reproduces the marching solution to
+      round-off, at a fraction of the cost.
     """
 
-    def __init__(self, single_u_tube: SingleUTube):
+    def __init__(self, single_u_tube: SingleUTube, solver: STSSolverType = STSSolverType.MARCHING):
         self.single_u_tube = single_u_tube
+        self.solver = solver
 
         # "The one dimensional model has a fluid core, an equivalent convective
         # resistance layer, a tube layer, a grout layer and is surrounded by the
@@ -87,6 +99,8 @@ class RadialNumericalBH:
         # default is at least 49 hours, or up to -8.6 log time
         self.calc_time_in_sec = max([self.t_s * exp(-8.6), 49.0 * SEC_IN_HR])
         self.g_sts = None
+        # number of points in the resampled short time step g-function
+        self.num_sts_intervals = 30
 
     def partial_init(self, single_u_tube: SingleUTube):
         # TODO: unravel how to eliminate this.
@@ -173,23 +187,7 @@ class RadialNumericalBH:
 
         return radial_cells
 
-    def calc_sts_g_functions(self, single_u_tube, final_time=None) -> tuple:
-        self.partial_init(single_u_tube)
-
-        # effective borehole resistance
-        resist_bh_effective = self.single_u_tube.calc_effective_borehole_resistance()
-
-        # effective convection resistance, assumes 2 pipes
-        resist_f_effective = self.single_u_tube.R_f / 2.0
-
-        # effective combined pipe-grout resistance. assumes Rees 2016, eq. 3.6 applies
-        resist_pg_effective = resist_bh_effective - resist_f_effective
-
-        radial_cells = self.fill_radial_cells(resist_f_effective, resist_pg_effective)
-
-        if final_time is None:
-            final_time = self.calc_time_in_sec
-
+    def _marching_response(self, radial_cells: np.ndarray, resist_bh_effective: float, final_time: float) -> tuple:
         g = []
         g_bhw = []
         lntts = []
@@ -282,10 +280,85 @@ class RadialNumericalBH:
             if time >= final_time - time_step:
                 break
 
+        return lntts, g, g_bhw
+
+    def _modal_response(self, radial_cells: np.ndarray, resist_bh_effective: float, final_time: float) -> tuple:
+        # With a constant time step, the implicit equations solved by _marching_response are
+        #   (C / dt + K) T_n+1 = C / dt T_n + q
+        # with C the diagonal cell heat capacities, K the symmetric tridiagonal conductance matrix
+        # and the far-field cell held at its initial temperature. Decomposing C^-1/2 K C^-1/2 into its
+        # eigenmodes gives the temperature rise after n steps directly:
+        #   T_n - T_0 = sum_k w_k (1 - (1 + dt lambda_k) ^ -n)
+        time_step = 120
+        heat_flux = 1.0
+        num_unknowns = self.num_cells - 1
+
+        f_1 = np.log(radial_cells[CellProps.R_OUT, :] / radial_cells[CellProps.R_CENTER, :])
+        f_1 /= TWO_PI * radial_cells[CellProps.K, :]
+        f_2 = np.log(radial_cells[CellProps.R_CENTER, :] / radial_cells[CellProps.R_IN, :])
+        f_2 /= TWO_PI * radial_cells[CellProps.K, :]
+        conductance = 1.0 / (f_1[:-1] + f_2[1:])  # between cell i and i + 1
+
+        capacity = radial_cells[CellProps.RHO_CP, :num_unknowns] * radial_cells[CellProps.VOL, :num_unknowns]
+        scale = 1.0 / np.sqrt(capacity)
+        diagonal = conductance.copy()
+        diagonal[1:] += conductance[:-1]
+        # the cell sizes grow geometrically, so the eigenvalues span many orders of magnitude.
+        # MRRR (stemr) resolves the small ones to high relative accuracy, which the slow,
+        # long time modes depend on; the other LAPACK drivers lose several digits there.
+        eig_values, eig_vectors = eigh_tridiagonal(
+            diagonal * scale * scale, -conductance[:-1] * scale[:-1] * scale[1:], lapack_driver="stemr"
+        )
+
+        # modal weights of the fluid and borehole wall temperatures for a unit heat input to cell 0
+        out_idx = [0, self.bh_wall_idx]
+        modal_load = eig_vectors[0, :] * scale[0] * heat_flux / eig_values
+        weights = scale[out_idx][:, None] * eig_vectors[out_idx, :] * modal_load[None, :]
+
+        # the same time samples as the marching solution
+        num_steps = int(final_time / time_step) + 2
+        time = np.add.accumulate(np.append(1e-12 - time_step, np.full(num_steps, float(time_step))))[1:]
+        num_steps = int(np.argmax(time >= final_time - time_step)) + 1
+        lntts = np.log(time[:num_steps] / self.t_s)
+
+        # only the samples bracketing the resampled log-times are needed
+        uniform_lntts_vals = np.linspace(lntts[0], lntts[-1], self.num_sts_intervals)
+        upper = np.clip(np.searchsorted(lntts, uniform_lntts_vals), 1, num_steps - 1)
+        samples = np.unique(np.concatenate((upper - 1, upper)))
+
+        growth = -np.expm1(-np.outer(samples + 1, np.log1p(time_step * eig_values)))
+        delta_temps = growth @ weights.T
+
+        g = self.c_0 * (delta_temps[:, 0] / heat_flux - resist_bh_effective)
+        g_bhw = self.c_0 * (delta_temps[:, 1] / heat_flux)
+
+        return lntts[samples], g, g_bhw
+
+    def calc_sts_g_functions(self, single_u_tube, final_time=None) -> tuple:
+        self.partial_init(single_u_tube)
+
+        # effective borehole resistance
+        resist_bh_effective = self.single_u_tube.calc_effective_borehole_resistance()
+
+        # effective convection resistance, assumes 2 pipes
+        resist_f_effective = self.single_u_tube.R_f / 2.0
+
+        # effective combined pipe-grout resistance. assumes Rees 2016, eq. 3.6 applies
+        resist_pg_effective = resist_bh_effective - resist_f_effective
+
+        radial_cells = self.fill_radial_cells(resist_f_effective, resist_pg_effective)
+
+        if final_time is None:
+            final_time = self.calc_time_in_sec
+
+        if self.solver == STSSolverType.MODAL:
+            lntts, g, g_bhw = self._modal_response(radial_cells, resist_bh_effective, final_time)
+        else:
+            lntts, g, g_bhw = self._marching_response(radial_cells, resist_bh_effective, final_time)
+
         # quickly chop down the total values to a more manageable set
-        num_intervals = 30
         g_tmp = interp1d(lntts, g)
-        uniform_lntts_vals = np.linspace(lntts[0], lntts[-1], num_intervals)
+        uniform_lntts_vals = np.linspace(lntts[0], lntts[-1], self.num_sts_intervals)
         uniform_g_vals = g_tmp(uniform_lntts_vals)
 
         g_bhw_tmp = interp1d(lntts, g_bhw)
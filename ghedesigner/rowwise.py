@@ -1,10 +1,18 @@
-from math import atan, cos, pi, sin, sqrt
+import hashlib
+from contextlib import nullcontext
+from functools import partial
+from math import atan, ceil, cos, pi, sin, sqrt
 
 import numpy as np
+from scipy.spatial import cKDTree
 
+from ghedesigner.cache import get_cache, worker_pool
 from ghedesigner.constants import DEG_TO_RAD, PI_OVER_2, RAD_TO_DEG
+from ghedesigner.enums import RotationSearchType
 from ghedesigner.shape import Shapes, sort_intersections
 
+FIELD_CACHE_NAMESPACE = "rowwise_field"
+
 
 def gen_shape(prop_bound, ng_zones=None):
     """Returns an array of shapes objects representing the coordinates given"""
@@ -19,6 +27,140 @@ def gen_shape(prop_bound, ng_zones=None):
     return r_a
 
 
+def geometry_hash(prop_bound, ng_zones=None) -> str:
+    """Returns a digest of the property and no-go zone vertices"""
+    digest = hashlib.sha256(np.asarray(prop_bound.c, dtype=float).tobytes())
+    for ng_zone in ng_zones or []:
+        digest.update(b"|")
+        digest.update(np.asarray(ng_zone.c, dtype=float).tobytes())
+    return digest.hexdigest()
+
+
+def cached_field(field_cache, key):
+    """Returns a copy of the [field, field_name] stored under key in memory or in the persistent cache, or None"""
+    if field_cache is not None and key in field_cache:
+        field, field_name, _ = field_cache[key]
+        return [field.copy(), field_name]
+
+    cache = get_cache()
+    if cache is None:
+        return None
+    value = cache.get(FIELD_CACHE_NAMESPACE, key)
+    if value is None:
+        return None
+    field, field_name = np.array(value[0]), value[1]
+    if field_cache is not None:
+        field_cache[key] = (field, field_name, True)
+    return [field.copy(), field_name]
+
+
+def store_field(field_cache, key, field, field_name) -> None:
+    """Keeps a generated field in field_cache until save_fields is called, or writes it to the persistent cache
+    right away when there is no field_cache"""
+    if field_cache is not None:
+        field_cache[key] = (field.copy(), field_name, False)
+        return
+    cache = get_cache()
+    if cache is not None:
+        cache.put(FIELD_CACHE_NAMESPACE, key, [field, field_name])
+
+
+def save_fields(field_cache) -> None:
+    """Writes the fields generated since the last call to the persistent cache, e.g. once at the end of a search"""
+    cache = get_cache()
+    if cache is None:
+        return
+    for key, (field, field_name, saved) in field_cache.items():
+        if not saved:
+            cache.put(FIELD_CACHE_NAMESPACE, key, [field, field_name])
+            field_cache[key] = (field, field_name, True)
+
+
+def rotation_sweep(rotate_start, rotate_stop, rotate_step):
+    """Returns the rotations (rad) visited by the field optimizations, from rotate_start in rotate_step (degrees)
+    increments up to but excluding rotate_stop. The increments are accumulated exactly like a serial sweep."""
+    rotations = []
+    rt = rotate_start
+    while rt < rotate_stop:
+        rotations.append(rt)
+        rt += rotate_step * DEG_TO_RAD
+    return rotations
+
+
+def coarse_to_fine_indices(num_rotations, evaluate, refine_count=3):
+    """Samples a coarse grid of rotation indices and refines around the best ones down to single steps
+
+    Parameters:
+        num_rotations: number of rotations in the full sweep
+        evaluate: function taking a list of new rotation indices and returning their number of boreholes
+        refine_count: number of best rotations refined around at each level
+
+    Returns a dict mapping every evaluated rotation index to its number of boreholes.
+    """
+    stride = max(1, int(sqrt(num_rotations)))
+    indices = sorted({*range(0, num_rotations, stride), num_rotations - 1})
+    counts = dict(zip(indices, evaluate(indices)))
+
+    while stride > 1:
+        stride //= 2
+        # Ties go to the lower index, as they would in an exhaustive sweep
+        best = sorted(counts, key=lambda idx: (-counts[idx], idx))[:refine_count]
+        indices = sorted(
+            {idx + offset for idx in best for offset in (-stride, stride) if 0 <= idx + offset < num_rotations}
+            - counts.keys()
+        )
+        counts.update(zip(indices, evaluate(indices)))
+
+    return counts
+
+
+def best_rotation(generate, rotations, workers=1, rotate_search=RotationSearchType.EXHAUSTIVE, executor=None):
+    """Generates a field for the rotations and keeps the one with the most boreholes
+
+    Parameters:
+        generate: picklable function returning the borehole array of a field for a rotation (rad)
+        rotations: list of rotations (rad)
+        workers: number of worker processes the fields are generated in
+        rotate_search: EXHAUSTIVE generates every rotation, COARSETOFINE only a coarse grid refined around the best
+        rotations found
+        executor: process pool the fields are generated in, e.g. one shared by all the fields of a search. Without
+        one, a pool is started for this call when workers > 1
+
+    Returns the field and its rotation (degrees). Ties go to the first rotation in the list, as in a serial sweep.
+    """
+    use_pool = executor is None and workers > 1 and len(rotations) > 1
+    holes = {}
+
+    with worker_pool(min(workers, len(rotations))) if use_pool else nullcontext(executor) as pool:
+
+        def evaluate(indices):
+            batch = [rotations[idx] for idx in indices]
+            if pool is None:
+                fields = map(generate, batch)
+            else:
+                fields = pool.map(generate, batch, chunksize=ceil(len(batch) / (4 * max(workers, 1))))
+            holes.update(zip(indices, fields))
+            return [len(holes[idx]) for idx in indices]
+
+        if rotate_search == RotationSearchType.COARSETOFINE:
+            coarse_to_fine_indices(len(rotations), evaluate)
+        else:
+            evaluate(list(range(len(rotations))))
+
+    max_l = 0
+    max_hole = None
+    max_rt = None
+    for idx in sorted(holes):
+        hole = holes[idx]
+        # Assuming that the rotation with the maximum number of boreholes is most efficiently using space
+        if len(hole) > max_l:
+            max_l = len(hole)
+            max_rt = rotations[idx] * RAD_TO_DEG
+            max_hole = hole
+
+    return max_hole, max_rt
+
+
 def field_optimization_wp_space_fr(
     p_space,
     space_start,
@@ -27,6 +169,10 @@ def field_optimization_wp_space_fr(
     ng_zones=None,
     rotate_start=None,
     rotate_stop=None,
+    workers=1,
+    rotate_search=RotationSearchType.EXHAUSTIVE,
+    field_cache=None,
+    executor=None,
 ):
     """Optimizes a Field by iterating over input values w/o perimeter spacing
 
@@ -36,7 +182,11 @@ def field_optimization_wp_space_fr(
     boundary (counter clockwise) ng_zones([[[float,float]]]): 3d array representing the different zones on the
     property where no boreholes can be placed rotate_start(float): the rotation that the field will start at (-pi/2 <
     rotateStart < pi/2) rotate_stop(float): the rotation that the field will stop at (exclusive) (-pi/2 < rotateStop
-    < pi/2)
+    < pi/2) workers(int): number of worker processes the rotations are evaluated in
+    rotate_search(RotationSearchType): whether every rotation or a coarse-to-fine subset of them is evaluated
+    field_cache(dict): fields already generated, keyed on the geometry, spacing and rotation parameters. New fields
+    are only written to the persistent cache by save_fields
+    executor(ProcessPoolExecutor): process pool the rotations are evaluated in, see best_rotation
 
     Outputs: CSVs containing the coordinates for the max field for each target spacing, their respective graphs,
     and their respective data
@@ -49,40 +199,42 @@ def field_optimization_wp_space_fr(
     if rotate_start > PI_OVER_2 or rotate_start < -PI_OVER_2 or rotate_stop > PI_OVER_2 or rotate_stop < -PI_OVER_2:
         raise ValueError("Invalid Rotation")
 
+    key = (
+        "wp_space_fr",
+        geometry_hash(prop_bound, ng_zones),
+        space_start,
+        p_space,
+        rotate_step,
+        rotate_start,
+        rotate_stop,
+        rotate_search.name,
+    )
+    cached = cached_field(field_cache, key)
+    if cached is not None:
+        return cached
+
     space = space_start
-    rt = rotate_start
 
     y_s = space
     x_s = y_s
 
-    max_l = 0
-    max_hole = None
-    max_rt = None
-
-    while rt < rotate_stop:
-        hole = two_space_gen_bhc(
-            prop_bound,
-            y_s,
-            x_s,
-            rotate=rt,
-            no_go=ng_zones,
-            p_space=p_space * x_s,
-            intersection_tolerance=1e-5,
-        )
-
-        # Assuming that the rotation with the maximum number of boreholes is most efficiently using space
-        if len(hole) > max_l:
-            max_l = len(hole)
-            max_rt = rt * RAD_TO_DEG
-            max_hole = hole
-
-        rt += rotate_step * DEG_TO_RAD
+    generate = partial(
+        two_space_gen_bhc, prop_bound, y_s, x_s, ng_zones, p_space=p_space * x_s, intersection_tolerance=1e-5
+    )
+    max_hole, max_rt = best_rotation(
+        generate,
+        rotation_sweep(rotate_start, rotate_stop, rotate_step),
+        workers=workers,
+        rotate_search=rotate_search,
+        executor=executor,
+    )
 
     # Ensures that there are no repeated boreholes
     max_hole = np.array(remove_duplicates(max_hole, p_space * x_s))
 
     field = max_hole
     field_name = f"P{p_space:0.1f}_S{space:0.1f}_rt{max_rt:0.1f}"
+    store_field(field_cache, key, field, field_name)
     return [field, field_name]
 
 
@@ -94,6 +246,10 @@ def field_optimization_fr(
     rotate_start=None,
     rotate_stop=None,
     intersection_tolerance=1e-5,
+    workers=1,
+    rotate_search=RotationSearchType.EXHAUSTIVE,
+    field_cache=None,
+    executor=None,
 ):
     """Optimizes a Field by iterating over input values w/o perimeter spacing
 
@@ -103,6 +259,11 @@ def field_optimization_fr(
     float]]]): 3d array representing the different zones on the property where no boreholes can be placed
     rotate_start(float): the rotation that the field will start at (-pi/2 < rotateStart < pi/2) rotate_stop(float):
     the rotation that the field will stop at (exclusive) (-pi/2 < rotateStop < pi/2) intersection_tolerance:
+    workers(int): number of worker processes the rotations are evaluated in
+    rotate_search(RotationSearchType): whether every rotation or a coarse-to-fine subset of them is evaluated
+    field_cache(dict): fields already generated, keyed on the geometry, spacing and rotation parameters. New fields
+    are only written to the persistent cache by save_fields
+    executor(ProcessPoolExecutor): process pool the rotations are evaluated in, see best_rotation
 
     Outputs: CSVs containing the coordinates for the max field for each target spacing, their respective graphs,
     and their respective data
@@ -115,41 +276,44 @@ def field_optimization_fr(
     if rotate_start > PI_OVER_2 or rotate_start < -PI_OVER_2 or rotate_stop > PI_OVER_2 or rotate_stop < -PI_OVER_2:
         raise ValueError("Invalid Rotation")
 
+    key = (
+        "fr",
+        geometry_hash(prop_bound, ng_zones),
+        space_start,
+        intersection_tolerance,
+        rotate_step,
+        rotate_start,
+        rotate_stop,
+        rotate_search.name,
+    )
+    cached = cached_field(field_cache, key)
+    if cached is not None:
+        return cached
+
     # Target Spacing iterates
 
     space = space_start
-    rt = rotate_start
 
     y_s = space
     x_s = y_s
 
-    max_l = 0
-    max_hole = None
-    max_rt = None
-
-    while rt < rotate_stop:
-        hole = gen_borehole_config(
-            prop_bound,
-            y_s,
-            x_s,
-            rotate=rt,
-            no_go=ng_zones,
-            intersection_tolerance=intersection_tolerance,
-        )
-
-        # Assuming that the rotation with the maximum number of boreholes is most efficiently using space
-        if len(hole) > max_l:
-            max_l = len(hole)
-            max_rt = rt * RAD_TO_DEG
-            max_hole = hole
-
-        rt += rotate_step * DEG_TO_RAD
+    generate = partial(
+        gen_borehole_config, prop_bound, y_s, x_s, ng_zones, intersection_tolerance=intersection_tolerance
+    )
+    max_hole, max_rt = best_rotation(
+        generate,
+        rotation_sweep(rotate_start, rotate_stop, rotate_step),
+        workers=workers,
+        rotate_search=rotate_search,
+        executor=executor,
+    )
 
     # Ensures that there are no repeated boreholes
     max_hole = np.array(remove_duplicates(max_hole, x_s * 1.2))
 
     field = max_hole
     field_name = f"S_{space:0.1f}_rt{max_rt:0.1f}"
+    store_field(field_cache, key, field, field_name)
     return [field, field_name]
 
 
@@ -175,16 +339,15 @@ def find_duplicates(borefield, space, disp=False):
         A list of tuples where the tuples are pairs of duplicates
     """
 
+    # candidate pairs come from a KD-tree with a slightly larger radius, the exact check is the same as before
+    radius = space * 10**-1
+    points = np.asarray(borefield, dtype=float).reshape(-1, 2)
+    candidate_pairs = cKDTree(points).query_pairs(radius * (1.0 + 1e-6), output_type="ndarray")
     duplicate_pairs = []  # define an empty list to be appended to
-    for i, borehole_1 in enumerate(borefield):
-        for j in range(i, len(borefield)):  # only loop unique interactions
-            borehole_2 = borefield[j]
-            if i == j:  # skip the borehole itself
-                continue
-            else:
-                dist = sq_dist(borehole_1, borehole_2)
-            if abs(dist) < (space * 10**-1):
-                duplicate_pairs.append((i, j))
+    for i, j in sorted(candidate_pairs.tolist()):
+        dist = sq_dist(borefield[i], borefield[j])
+        if abs(dist) < radius:
+            duplicate_pairs.append((i, j))
     if disp:
         # pad with '-' align in center
         output = f"{'*gt.boreholes.find_duplicates()*' :-^50}"
@@ -224,9 +387,7 @@ def remove_duplicates(borefield, space, disp=False):
     new_borefield = []
 
     # values not to be included
-    duplicate_bores = []
-    for i in range(len(duplicate_pairs)):
-        duplicate_bores.append(duplicate_pairs[i][1])
+    duplicate_bores = {j for _, j in duplicate_pairs}
 
     for i in range(len(borefield)):
         if i in duplicate_bores:
@@ -307,21 +468,24 @@ def remove_points_too_close(field, holes, i_space, no_go_zones=None):
         holes: 2d array containing all the current boreholes
         i_space: Min spacing required from all edges
     """
-    field = field.c
-    len_field = len(field)
-    for i in range(len_field):
-        p1 = field[i]
-        p2 = field[0] if i == len_field - 1 else field[i + 1]
-        remove_points_close_too_line(p1, p2, holes, i_space)
-    if no_go_zones is not None:
-        len_no_go_zones = len(no_go_zones)
-        for i in range(len_no_go_zones):
-            ng = no_go_zones[i].c
-            len_ng = len(ng)
-            for j in range(len_ng):
-                p1 = ng[j]
-                p2 = ng[0] if j == len_ng - 1 else ng[j + 1]
-                remove_points_close_too_line(p1, p2, holes, i_space)
+    if len(holes) == 0:
+        return
+    edges = []
+    for boundary in [field, *(no_go_zones or [])]:
+        corners = boundary.c
+        edges.extend(zip(corners, np.roll(corners, -1, axis=0)))
+
+    points = np.asarray(holes, dtype=float)
+    tree = cKDTree(points)
+    too_close = np.zeros(len(points), dtype=bool)
+    for p1, p2 in edges:
+        # dist_from_line measures along the line from p1 in both directions, so every point it puts closer than
+        # i_space to the edge lies within the edge length plus i_space of p1
+        radius = (sq_dist(p1, p2) + i_space) * (1 + 1e-9)
+        candidates = np.asarray(tree.query_ball_point(p1, radius), dtype=int)
+        if len(candidates) > 0:
+            too_close[candidates[dist_from_line(p1, p2, points[candidates]) < i_space]] = True
+    holes[:] = [hole for hole, close in zip(holes, too_close) if not close]
 
 
 def remove_points_close_too_line(p1, p2, holes, i_space):
@@ -330,20 +494,14 @@ def remove_points_close_too_line(p1, p2, holes, i_space):
     Parameters:
         p1([float,float]): first point in line
         p2([float,float]): second point in line
-        holes: 2d array containing a bunch of points
+        holes: 2d array containing a bunch of points, modified in place
         i_space(float): distance cutoff for how close points can be
 
     """
-    len_holes = len(holes)
-    i = 0
-    while i < len_holes:
-        hole = holes[i]
-        dp = dist_from_line(p1, p2, hole)
-        if dp < i_space:
-            del holes[i]
-            len_holes -= 1
-        else:
-            i += 1
+    if len(holes) == 0:
+        return
+    dp = dist_from_line(p1, p2, np.asarray(holes, dtype=float))
+    holes[:] = [hole for hole, too_close in zip(holes, dp < i_space) if not too_close]
 
 
 def dist_from_line(p1, p2, other_point):
@@ -353,27 +511,34 @@ def dist_from_line(p1, p2, other_point):
     Parameter:
         p1: first point on the line
         p2: second point on the line
-        other_point: point which is being measured to
+        other_point: point which is being measured to, or an (n, 2) array of points
 
     """
+    other_point = np.asarray(other_point, dtype=float)
+    ox = other_point[..., 0]
+    oy = other_point[..., 1]
     dxl = p2[0] - p1[0]
     dyl = p2[1] - p1[1]
-    dx = p1[0] - other_point[0]
-    dy = p1[1] - other_point[1]
-    num = abs(dxl * dy - dx * dyl)
+    dx = p1[0] - ox
+    dy = p1[1] - oy
+    num = np.abs(dxl * dy - dx * dyl)
     den = sqrt(dxl * dxl + dyl * dyl)
     dp = num / den
     dist_l = sq_dist(p1, p2)
-    d01 = sq_dist(p1, other_point)
-    d02 = sq_dist(p2, other_point)
-    if d01 * d01 - dp * dp < 0:
-        return d01
-    if sqrt(d01 * d01 - dp * dp) / dist_l > 1:
-        return min(d01, d02)
-    if min(p1[0], p2[0]) < other_point[0] < max(p1[0], p2[0]) or min(p1[1], p2[1]) < other_point[1] < max(p1[1], p2[1]):
-        return min(d01, d02, dp)
-    else:
-        return min(d01, d02)
+    d01 = np.sqrt((p1[0] - ox) * (p1[0] - ox) + (p1[1] - oy) * (p1[1] - oy))
+    d02 = np.sqrt((p2[0] - ox) * (p2[0] - ox) + (p2[1] - oy) * (p2[1] - oy))
+    d_end = np.minimum(d01, d02)
+    within = ((min(p1[0], p2[0]) < ox) & (ox < max(p1[0], p2[0]))) | (
+        (min(p1[1], p2[1]) < oy) & (oy < max(p1[1], p2[1]))
+    )
+    with np.errstate(invalid="ignore"):
+        along = np.sqrt(d01 * d01 - dp * dp) / dist_l
+    dist = np.where(
+        d01 * d01 - dp * dp < 0,
+        d01,
+        np.where(along > 1, d_end, np.where(within, np.minimum(d_end, dp), d_end)),
+    )
+    return dist if dist.ndim else float(dist)
 
 
 def perimeter_distribute(field, space, r):
@@ -472,33 +637,35 @@ def gen_borehole_config(
     s = d / num_rows
     row_space = [-1 * s * cos(PI_OVER_2 - rotate), s * sin(PI_OVER_2 - rotate)]
 
-    # Establishes the dictionary where the boreholes will be added two as well as establishing a point on the first row
+    # Establishes the dictionary where the boreholes will be added two as well as establishing a point on each row
     boreholes = {}
-    row_point = [lowest_vert[0], lowest_vert[1]]
+    row_points_x = np.add.accumulate([lowest_vert[0]] + [row_space[0]] * num_rows)
+    row_points_y = np.add.accumulate([lowest_vert[1]] + [row_space[1]] * num_rows)
 
     # This is just a value that is combined with the slope of the row's to establish two points defining a row (could
     # be any value)
     point_shift = 1000.0
 
-    for _ in range(num_rows + 1):
-        # Row Defined by two points
-        if row_space[1] == 0:
-            row = [
-                row_point[0],
-                row_point[1],
-                row_point[0],
-                row_point[1] + point_shift,
-            ]
-        else:
-            row = [
-                row_point[0],
-                row_point[1],
-                row_point[0] + point_shift,
-                row_point[1] + (-row_space[0] / row_space[1]) * point_shift,
-            ]
+    # Rows Defined by two points
+    if row_space[1] == 0:
+        rows = np.column_stack((row_points_x, row_points_y, row_points_x, row_points_y + point_shift))
+    else:
+        rows = np.column_stack(
+            (
+                row_points_x,
+                row_points_y,
+                row_points_x + point_shift,
+                row_points_y + (-row_space[0] / row_space[1]) * point_shift,
+            )
+        )
 
-        # Gets Intersection between current row and property boundary
-        f_inters = field.line_intersect(row, rotate, intersection_tolerance)
+    # Gets Intersection between all rows and property boundary, and between all rows and the no-go zones (with the
+    # tolerance process_rows uses)
+    rows_f_inters = field.lines_intersect(rows, rotate, intersection_tolerance)
+    ng_rows_inters = [ng_shape.lines_intersect(rows, rotate, 1e-5) for ng_shape in no_go]
+
+    for ri, (row, f_inters) in enumerate(zip(rows.tolist(), rows_f_inters)):
+        ng_inters = [point for ng_inters in ng_rows_inters for point in ng_inters[ri]]
 
         # Stores the number of intersections with the row
         len_f_inters = len(f_inters)
@@ -594,6 +761,7 @@ def gen_borehole_config(
                     x_space,
                     boreholes,
                     rotate=rotate,
+                    no_go_inters=ng_inters,
                 )
 
                 i += 2
@@ -627,16 +795,15 @@ def gen_borehole_config(
                         x_space,
                         boreholes,
                         rotate=rotate,
+                        no_go_inters=ng_inters,
                     )
                 i += 1
-        row_point[0] += row_space[0]
-        row_point[1] += row_space[1]
     r_a = [boreholes[element] for element in boreholes]
     r_a = np.array(remove_duplicates(r_a, x_space))
     return r_a
 
 
-def process_rows(row, row_sx, row_ex, no_go, row_space, r_a, rotate, intersection_tolerance=1e-5):
+def process_rows(row, row_sx, row_ex, no_go, row_space, r_a, rotate, intersection_tolerance=1e-5, no_go_inters=None):
     """
     Function generates a row of the borefield
     *Note: the formatting from the rows can be a little unexpected. Some adjustment
@@ -651,6 +818,7 @@ def process_rows(row, row_sx, row_ex, no_go, row_space, r_a, rotate, intersectio
     :param r_a:
     :param rotate:
     :param intersection_tolerance:
+    :param no_go_inters: intersections of the row with the no-go zones, if already known
     """
 
     if no_go is None:
@@ -661,12 +829,13 @@ def process_rows(row, row_sx, row_ex, no_go, row_space, r_a, rotate, intersectio
         // row_space
     )
 
-    inters = [
-        point
-        for shape in no_go
-        for point in shape.line_intersect(row, rotate=rotate, intersection_tolerance=intersection_tolerance)
-    ]
-    inters = sort_intersections(inters, rotate)
+    if no_go_inters is None:
+        no_go_inters = [
+            point
+            for shape in no_go
+            for point in shape.line_intersect(row, rotate=rotate, intersection_tolerance=intersection_tolerance)
+        ]
+    inters = sort_intersections(no_go_inters, rotate)
     num_inters = len(inters)
 
     if num_inters > 1:  # noqa: SIM102
@@ -874,17 +1043,29 @@ def distribute(x1, x2, spacing, r, rotate):
         if len(r) == 0 or not (r[len(r) - 1][0] == (x1[0] + x2[0]) / 2 and r[len(r) - 1][1] == (x1[1] + x2[1]) / 2):
             r[len(r)] = [(x1[0] + x2[0]) / 2, (x1[1] + x2[1]) / 2]
         return
-    current_x = x1
     act_num_col = int(dx // spacing)
     act_space = dx / act_num_col
     tolerance = 1e-8
-    while (
-        sqrt((current_x[0] - x2[0]) * (current_x[0] - x2[0]) + (current_x[1] - x2[1]) * (current_x[1] - x2[1]))
-    ) >= tolerance:
-        if len(r) == 0 or not (r[len(r) - 1][0] == current_x[0] and r[len(r) - 1][1] == current_x[1]):
-            r[len(r)] = [current_x[0], current_x[1]]
-        current_x[0] += act_space * cos(rotate)
-        current_x[1] += act_space * sin(rotate)
+
+    # Steps along the row, accumulated one at a time, until a point lands on x2. Past x2 the points only get further
+    # away from it, so one step more than the expected number of columns is enough to look for it.
+    xs = np.add.accumulate([x1[0]] + [act_space * cos(rotate)] * (act_num_col + 1))
+    ys = np.add.accumulate([x1[1]] + [act_space * sin(rotate)] * (act_num_col + 1))
+    reached = np.flatnonzero(np.sqrt((xs - x2[0]) * (xs - x2[0]) + (ys - x2[1]) * (ys - x2[1])) < tolerance)
+    if len(reached) == 0:
+        raise ValueError("Row end is not reachable along the row direction.")
+    num_points = reached[0]
+
+    # Points are only added when they differ from the last borehole
+    xs = xs.tolist()
+    ys = ys.tolist()
+    for i in range(num_points):
+        if len(r) == 0 or not (r[len(r) - 1][0] == xs[i] and r[len(r) - 1][1] == ys[i]):
+            r[len(r)] = [xs[i], ys[i]]
+
+    # x1 is advanced in place up to x2, as callers share it
+    x1[0] = xs[num_points]
+    x1[1] = ys[num_points]
     if not (r[len(r) - 1][0] == x2[0] and r[len(r) - 1][1] == x2[1]):
         r[len(r)] = [x2[0], x2[1]]
     return
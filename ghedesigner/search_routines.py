@@ -1,16 +1,162 @@
-from math import ceil, sqrt
+from contextlib import nullcontext
+from copy import copy
+from functools import partial
+from math import ceil, floor, log2, sqrt
 from typing import Optional
 
 from ghedesigner.borehole_heat_exchangers import GHEBorehole
+from ghedesigner.cache import worker_pool
+from ghedesigner.coordinates import coordinates_hash
+from ghedesigner.domains import field_sizes
 from ghedesigner.enums import BHPipeType, FlowConfigType, TimestepType
 from ghedesigner.gfunction import calc_g_func_for_multiple_lengths
 from ghedesigner.ground_heat_exchangers import GHE
 from ghedesigner.media import GHEFluid, Grout, Pipe, Soil
-from ghedesigner.rowwise import field_optimization_fr, field_optimization_wp_space_fr, gen_shape
+from ghedesigner.rowwise import field_optimization_fr, field_optimization_wp_space_fr, gen_shape, save_fields
 from ghedesigner.simulation import SimulationParameters
 from ghedesigner.utilities import borehole_spacing, check_bracket, eskilson_log_times, sign
 
 
+def field_memo_key(coordinates, h: float, m_flow_borehole: float) -> tuple:
+    # identifies a simulated field within a search run
+    return coordinates_hash(coordinates), h, m_flow_borehole
+
+
+def field_excess(
+    coordinates,
+    h: float,
+    v_flow_system: float,
+    m_flow_borehole: float,
+    borehole: GHEBorehole,
+    bhe_type: BHPipeType,
+    log_time: list,
+    fluid: GHEFluid,
+    pipe: Pipe,
+    grout: Grout,
+    soil: Soil,
+    sim_params: SimulationParameters,
+    hourly_extraction_ground_loads: list,
+    method: TimestepType,
+    load_years: list,
+) -> tuple:
+    # Stand-alone equivalent of Bisection1D.calculate_excess, evaluated in worker processes.
+    # Returns the excess temperature and the maximum and minimum heat pump entering fluid temperatures.
+    borehole.H = h
+    b = borehole_spacing(borehole, coordinates)
+    g_function = calc_g_func_for_multiple_lengths(
+        b,
+        [borehole.H],
+        borehole.r_b,
+        borehole.D,
+        m_flow_borehole,
+        bhe_type,
+        log_time,
+        coordinates,
+        fluid,
+        pipe,
+        grout,
+        soil,
+    )
+    ghe = GHE(
+        v_flow_system,
+        b,
+        bhe_type,
+        fluid,
+        borehole,
+        pipe,
+        grout,
+        soil,
+        g_function,
+        sim_params,
+        hourly_extraction_ground_loads,
+        load_years=load_years,
+    )
+    max_hp_eft, min_hp_eft = ghe.simulate(method=method)
+    return ghe.cost(max_hp_eft, min_hp_eft), max_hp_eft, min_hp_eft
+
+
+def nested_domain_search(
+    coordinates_domain: list,
+    field_descriptors: list,
+    v_flow: float,
+    borehole: GHEBorehole,
+    bhe_type: BHPipeType,
+    fluid: GHEFluid,
+    pipe: Pipe,
+    grout: Grout,
+    soil: Soil,
+    sim_params: SimulationParameters,
+    hourly_extraction_ground_loads: list,
+    method: TimestepType,
+    flow_type: FlowConfigType,
+    max_iter: int,
+    field_type: str,
+    load_years: list,
+) -> Optional[tuple]:
+    # Stand-alone equivalent of one iteration of BisectionZD.search_successive, evaluated in worker
+    # processes. Returns the selection, the excess temperatures and search log of the bisection, the
+    # total drilling length of the sized selection and its GHE.sizing_state, or None if the search failed.
+    sim_params = copy(sim_params)
+    sim_params.workers = 1
+    try:
+        search = Bisection1D(
+            coordinates_domain,
+            field_descriptors,
+            v_flow,
+            borehole,
+            bhe_type,
+            fluid,
+            pipe,
+            grout,
+            soil,
+            sim_params,
+            hourly_extraction_ground_loads,
+            method=method,
+            flow_type=flow_type,
+            max_iter=max_iter,
+            field_type=field_type,
+            load_years=load_years,
+        )
+    except ValueError:
+        return None
+
+    search.ghe.compute_g_functions()
+    search.ghe.size(method=TimestepType.HYBRID)
+    total_drilling = len(search.selected_coordinates) * search.ghe.bhe.b.H
+    return (
+        search.selection_key,
+        search.selected_coordinates,
+        search.calculated_temperatures,
+        search.searchTracker,
+        total_drilling,
+        search.ghe.sizing_state,
+    )
+
+
+def bisection_probes(x_l_idx: int, x_r_idx: int, depth: int) -> list:
+    # Indices the integer bisection between x_l_idx and x_r_idx may visit in its next `depth` iterations,
+    # whichever way each comparison goes.
+    c_idx = ceil((x_l_idx + x_r_idx) / 2)
+    if depth <= 0 or c_idx in (x_l_idx, x_r_idx):
+        return []
+    return [c_idx, *bisection_probes(x_l_idx, c_idx, depth - 1), *bisection_probes(c_idx, x_r_idx, depth - 1)]
+
+
+def take_memoized_ghe(ghe_memo: dict, key: tuple, field_specifier: str) -> Optional[GHE]:
+    # Hands out a GHE built and simulated earlier in the search, at most once, since the caller is free
+    # to size it afterward. Its simulation results are cleared so that it is indistinguishable from
+    # a freshly initialized GHE.
+    ghe = ghe_memo.pop(key, None)
+    if ghe is not None:
+        ghe.bhe.b.H = key[1]
+        ghe.fieldSpecifier = field_specifier
+        ghe.times = []
+        ghe.loading = None
+        ghe.hp_eft = []
+        ghe.dTb = []
+    return ghe
+
+
 class Bisection1D:
     def __init__(
         self,
@@ -56,6 +202,8 @@ class Bisection1D:
         self.fieldDescriptors = field_descriptors
         self.max_iter = max_iter
         self.disp = disp
+        # HybridLoad objects shared by the candidate fields, see GHE
+        self.hybrid_load_cache = {}
 
         b = borehole_spacing(borehole, coordinates)
 
@@ -92,9 +240,14 @@ class Bisection1D:
             field_specifier=current_field,
             field_type=field_type,
             load_years=load_years,
+            hybrid_load_cache=self.hybrid_load_cache,
         )
 
         self.calculated_temperatures = {}
+        # Excess temperatures and simulated GHE objects of the fields evaluated during the search,
+        # keyed by field_memo_key
+        self.excess_memo = {}
+        self.ghe_memo = {}
 
         if search:
             self.selection_key, self.selected_coordinates = self.search()
@@ -115,6 +268,11 @@ class Bisection1D:
     def initialize_ghe(self, coordinates, h, field_specifier="N/A"):
         v_flow_system, m_flow_borehole = self.retrieve_flow(coordinates, self.ghe.bhe.fluid.rho)
 
+        ghe = take_memoized_ghe(self.ghe_memo, field_memo_key(coordinates, h, m_flow_borehole), field_specifier)
+        if ghe is not None:
+            self.ghe = ghe
+            return
+
         self.ghe.bhe.b.H = h
         borehole = self.ghe.bhe.b
         fluid = self.ghe.bhe.fluid
@@ -157,29 +315,83 @@ class Bisection1D:
             field_type=self.field_type,
             field_specifier=field_specifier,
             load_years=self.load_years,
+            hybrid_load_cache=self.hybrid_load_cache,
         )
 
+    def memo_key(self, coordinates, h) -> tuple:
+        _, m_flow_borehole = self.retrieve_flow(coordinates, self.ghe.bhe.fluid.rho)
+        return field_memo_key(coordinates, h, m_flow_borehole)
+
     def calculate_excess(self, coordinates, h, field_specifier="N/A"):
-        self.initialize_ghe(coordinates, h, field_specifier=field_specifier)
-        # Simulate after computing just one g-function
-        max_hp_eft, min_hp_eft = self.ghe.simulate(method=self.method)
-        t_excess = self.ghe.cost(max_hp_eft, min_hp_eft)
+        key = self.memo_key(coordinates, h)
+        if key in self.excess_memo:
+            t_excess, max_hp_eft, min_hp_eft = self.excess_memo[key]
+        else:
+            self.initialize_ghe(coordinates, h, field_specifier=field_specifier)
+            # Simulate after computing just one g-function
+            max_hp_eft, min_hp_eft = self.ghe.simulate(method=self.method)
+            t_excess = self.ghe.cost(max_hp_eft, min_hp_eft)
+            self.excess_memo[key] = (t_excess, max_hp_eft, min_hp_eft)
+            self.ghe_memo[key] = self.ghe
         self.searchTracker.append([field_specifier, t_excess, max_hp_eft, min_hp_eft])
 
         return t_excess
 
+    def prefetch_excess(self, fields: list) -> None:
+        """
+        Evaluates the excess temperature of several (coordinates, height) fields concurrently, using
+        sim_params.workers processes, and stores the results in the excess memo. The serial search then
+        finds them there, so its path, bookkeeping and selection are the same as without prefetching.
+        """
+        workers = self.sim_params.workers
+        borehole = self.ghe.bhe.b
+        tasks = {}
+        for coordinates, h in fields:
+            v_flow_system, m_flow_borehole = self.retrieve_flow(coordinates, self.ghe.bhe.fluid.rho)
+            key = self.memo_key(coordinates, h)
+            if key not in self.excess_memo and key not in tasks:
+                tasks[key] = (coordinates, h, v_flow_system, m_flow_borehole)
+        if workers <= 1 or len(tasks) <= 1:
+            return
+
+        evaluate = partial(
+            field_excess,
+            borehole=borehole,
+            bhe_type=self.bhe_type,
+            log_time=self.log_time,
+            fluid=self.ghe.bhe.fluid,
+            pipe=self.ghe.bhe.pipe,
+            grout=self.ghe.bhe.grout,
+            soil=self.ghe.bhe.soil,
+            sim_params=self.sim_params,
+            hourly_extraction_ground_loads=self.hourly_extraction_ground_loads,
+            method=self.method,
+            load_years=self.load_years,
+        )
+        with worker_pool(min(workers, len(tasks))) as executor:
+            futures = {key: executor.submit(evaluate, *args) for key, args in tasks.items()}
+            for key, future in futures.items():
+                self.excess_memo[key] = future.result()
+
     def search(self):
         x_l_idx = 0
 
         # find upper bound that respects max_boreholes
         if self.sim_params.max_boreholes is not None:
-            num_coordinates_in_each = [len(x) for x in self.coordinates_domain]
+            num_coordinates_in_each = field_sizes(self.coordinates_domain)
             x_r_idx = [idx for idx, x in enumerate(num_coordinates_in_each) if x < self.sim_params.max_boreholes][-1]
         else:
             x_r_idx = len(self.coordinates_domain) - 1
 
         if self.disp:
             print("Do some initial checks before searching.")
+        self.prefetch_excess(
+            [
+                (self.coordinates_domain[x_l_idx], self.sim_params.min_height),
+                (self.coordinates_domain[x_l_idx], self.sim_params.max_height),
+                (self.coordinates_domain[x_r_idx], self.sim_params.max_height),
+            ]
+        )
         # Get the lowest possible excess temperature from minimum height at the
         # smallest location in the domain
         t_0_lower = self.calculate_excess(
@@ -255,6 +467,9 @@ class Bisection1D:
 
         x_l_sign = sign(t_0_upper)
 
+        # with several workers, evaluate the next levels of the bisection tree at once, as many as fit
+        prefetch_depth = floor(log2(self.sim_params.workers + 1))
+
         i = 0
 
         while i < self.max_iter:
@@ -264,6 +479,11 @@ class Bisection1D:
             if c_idx in (x_l_idx, x_r_idx):
                 break
 
+            c_key = self.memo_key(self.coordinates_domain[c_idx], self.sim_params.max_height)
+            if prefetch_depth > 1 and c_key not in self.excess_memo:
+                probes = bisection_probes(x_l_idx, x_r_idx, min(prefetch_depth, self.max_iter - i))
+                self.prefetch_excess([(self.coordinates_domain[idx], self.sim_params.max_height) for idx in probes])
+
             c_t_excess = self.calculate_excess(
                 self.coordinates_domain[c_idx],
                 self.sim_params.max_height,
@@ -365,6 +585,16 @@ class RowWiseModifiedBisectionSearch:
         self.disp = disp
         self.ghe: Optional[GHE] = None
         self.calculated_temperatures = {}
+        # Excess temperatures and simulated GHE objects of the fields evaluated during the search,
+        # keyed by field_memo_key
+        self.excess_memo = {}
+        self.ghe_memo = {}
+        # HybridLoad objects shared by the candidate fields, see GHE
+        self.hybrid_load_cache = {}
+        # Fields generated for each target spacing, see rowwise.field_optimization_fr
+        self.field_cache = {}
+        # Process pool of the rotations while search runs
+        self.executor = None
         if advanced_tracking:
             self.advanced_tracking = [["TargetSpacing", "Field Specifier", "nbh", "ExcessTemperature"]]
             self.checkedFields = []
@@ -390,6 +620,11 @@ class RowWiseModifiedBisectionSearch:
     def initialize_ghe(self, coordinates, h, field_specifier="N/A"):
         v_flow_system, m_flow_borehole = self.retrieve_flow(coordinates, self.fluid.rho)
 
+        ghe = take_memoized_ghe(self.ghe_memo, field_memo_key(coordinates, h, m_flow_borehole), field_specifier)
+        if ghe is not None:
+            self.ghe = ghe
+            return
+
         self.borehole.H = h
         borehole = self.borehole
         fluid = self.fluid
@@ -432,18 +667,37 @@ class RowWiseModifiedBisectionSearch:
             field_type=self.fieldType,
             field_specifier=field_specifier,
             load_years=self.load_years,
+            hybrid_load_cache=self.hybrid_load_cache,
         )
 
     def calculate_excess(self, coordinates, h, field_specifier="N/A"):
-        self.initialize_ghe(coordinates, h, field_specifier=field_specifier)
-        # Simulate after computing just one g-function
-        max_hp_eft, min_hp_eft = self.ghe.simulate(method=self.method)
-        t_excess = self.ghe.cost(max_hp_eft, min_hp_eft)
+        _, m_flow_borehole = self.retrieve_flow(coordinates, self.fluid.rho)
+        key = field_memo_key(coordinates, h, m_flow_borehole)
+        if key in self.excess_memo:
+            t_excess, max_hp_eft, min_hp_eft = self.excess_memo[key]
+        else:
+            self.initialize_ghe(coordinates, h, field_specifier=field_specifier)
+            # Simulate after computing just one g-function
+            max_hp_eft, min_hp_eft = self.ghe.simulate(method=self.method)
+            t_excess = self.ghe.cost(max_hp_eft, min_hp_eft)
+            self.excess_memo[key] = (t_excess, max_hp_eft, min_hp_eft)
+            self.ghe_memo[key] = self.ghe
         self.searchTracker.append([field_specifier, t_excess, max_hp_eft, min_hp_eft])
 
         return t_excess
 
     def search(self):
+        # The rotations of all the fields are evaluated in one process pool, and the fields generated during the
+        # search are written to the persistent cache once, see rowwise.store_field
+        use_pool = self.sim_params.workers > 1
+        try:
+            with worker_pool(self.sim_params.workers) if use_pool else nullcontext() as self.executor:
+                return self.search_fields()
+        finally:
+            self.executor = None
+            save_fields(self.field_cache)
+
+    def search_fields(self):
         spacing_start = self.geometricConstraints.min_spacing
         spacing_stop = self.geometricConstraints.max_spacing
         spacing_step = self.geometricConstraints.spacing_step
@@ -454,6 +708,7 @@ class RowWiseModifiedBisectionSearch:
         rotate_start = self.geometricConstraints.min_rotation
         rotate_stop = self.geometricConstraints.max_rotation
         perimeter_spacing_ratio = self.geometricConstraints.perimeter_spacing_ratio
+        rotate_search = self.geometricConstraints.rotate_search
 
         use_perimeter = perimeter_spacing_ratio is not None
 
@@ -474,6 +729,10 @@ class RowWiseModifiedBisectionSearch:
                 ng_zones=ng_zones,
                 rotate_start=rotate_start,
                 rotate_stop=rotate_stop,
+                workers=self.sim_params.workers,
+                rotate_search=rotate_search,
+                field_cache=self.field_cache,
+                executor=self.executor,
             )
             lower_field, lower_field_specifier = field_optimization_wp_space_fr(
                 perimeter_spacing_ratio,
@@ -483,6 +742,10 @@ class RowWiseModifiedBisectionSearch:
                 ng_zones=ng_zones,
                 rotate_start=rotate_start,
                 rotate_stop=rotate_stop,
+                workers=self.sim_params.workers,
+                rotate_search=rotate_search,
+                field_cache=self.field_cache,
+                executor=self.executor,
             )
         else:
             upper_field, upper_field_specifier = field_optimization_fr(
@@ -492,6 +755,10 @@ class RowWiseModifiedBisectionSearch:
                 ng_zones=ng_zones,
                 rotate_start=rotate_start,
                 rotate_stop=rotate_stop,
+                workers=self.sim_params.workers,
+                rotate_search=rotate_search,
+                field_cache=self.field_cache,
+                executor=self.executor,
             )
             lower_field, lower_field_specifier = field_optimization_fr(
                 spacing_stop,
@@ -500,6 +767,10 @@ class RowWiseModifiedBisectionSearch:
                 ng_zones=ng_zones,
                 rotate_start=rotate_start,
                 rotate_stop=rotate_stop,
+                workers=self.sim_params.workers,
+                rotate_search=rotate_search,
+                field_cache=self.field_cache,
+                executor=self.executor,
             )
 
         # Get Excess Temperatures
@@ -554,6 +825,10 @@ class RowWiseModifiedBisectionSearch:
                         ng_zones=ng_zones,
                         rotate_start=rotate_start,
                         rotate_stop=rotate_stop,
+                        workers=self.sim_params.workers,
+                        rotate_search=rotate_search,
+                        field_cache=self.field_cache,
+                        executor=self.executor,
                     )
                 else:
                     f1, f1_specifier = field_optimization_fr(
@@ -563,6 +838,10 @@ class RowWiseModifiedBisectionSearch:
                         ng_zones=ng_zones,
                         rotate_start=rotate_start,
                         rotate_stop=rotate_stop,
+                        workers=self.sim_params.workers,
+                        rotate_search=rotate_search,
+                        field_cache=self.field_cache,
+                        executor=self.executor,
                     )
 
                 # Getting the three field's excess temperature
@@ -601,6 +880,9 @@ class RowWiseModifiedBisectionSearch:
             best_drilling = float("inf")
             best_excess = None
             best_spacing = None
+            # Neighbouring target spacings often produce the same layout, which only needs to be sized once
+            sized_drilling = {}
+            sizing_state = None
             for ts in target_spacings:
                 if use_perimeter:
                     field, f_s = field_optimization_wp_space_fr(
@@ -611,6 +893,10 @@ class RowWiseModifiedBisectionSearch:
                         ng_zones=ng_zones,
                         rotate_start=rotate_start,
                         rotate_stop=rotate_stop,
+                        workers=self.sim_params.workers,
+                        rotate_search=rotate_search,
+                        field_cache=self.field_cache,
+                        executor=self.executor,
                     )
                 else:
                     field, f_s = field_optimization_fr(
@@ -620,6 +906,10 @@ class RowWiseModifiedBisectionSearch:
                         ng_zones=ng_zones,
                         rotate_start=rotate_start,
                         rotate_stop=rotate_stop,
+                        workers=self.sim_params.workers,
+                        rotate_search=rotate_search,
+                        field_cache=self.field_cache,
+                        executor=self.executor,
                     )
 
                 t_e = self.calculate_excess(field, self.sim_params.max_height, field_specifier=f_s)
@@ -628,10 +918,16 @@ class RowWiseModifiedBisectionSearch:
                     self.advanced_tracking.append([ts, f_s, len(field), t_e])
                     self.checkedFields.append(field)
 
-                self.initialize_ghe(field, self.sim_params.max_height, field_specifier=f_s)
-                self.ghe.compute_g_functions()
-                self.ghe.size(method=TimestepType.HYBRID)
-                total_drilling = self.ghe.bhe.b.H * len(field)
+                layout = tuple(tuple(xy) for xy in field)
+                if layout in sized_drilling:
+                    total_drilling = sized_drilling[layout]
+                else:
+                    self.initialize_ghe(field, self.sim_params.max_height, field_specifier=f_s)
+                    self.ghe.compute_g_functions()
+                    self.ghe.size(method=TimestepType.HYBRID, prior=sizing_state)
+                    sizing_state = self.ghe.sizing_state
+                    total_drilling = self.ghe.bhe.b.H * len(field)
+                    sized_drilling[layout] = total_drilling
 
                 if best_field is None:
                     best_field = field
@@ -887,29 +1183,95 @@ class BisectionZD(Bisection1D):
 
         self.selection_key, self.selected_coordinates = self.search_successive()
 
+    def search_nested_domains(self, domain_indices: list):
+        """
+        Runs the searches of search_successive for several nested domains concurrently, using
+        sim_params.workers processes. Yields the nested_domain_search result of each domain index, in order.
+        At most as many domains as workers are searched ahead of the result that is yielded, and the
+        searches that have not started are cancelled when the generator is closed.
+        """
+        search = partial(
+            nested_domain_search,
+            v_flow=self.V_flow,
+            borehole=self.ghe.bhe.b,
+            bhe_type=self.bhe_type,
+            fluid=self.ghe.bhe.fluid,
+            pipe=self.ghe.bhe.pipe,
+            grout=self.ghe.bhe.grout,
+            soil=self.ghe.bhe.soil,
+            sim_params=self.sim_params,
+            hourly_extraction_ground_loads=self.hourly_extraction_ground_loads,
+            method=self.method,
+            flow_type=self.flow_type,
+            max_iter=self.max_iter,
+            field_type=self.field_type,
+            load_years=self.load_years,
+        )
+        workers = min(self.sim_params.workers, len(domain_indices))
+        executor = worker_pool(workers)
+        try:
+            futures = []
+            for idx in domain_indices:
+                futures.append(
+                    executor.submit(search, self.coordinates_domain_nested[idx], self.nested_fieldDescriptors[idx])
+                )
+                if len(futures) == workers:
+                    yield futures.pop(0).result()
+            for future in futures:
+                yield future.result()
+        finally:
+            executor.shutdown(cancel_futures=True)
+
     def search_successive(self, max_iter=None):
         if max_iter is None:
             max_iter = self.selection_key_outer + 7
 
         i = self.selection_key_outer
 
+        # With several workers, search the candidate domains ahead of the loop below, which applies the
+        # same stopping and selection rules to the results, in order.
+        domain_indices = list(range(i, min(len(self.coordinates_domain_nested), max_iter)))
+        nested_results = None
+        if self.sim_params.workers > 1 and len(domain_indices) > 1:
+            nested_results = self.search_nested_domains(domain_indices)
+
         old_height = 99999
+        # The domains are sized independently, as they are when searched concurrently, so that the selection
+        # does not depend on the number of workers. The final sizing starts from the solution of the selected
+        # domain, see GHE.size.
+        sizing_states = {}
 
         while i < len(self.coordinates_domain_nested) and i < max_iter:
             self.coordinates_domain = self.coordinates_domain_nested[i]
             self.fieldDescriptors = self.nested_fieldDescriptors[i]
             self.calculated_temperatures = {}
-            try:
-                selection_key, selected_coordinates = self.search()
-            except ValueError:
-                break
-            self.calculated_temperatures_nested[i] = self.calculated_temperatures
+            if nested_results is None:
+                try:
+                    selection_key, selected_coordinates = self.search()
+                except ValueError:
+                    break
+
+                self.ghe.compute_g_functions()
+                self.ghe.size(method=TimestepType.HYBRID)
+                sizing_states[i] = self.ghe.sizing_state
 
-            self.ghe.compute_g_functions()
-            self.ghe.size(method=TimestepType.HYBRID)
+                nbh = len(selected_coordinates)
+                total_drilling = nbh * self.ghe.bhe.b.H
+            else:
+                nested_result = next(nested_results)
+                if nested_result is None:
+                    break
+                (
+                    selection_key,
+                    selected_coordinates,
+                    self.calculated_temperatures,
+                    search_tracker,
+                    total_drilling,
+                    sizing_states[i],
+                ) = nested_result
+                self.searchTracker.extend(search_tracker)
 
-            nbh = len(selected_coordinates)
-            total_drilling = nbh * self.ghe.bhe.b.H
+            self.calculated_temperatures_nested[i] = self.calculated_temperatures
             self.calculated_heights[i] = total_drilling
 
             if old_height < total_drilling:
@@ -919,6 +1281,10 @@ class BisectionZD(Bisection1D):
 
             i += 1
 
+        if nested_results is not None:
+            # stop the searches of the domains past the selection
+            nested_results.close()
+
         keys = list(self.calculated_heights.keys())
         values = list(self.calculated_heights.values())
 
@@ -943,6 +1309,6 @@ class BisectionZD(Bisection1D):
             field_specifier=self.nested_fieldDescriptors[selection_key_outer][selection_key],
         )
         self.ghe.compute_g_functions()
-        self.ghe.size(method=TimestepType.HYBRID)
+        self.ghe.size(method=TimestepType.HYBRID, prior=sizing_states.get(selection_key_outer))
 
         return selection_key, selected_coordinates
@@ -21,6 +21,8 @@ class Shapes:
         self.min_x = min(xs)
         self.max_y = max(ys)
         self.min_y = min(ys)
+        # x1, y1, x2, y2 of each edge, the last one closing the polygon
+        self.edges = np.hstack((self.c, np.roll(self.c, -1, axis=0))).astype(float)
 
     def line_intersect(self, xy, rotate=0, intersection_tolerance=1e-6):
         """
@@ -36,52 +38,24 @@ class Shapes:
         :return: [[float]]
             the x,y values of the intersections
         """
-        x1, y1, x2, y2 = xy
-        r_a = []
-        for i in range(len(self.c)):
-            if i == len(self.c) - 1:
-                c1 = self.c[len(self.c) - 1]
-                c2 = self.c[0]
-                r = vector_intersect(
-                    [c1[0], c1[1], c2[0], c2[1]],
-                    [x1, y1, x2, y2],
-                    intersection_tolerance,
-                )
-                # print(r)
-                if len(r) == 1:
-                    r = r[0]
-                    if (
-                        (r[0] - max(c2[0], c1[0])) > intersection_tolerance
-                        or (r[0] - min(c2[0], c1[0])) < -1 * intersection_tolerance
-                        or (r[1] - max(c2[1], c1[1])) > intersection_tolerance
-                        or (r[1] - min(c2[1], c1[1])) < -1 * intersection_tolerance
-                    ):
-                        continue
-                    r_a.append(r)
-            else:
-                c1 = self.c[i]
-                c2 = self.c[i + 1]
-                r = vector_intersect(
-                    [c1[0], c1[1], c2[0], c2[1]],
-                    [x1, y1, x2, y2],
-                    intersection_tolerance,
-                )
-                if len(r) == 1:
-                    r = r[0]
-                    if (
-                        (r[0] - max(c2[0], c1[0])) > intersection_tolerance
-                        or (r[0] - min(c2[0], c1[0])) < -1 * intersection_tolerance
-                        or (r[1] - max(c2[1], c1[1])) > intersection_tolerance
-                        or (r[1] - min(c2[1], c1[1])) < -1 * intersection_tolerance
-                    ):
-                        continue
-                    r_a.append(r)
-        # print("x value: %f, r values:"%x1)
-        # print(r_a)
-
-        r_a = sort_intersections(r_a, rotate)
-        # print(r_a)
-        return r_a
+        return self.lines_intersect([xy], rotate, intersection_tolerance)[0]
+
+    def lines_intersect(self, lines, rotate=0, intersection_tolerance=1e-6):
+        """
+        returns the intersections between each of a set of line segments and the shape
+
+        Parameters
+        -----------
+        :param lines: [[float,float,float,float]]
+            the x,y values of both endpoints of each line segment
+        :param rotate:
+        :param intersection_tolerance:
+
+        :return: [[[float]]]
+            the x,y values of the intersections of each line, sorted along the rotated x-axis
+        """
+        points, found = lines_edges_intersect(self.edges, np.asarray(lines, dtype=float), intersection_tolerance)
+        return [sort_intersections(p[f].tolist(), rotate) for p, f in zip(points, found)]
 
     def point_intersect(self, xy):
         """
@@ -204,6 +178,52 @@ def vector_intersect(l1, l2, intersection_tolerance):
     return [[rx, ry]]
 
 
+def lines_edges_intersect(edges, lines, intersection_tolerance):
+    """
+    intersects every line with every edge, following the same arithmetic as vector_intersect
+
+    Parameters
+    -----------
+    :param edges: (m, 4) array
+        endpoints of the edges
+    :param lines: (n, 4) array
+        two points on each of the lines
+    :param intersection_tolerance:
+
+    :return: (n, m, 2) array, (n, m) boolean array
+        x,y values of the intersections of the lines with the lines through the edges, and whether each of them is a
+        single intersection within the edge
+    """
+    x11, y11, x12, y12 = (v[None, :] for v in edges.T)
+    x21, y21, x22, y22 = (v[:, None] for v in lines.T)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        edge_vertical = x12 - x11 == 0
+        a1 = (y12 - y11) / (x12 - x11)
+        c1 = y11 - x11 * a1
+        line_vertical = x22 - x21 == 0
+        a2 = (y22 - y21) / (x22 - x21)
+        c2 = y21 - x21 * a2
+
+        rx = (c2 - c1) / (a1 - a2)
+        ry = a1 * (c2 - c1) / (a1 - a2) + c1
+        rx = np.where(edge_vertical, x11, np.where(line_vertical, x21, rx))
+        ry = np.where(edge_vertical, a2 * x11 + c2, np.where(line_vertical, a1 * x21 + c1, ry))
+
+        # parallel lines (including two vertical ones) do not count as a single intersection
+        found = np.where(
+            edge_vertical | line_vertical, edge_vertical != line_vertical, np.abs(a1 - a2) > intersection_tolerance
+        )
+        found &= ~(
+            (rx - np.maximum(x11, x12) > intersection_tolerance)
+            | (rx - np.minimum(x11, x12) < -1 * intersection_tolerance)
+            | (ry - np.maximum(y11, y12) > intersection_tolerance)
+            | (ry - np.minimum(y11, y12) < -1 * intersection_tolerance)
+        )
+
+    return np.stack((rx, ry), axis=-1), found
+
+
 def point_polygon_check(contour, point, on_edge_tolerance=0.001):
     """
     Mimics pointPolygonTest from OpenCV-Python
@@ -267,3 +287,44 @@ def point_polygon_check(contour, point, on_edge_tolerance=0.001):
                 inside = not inside
 
     return -1 if inside else 1
+
+
+def points_polygon_check(contours, points, on_edge_tolerance=0.001):
+    """
+    Classifies many points against many polygons at once, with the same results as point_polygon_check
+
+    :param contours: list of contours, each a list of tuples containing (x, y) contour boundary points
+    :param points: list of tuples containing the (x, y) points to test
+
+    :returns: array of shape (number of contours, number of points) holding -1 if outside, 0 if on edge, 1 if inside
+    :rtype: numpy.ndarray
+    """
+
+    # edges of all contours back to back, from vertex idx - 1 to vertex idx as in point_polygon_check
+    contours = [np.asarray(contour, dtype=float) for contour in contours]
+    v1 = np.concatenate([np.roll(contour, 1, axis=0) for contour in contours])
+    v2 = np.concatenate(contours)
+    starts = np.cumsum([0] + [len(contour) for contour in contours[:-1]])
+
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    px = points[:, 0:1]
+    py = points[:, 1:2]
+    v1x, v1y, v2x, v2y = v1[:, 0], v1[:, 1], v2[:, 0], v2[:, 1]
+
+    # check if on edge, the distances to both vertices adding up to the edge length
+    test_dist = np.sqrt((v1x - px) ** 2 + (v1y - py) ** 2) + np.sqrt((v2x - px) ** 2 + (v2y - py) ** 2)
+    v12_dist = np.sqrt((v1x - v2x) ** 2 + (v1y - v2y) ** 2)
+    on_edge = np.abs(test_dist - v12_dist) < on_edge_tolerance
+
+    # edges crossed by a ray from the point, counting vertices on the ray only once
+    between = ((py >= v1y) & (py <= v2y)) | ((py <= v1y) & (py >= v2y))
+    skip = ((py == v1y) & (v2y >= v1y)) | ((py == v2y) & (v1y >= v2y))
+    c = (v1x - px) * (v2y - py) - (v2x - px) * (v1y - py)
+    counted = between & ~skip
+    on_edge |= counted & (c == 0)
+    crossings = counted & ((v1y < v2y) == (c > 0))
+
+    on_edge = np.logical_or.reduceat(on_edge, starts, axis=1)
+    odd = np.add.reduceat(crossings.astype(int), starts, axis=1) % 2 == 1
+
+    return np.where(on_edge, 0, np.where(odd, 1, -1)).T
@@ -9,6 +9,7 @@ class SimulationParameters:
         min_height,
         max_boreholes=None,
         continue_if_design_unmet=False,
+        workers=1,
     ):
         # Simulation parameters not found in other objects
         # ------------------------------------------------
@@ -23,6 +24,8 @@ class SimulationParameters:
         self.min_height = min_height  # in meters
         self.max_boreholes = max_boreholes
         self.continue_if_design_unmet = continue_if_design_unmet
+        # Number of worker processes available for independent calculations
+        self.workers = workers
 
     def as_dict(self) -> dict:
         output = {}
@@ -0,0 +1,197 @@
+import multiprocessing
+import os
+from tempfile import TemporaryDirectory
+
+from click.testing import CliRunner
+
+from ghedesigner.borehole import GHEBorehole
+from ghedesigner.borehole_heat_exchangers import SingleUTube
+from ghedesigner.cache import DiskCache, get_cache, run_cache_cli, set_cache_directory, worker_pool
+from ghedesigner.coordinates import rectangle
+from ghedesigner.enums import BHPipeType
+from ghedesigner.gfunction import G_FUNCTION_CACHE_NAMESPACE, calc_g_func_for_multiple_lengths
+from ghedesigner.ground_loads import PEAK_DURATION_CACHE_NAMESPACE, HybridLoad
+from ghedesigner.media import GHEFluid, Grout, Pipe, Soil
+from ghedesigner.radial_numerical_borehole import RadialNumericalBH
+from ghedesigner.rowwise import FIELD_CACHE_NAMESPACE, field_optimization_fr, gen_shape, save_fields
+from ghedesigner.simulation import SimulationParameters
+from ghedesigner.tests.test_base_case import GHEBaseTest
+from ghedesigner.utilities import eskilson_log_times
+
+
+class TestDiskCache(GHEBaseTest):
+    def setUp(self) -> None:
+        super().setUp()
+        self.tmp_dir = TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def test_put_and_get(self):
+        cache = DiskCache(self.tmp_dir.name)
+        payload = {"h": 100.0, "coordinates": [[0.0, 0.0], [5.0, 0.0]]}
+        self.assertIsNone(cache.get("test", payload))
+        cache.put("test", payload, [1.0, 2.5, 3.25])
+        self.assertEqual(cache.get("test", payload), [1.0, 2.5, 3.25])
+        self.assertIsNone(cache.get("test", {"h": 101.0, "coordinates": [[0.0, 0.0], [5.0, 0.0]]}))
+        self.assertIsNone(cache.get("other", payload))
+
+    def test_corrupted_entry_is_a_miss(self):
+        cache = DiskCache(self.tmp_dir.name)
+        cache.put("test", 1, [1.0])
+        path = cache.entry_path("test", cache.make_key("test", 1))
+        path.write_text("{not json")
+        self.assertIsNone(cache.get("test", 1))
+        self.assertFalse(path.exists())
+
+    def test_lru_eviction(self):
+        cache = DiskCache(self.tmp_dir.name)
+        for i in range(4):
+            cache.put("test", i, list(range(100)))
+            path = cache.entry_path("test", cache.make_key("test", i))
+            os.utime(path, (i, i))
+
+        # touching the oldest entry makes it the most recently used one
+        cache.get("test", 0)
+        entry_size = cache.entries()[0][1]
+        num_removed = cache.prune(max_size_mb=2.5 * entry_size / 1024 / 1024)
+        self.assertEqual(num_removed, 2)
+        self.assertIsNotNone(cache.get("test", 0))
+        self.assertIsNone(cache.get("test", 1))
+        self.assertIsNone(cache.get("test", 2))
+        self.assertIsNotNone(cache.get("test", 3))
+
+    def test_put_cost_is_bounded(self):
+        class CountingCache(DiskCache):
+            num_scans = 0
+
+            def entries(self, namespace=None):
+                self.num_scans += 1
+                return super().entries(namespace)
+
+        # puts below the cap never scan the cache once the size index exists
+        cache = CountingCache(self.tmp_dir.name)
+        for i in range(300):
+            cache.put("test", i, [float(i)])
+        self.assertEqual(cache.num_scans, 1)
+        self.assertEqual(int(cache.size_index_path.read_text()), cache.size())
+
+        # over the cap, each eviction frees enough space for many further puts
+        entry_size = cache.entries()[0][1]
+        cache = CountingCache(self.tmp_dir.name, max_size_mb=200 * entry_size / 1024 / 1024)
+        for i in range(300, 1300):
+            cache.put("test", i, [float(i)])
+        self.assertLess(cache.num_scans, 100)
+        self.assertLessEqual(cache.size(), cache.max_size_bytes)
+        self.assertEqual(int(cache.size_index_path.read_text()), cache.size())
+
+    def test_cli(self):
+        cache = DiskCache(self.tmp_dir.name)
+        cache.put("test", 1, [1.0])
+        runner = CliRunner()
+        result = runner.invoke(run_cache_cli, ["--cache-dir", self.tmp_dir.name, "info"])
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn("test: 1 entries", result.output)
+        result = runner.invoke(run_cache_cli, ["--cache-dir", self.tmp_dir.name, "prune", "--max-size-mb", "-5"])
+        self.assertNotEqual(result.exit_code, 0)
+        self.assertEqual(len(cache.entries()), 1)
+        result = runner.invoke(run_cache_cli, ["--cache-dir", self.tmp_dir.name, "clear"])
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(len(cache.entries()), 0)
+
+    def test_worker_pool(self):
+        set_cache_directory(self.tmp_dir.name, max_size_mb=8.0)
+        self.addCleanup(set_cache_directory, None)
+        # spawned workers do not inherit the cache setting of this process
+        with worker_pool(1, mp_context=multiprocessing.get_context("spawn")) as executor:
+            cache = executor.submit(get_cache).result()
+        self.assertEqual(cache.directory, get_cache().directory)
+        self.assertEqual(cache.max_size_bytes, get_cache().max_size_bytes)
+
+    def test_g_function_reuse(self):
+        set_cache_directory(self.tmp_dir.name)
+        self.addCleanup(set_cache_directory, None)
+        cache = get_cache()
+
+        pipe = Pipe(Pipe.place_pipes(0.01856, 0.02108, 1), 0.01702, 0.02108, 0.01856, 1.0e-6, 0.4, 1542000.0)
+        args = {
+            "b": 5.0,
+            "h_values": [24.0, 96.0],
+            "r_b": 0.07,
+            "depth": 2.0,
+            "m_flow_borehole": 0.2,
+            "bhe_type": BHPipeType.SINGLEUTUBE,
+            "log_time": eskilson_log_times(),
+            "coordinates": rectangle(2, 2, 5.0, 5.0),
+            "fluid": GHEFluid(fluid_str="Water", percent=0.0),
+            "pipe": pipe,
+            "grout": Grout(1.0, 3901000.0),
+            "soil": Soil(2.0, 2343493.0, 18.3),
+        }
+
+        g_computed = calc_g_func_for_multiple_lengths(**args)
+        self.assertEqual(len(cache.entries(G_FUNCTION_CACHE_NAMESPACE)), 2)
+
+        g_cached = calc_g_func_for_multiple_lengths(**args)
+        self.assertEqual(g_computed.g_lts.tolist(), g_cached.g_lts.tolist())
+        self.assertEqual(len(cache.entries(G_FUNCTION_CACHE_NAMESPACE)), 2)
+
+        args["soil"] = Soil(2.5, 2343493.0, 18.3)
+        calc_g_func_for_multiple_lengths(**args)
+        self.assertEqual(len(cache.entries(G_FUNCTION_CACHE_NAMESPACE)), 4)
+
+    def test_rowwise_field_reuse(self):
+        set_cache_directory(self.tmp_dir.name)
+        self.addCleanup(set_cache_directory, None)
+        cache = get_cache()
+
+        prop_bound, ng_zones = gen_shape([[1.0, 1.0], [81.0, 1.0], [81.0, 51.0], [1.0, 61.0]])
+        field_computed, name_computed = field_optimization_fr(10.0, 5.0, prop_bound, ng_zones=ng_zones)
+        self.assertEqual(len(cache.entries(FIELD_CACHE_NAMESPACE)), 1)
+
+        # a fresh in-memory cache still picks the field up from disk
+        field_cache = {}
+        field_cached, name_cached = field_optimization_fr(
+            10.0, 5.0, prop_bound, ng_zones=ng_zones, field_cache=field_cache
+        )
+        self.assertEqual(field_computed.tolist(), field_cached.tolist())
+        self.assertEqual(name_computed, name_cached)
+        self.assertEqual(len(field_cache), 1)
+        self.assertEqual(len(cache.entries(FIELD_CACHE_NAMESPACE)), 1)
+
+        field_optimization_fr(11.0, 5.0, prop_bound, ng_zones=ng_zones)
+        self.assertEqual(len(cache.entries(FIELD_CACHE_NAMESPACE)), 2)
+
+        # with an in-memory cache, as in a search, new fields are only written by save_fields
+        field_optimization_fr(12.0, 5.0, prop_bound, ng_zones=ng_zones, field_cache=field_cache)
+        self.assertEqual(len(cache.entries(FIELD_CACHE_NAMESPACE)), 2)
+        save_fields(field_cache)
+        self.assertEqual(len(cache.entries(FIELD_CACHE_NAMESPACE)), 3)
+
+    def test_peak_duration_reuse(self):
+        set_cache_directory(self.tmp_dir.name)
+        self.addCleanup(set_cache_directory, None)
+        self.addCleanup(HybridLoad._peak_duration_memo.clear)
+        HybridLoad._peak_duration_memo.clear()
+        cache = get_cache()
+
+        pipe = Pipe(Pipe.place_pipes(0.02, 0.02108, 1), 0.01702, 0.02108, 0.01856, 1.0e-6, 0.4, 1542000.0)
+        borehole = GHEBorehole(100.0, 2.0, 0.075, 0.0, 0.0)
+        bhe = SingleUTube(
+            0.5, GHEFluid("Water", 0.0), borehole, pipe, Grout(2.0, 2000000.0), Soil(2.0, 3901000.0, 20.0)
+        )
+        radial_numerical = RadialNumericalBH(bhe)
+        radial_numerical.calc_sts_g_functions(bhe)
+        loads = self.get_atlanta_loads()
+
+        computed = HybridLoad(loads, bhe, radial_numerical, SimulationParameters(1, 12, 35.0, 5.0, 135.0, 60.0))
+        self.assertEqual(len(cache.entries(PEAK_DURATION_CACHE_NAMESPACE)), 1)
+
+        # the analysis does not depend on the simulation period, and an empty in-memory cache picks it up from disk
+        HybridLoad._peak_duration_memo.clear()
+        cached = HybridLoad(loads, bhe, radial_numerical, SimulationParameters(1, 24, 35.0, 5.0, 135.0, 60.0))
+        self.assertEqual(computed.monthly_peak_cl_duration[:13], cached.monthly_peak_cl_duration[:13])
+        self.assertEqual(computed.monthly_peak_hl_duration[:13], cached.monthly_peak_hl_duration[:13])
+        self.assertEqual(computed.two_day_fluid_temps_cl_pk, cached.two_day_fluid_temps_cl_pk)
+        self.assertEqual(len(cache.entries(PEAK_DURATION_CACHE_NAMESPACE)), 1)
+
+        HybridLoad([0.5 * x for x in loads], bhe, radial_numerical, SimulationParameters(1, 12, 35.0, 5.0, 135.0, 60.0))
+        self.assertEqual(len(cache.entries(PEAK_DURATION_CACHE_NAMESPACE)), 2)
@@ -1,6 +1,15 @@
 import unittest
 
-from ghedesigner.coordinates import open_rectangle, rectangle
+import numpy as np
+
+from ghedesigner.coordinates import (
+    coordinates_hash,
+    l_shape,
+    open_rectangle,
+    rectangle,
+    transpose_coordinates,
+    zoned_rectangle,
+)
 
 
 class TestCoordinates(unittest.TestCase):
@@ -20,5 +29,31 @@ class TestCoordinates(unittest.TestCase):
         self.assertEqual(coords[-1][0], 3)
         self.assertEqual(coords[-1][1], 3)
 
+    def test_arrays(self):
+        coords = rectangle(3, 2, 5, 4.5, origin=(1, 1))
+        self.assertEqual(coords.dtype, np.float64)
+        self.assertEqual(coords.tolist(), [[1, 1], [1, 5.5], [6, 1], [6, 5.5], [11, 1], [11, 5.5]])
+        self.assertEqual(open_rectangle(3, 4, 1, 1).tolist()[3:7], [[0, 1], [2, 1], [0, 2], [2, 2]])
+        self.assertEqual(l_shape(3, 2, 1, 1).tolist(), [[0, 0], [1, 0], [2, 0], [0, 1]])
+        self.assertEqual(zoned_rectangle(5, 5, 1, 1, 1, 1).shape, (17, 2))
+        self.assertEqual(rectangle(0, 3, 1, 1).shape, (0, 2))
+
+    def test_transpose_coordinates(self):
+        coords = rectangle(3, 2, 5, 4.5)
+        transposed = transpose_coordinates(coords)
+        self.assertTrue(np.shares_memory(coords, transposed))
+        self.assertEqual(transposed.tolist(), [[y, x] for x, y in coords.tolist()])
+        self.assertEqual(transpose_coordinates([(1, 2), (3, 4)]).tolist(), [[2, 1], [4, 3]])
+
+    def test_coordinates_hash(self):
+        coords = rectangle(3, 2, 5, 4.5)
+        self.assertEqual(coordinates_hash(coords), coordinates_hash(coords.tolist()))
+        self.assertEqual(
+            coordinates_hash(coords), coordinates_hash(transpose_coordinates(transpose_coordinates(coords)))
+        )
+        self.assertEqual(coordinates_hash([(0.0, 1.0)]), coordinates_hash([(-0.0, 1)]))
+        self.assertNotEqual(coordinates_hash(coords), coordinates_hash(transpose_coordinates(coords)))
+        self.assertNotEqual(coordinates_hash(coords), coordinates_hash(coords[:-1]))
+
     # def test_c_shape(self):
     #     coords = c_shape(6, 6, 1, 1, 6)
@@ -0,0 +1,67 @@
+import pickle
+import unittest
+
+from ghedesigner.coordinates import rectangle
+from ghedesigner.domains import (
+    LazyDomain,
+    bi_rectangle_zoned_nested,
+    build_field,
+    field_sizes,
+    polygonal_land_constraint,
+    square_and_near_square,
+)
+
+
+class TestDomains(unittest.TestCase):
+    def test_lazy_domain(self):
+        domain, descriptors = square_and_near_square(1, 5, 5.0)
+        self.assertIsInstance(domain, LazyDomain)
+        self.assertEqual(len(domain), 10)
+        self.assertEqual(descriptors[3], "2X3")
+        self.assertEqual(domain[3].tolist(), rectangle(2, 3, 5.0, 5.0).tolist())
+        self.assertEqual(domain[-1].tolist(), rectangle(5, 6, 5.0, 5.0).tolist())
+        self.assertIs(domain[3], domain[3])
+        self.assertEqual([len(coordinates) for coordinates in domain[8:]], [25, 30])
+        self.assertEqual(field_sizes(domain), [len(coordinates) for coordinates in domain])
+
+        # only the most recently accessed fields are kept, and they are not pickled
+        domain = LazyDomain(build_field, [(rectangle, (i, i, 1.0, 1.0)) for i in range(1, 6)], max_cached_fields=2)
+        for i in range(5):
+            self.assertEqual(len(domain[i]), (i + 1) ** 2)
+        self.assertEqual(list(domain._fields), [3, 4])
+        copied = pickle.loads(pickle.dumps(domain))  # noqa: S301
+        self.assertEqual(len(copied._fields), 0)
+        self.assertEqual([c.tolist() for c in copied], [c.tolist() for c in domain])
+        self.assertEqual(field_sizes(copied), [1, 4, 9, 16, 25])
+
+    def test_zoned_domain_sizes(self):
+        domains, descriptors = bi_rectangle_zoned_nested(40.0, 60.0, 5.0, 10.0, 10.0)
+        domain = domains[0]
+        self.assertEqual(len(domain), len(descriptors[0]))
+        self.assertIsNone(domain.sizes)
+        self.assertEqual(field_sizes(domain), [len(domain[i]) for i in range(len(domain))])
+
+    def test_polygonal_land_constraint(self):
+        property_boundary = [[0.0, 0.0], [85.0, 0.0], [85.0, 80.0], [40.0, 80.0], [40.0, 36.0], [0.0, 36.0]]
+        no_go_boundaries = [[[10.0, 5.0], [30.0, 5.0], [30.0, 25.0], [10.0, 25.0]]]
+        # the swapped coordinates give a property that is taller than it is wide, with transposed fields
+        for boundaries in (
+            ([property_boundary], no_go_boundaries),
+            (
+                [[[y, x] for x, y in property_boundary]],
+                [[[y, x] for x, y in no_go_boundaries[0]]],
+            ),
+        ):
+            domains, descriptors = polygonal_land_constraint(4.0, 8.0, 10.0, *boundaries, keep_contour=[False, True])
+            for domain, domain_descriptors in zip(domains, descriptors):
+                # the sizes are counted without building the fields
+                self.assertEqual(len(domain._fields), 0)
+                sizes = field_sizes(domain)
+                self.assertEqual(sizes, [len(coordinates) for coordinates in domain])
+                self.assertEqual(sizes, sorted(sizes))
+                self.assertGreater(min(sizes), 0)
+                # each descriptor belongs to its field, even when fields without boreholes were dropped
+                self.assertEqual(len(domain_descriptors), len(domain))
+                for size, descriptor in zip(sizes, domain_descriptors):
+                    n_1, n_2 = descriptor.split("_")[0].split("X")
+                    self.assertLessEqual(size, int(n_1) * int(n_2))
@@ -88,6 +88,40 @@ class TestFindBiRectangleConstrainedDesign(GHEBaseTest):
         nbh = ghe.results.borehole_location_data_rows  # includes a header row
         self.assertEqual(75, len(nbh))
 
+    def test_single_u_tube_parallel_search(self):
+        searches = []
+        for workers in (1, 2):
+            ghe = GHEManager()
+            ghe.set_single_u_tube_pipe(
+                inner_diameter=0.03404,
+                outer_diameter=0.04216,
+                shank_spacing=0.01856,
+                roughness=1.0e-6,
+                conductivity=0.4,
+                rho_cp=1542000.0,
+            )
+            ghe.set_soil(conductivity=2.0, rho_cp=2343493.0, undisturbed_temp=18.3)
+            ghe.set_grout(conductivity=1.0, rho_cp=3901000.0)
+            ghe.set_fluid()
+            ghe.set_borehole(height=96.0, buried_depth=2.0, diameter=0.140)
+            ghe.set_simulation_parameters(
+                num_months=240, max_eft=35, min_eft=5, max_height=135, min_height=60, workers=workers
+            )
+            ghe.set_ground_loads_from_hourly_list(self.get_atlanta_loads())
+            ghe.set_geometry_constraints_bi_rectangle_constrained(
+                b_min=5.0, b_max_x=25.0, b_max_y=25.0, property_boundary=prop_boundary, no_go_boundaries=no_go_zones
+            )
+            ghe.set_design(flow_rate=0.5, flow_type_str="borehole")
+            ghe.find_design()
+            searches.append(ghe._search)
+
+        # the nested domains are searched concurrently, with the same selection and height as a serial search
+        serial, parallel = searches
+        self.assertEqual(74, len(parallel.selected_coordinates))
+        self.assertEqual(serial.selected_coordinates.tolist(), parallel.selected_coordinates.tolist())
+        self.assertEqual(serial.ghe.bhe.b.H, parallel.ghe.bhe.b.H)
+        self.assertAlmostEqual(133.4, parallel.ghe.bhe.b.H, delta=0.1)
+
     def test_single_u_tube_multiple_bf_outlines(self):
         ghe = GHEManager()
         ghe.set_single_u_tube_pipe(
@@ -46,6 +46,52 @@ class TestFindNearSquareDesign(GHEBaseTest):
         nbh = ghe.results.borehole_location_data_rows  # includes a header row
         self.assertEqual(157, len(nbh))
 
+        # fields evaluated during the search are not simulated again
+        search = ghe._search
+        self.assertEqual(len(search.excess_memo), len(search.searchTracker))
+        field_specifier, t_excess, _, _ = search.searchTracker[-1]
+        idx = search.fieldDescriptors.index(field_specifier)
+        num_memo_entries = len(search.excess_memo)
+        t_excess_again = search.calculate_excess(
+            search.coordinates_domain[idx], search.sim_params.max_height, field_specifier=field_specifier
+        )
+        self.assertEqual(t_excess, t_excess_again)
+        self.assertEqual(num_memo_entries, len(search.excess_memo))
+
+    def test_find_single_u_tube_design_parallel_search(self):
+        ghe = GHEManager()
+        ghe.set_single_u_tube_pipe(
+            inner_diameter=0.03404,
+            outer_diameter=0.04216,
+            shank_spacing=0.01856,
+            roughness=1.0e-6,
+            conductivity=0.4,
+            rho_cp=1542000.0,
+        )
+        ghe.set_soil(conductivity=2.0, rho_cp=2343493.0, undisturbed_temp=18.3)
+        ghe.set_grout(conductivity=1.0, rho_cp=3901000.0)
+        ghe.set_fluid()
+        ghe.set_borehole(height=96.0, buried_depth=2.0, diameter=0.140)
+        ghe.set_simulation_parameters(num_months=240, max_eft=35, min_eft=5, max_height=135, min_height=60, workers=3)
+        ghe.set_ground_loads_from_hourly_list(self.get_atlanta_loads())
+
+        b = 5.0
+        number_of_boreholes = 32
+        length = length_of_side(number_of_boreholes, b)
+        ghe.set_geometry_constraints_near_square(b=b, length=length)
+        ghe.set_design(flow_rate=0.3, flow_type_str="borehole")
+        ghe.find_design()
+
+        # speculative evaluations do not change the path of the search, nor the selected design
+        search = ghe._search
+        self.assertGreater(len(search.excess_memo), len(search.searchTracker))
+        self.assertEqual(
+            ["1X1", "1X1", "32X33", "17X17", "9X9", "13X13", "11X11", "12X12", "12X13", "4X4"],
+            [x[0] for x in search.searchTracker],
+        )
+        self.assertEqual(len(search.selected_coordinates), 156)
+        self.assertAlmostEqual(125.0, search.ghe.bhe.b.H, delta=0.1)
+
     def test_find_double_u_tube_parallel_design(self):
         ghe = GHEManager()
         ghe.set_double_u_tube_pipe_parallel(
@@ -1,4 +1,14 @@
+import numpy as np
+from scipy.interpolate import interp1d
+
+from ghedesigner.borehole import GHEBorehole
+from ghedesigner.borehole_heat_exchangers import SingleUTube
+from ghedesigner.constants import HRS_IN_DAY
+from ghedesigner.ground_loads import HybridLoad, first_month_hour, last_month_hour, month_hour_bounds
 from ghedesigner.manager import GHEManager
+from ghedesigner.media import GHEFluid, Grout, Pipe, Soil
+from ghedesigner.radial_numerical_borehole import RadialNumericalBH
+from ghedesigner.simulation import SimulationParameters
 from ghedesigner.tests.test_base_case import GHEBaseTest
 
 
@@ -104,3 +114,68 @@ class TestLoads(GHEBaseTest):
         self.assertAlmostEqual(126.99, u_tube_height, delta=0.1)
         nbh = ghe.results.borehole_location_data_rows  # includes a header row
         self.assertEqual(9, len(nbh))
+
+    def test_split_heat_and_cool(self):
+        rejection, extraction = HybridLoad.split_heat_and_cool([2000, -500.0, 0.0, -0.0, 1])
+        self.assertEqual(rejection.tolist(), [0.0, 0.5, 0.0, 0.0, 0.0])
+        self.assertEqual(extraction.tolist(), [2.0, 0.0, 0.0, 0.0, 0.001])
+
+    def test_month_hour_bounds(self):
+        for years in ([2019], [2020], [2019, 2020, 2021, 2022]):
+            num_months = 480 if len(years) == 1 else 12 * len(years)
+            first_hours, last_hours = month_hour_bounds(num_months, years)
+            for month in range(1, num_months + 1):
+                self.assertEqual(first_hours[month], first_month_hour(month, years))
+                self.assertEqual(last_hours[month], last_month_hour(month, years))
+
+    def test_hourly_response_matrix(self):
+        log_time = np.linspace(-12.0, 0.0, 25)
+        g_sts = interp1d(log_time, 1.0 + 0.3 * log_time + 0.01 * log_time**2, fill_value="extrapolate")
+        hour_time = np.arange(49)
+        q = np.random.default_rng(0).normal(0.0, 1000.0, len(hour_time))
+        q[0] = 0.0
+        args = (g_sts, 0.15, 2.0 * np.pi * 2.5, 3.0e9)
+        response = HybridLoad.hourly_response_matrix(hour_time, *args)
+        expected = HybridLoad.simulate_hourly(hour_time, q, *args)
+        self.assertTrue(np.allclose(response @ q, expected, rtol=1e-12, atol=1e-9))
+
+    def test_split_loads_by_month_leap_year(self):
+        # 8760 hourly loads in a leap year leave December 24 hours short
+        loads = self.get_atlanta_loads()
+        pipe = Pipe(Pipe.place_pipes(0.02, 0.02108, 1), 0.01702, 0.02108, 0.01856, 1.0e-6, 0.4, 1542000.0)
+        borehole = GHEBorehole(100.0, 2.0, 0.075, 0.0, 0.0)
+        bhe = SingleUTube(
+            0.5, GHEFluid("Water", 0.0), borehole, pipe, Grout(2.0, 2000000.0), Soil(2.0, 3901000.0, 20.0)
+        )
+        radial_numerical = RadialNumericalBH(bhe)
+        radial_numerical.calc_sts_g_functions(bhe)
+        sim_params = SimulationParameters(1, 12, 35.0, 5.0, 135.0, 60.0)
+        hybrid_load = HybridLoad(loads, bhe, radial_numerical, sim_params, years=[2020])
+
+        # month by month, as the loads were split before they were laid out in an array
+        first_hour = 0
+        for month in range(1, 13):
+            last_hour = first_hour + HRS_IN_DAY * hybrid_load.days_in_month[month]
+            for hourly_loads, total, peak, avg, peak_day in (
+                (
+                    hybrid_load.hourly_rejection_loads,
+                    hybrid_load.monthly_cl,
+                    hybrid_load.monthly_peak_cl,
+                    hybrid_load.monthly_avg_cl,
+                    hybrid_load.monthly_peak_cl_day,
+                ),
+                (
+                    hybrid_load.hourly_extraction_loads,
+                    hybrid_load.monthly_hl,
+                    hybrid_load.monthly_peak_hl,
+                    hybrid_load.monthly_avg_hl,
+                    hybrid_load.monthly_peak_hl_day,
+                ),
+            ):
+                month_loads = hourly_loads[first_hour:last_hour].tolist()
+                self.assertEqual(total[month], sum(month_loads))
+                self.assertEqual(peak[month], max(month_loads))
+                self.assertEqual(avg[month], sum(month_loads) / len(month_loads))
+                self.assertEqual(peak_day[month], month_loads.index(max(month_loads)) // HRS_IN_DAY)
+            first_hour = last_hour
+        self.assertEqual(len(hybrid_load.hourly_rejection_loads), first_hour - HRS_IN_DAY)
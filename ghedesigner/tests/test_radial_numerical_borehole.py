@@ -2,12 +2,14 @@ import unittest
 
 from ghedesigner.borehole import GHEBorehole
 from ghedesigner.borehole_heat_exchangers import SingleUTube
+from ghedesigner.enums import STSSolverType
 from ghedesigner.media import GHEFluid, Grout, Pipe, Soil
 from ghedesigner.radial_numerical_borehole import RadialNumericalBH
 
 
 class TestRadialNumericalBorehole(unittest.TestCase):
-    def test_calc_sts_g_functions(self):
+    @staticmethod
+    def get_single_u_tube():
         fluid = GHEFluid(fluid_str='WATER', percent=0)
         borehole = GHEBorehole(height=100.0, buried_depth=2.0, radius=0.075, x=0.0, y=0.0)
         grout = Grout(k=2.0, rho_cp=2000000.0)
@@ -22,7 +24,10 @@ class TestRadialNumericalBorehole(unittest.TestCase):
         pipe = Pipe(pipe_positions, r_in, r_out, shank_spacing, roughness, k_pipe, rho_cp_pipe)
         soil = Soil(k=2.0, rho_cp=3901000, ugt=20)
         m_dot_bh = 0.5
-        bh = SingleUTube(m_dot_bh, fluid, borehole, pipe, grout, soil)
+        return SingleUTube(m_dot_bh, fluid, borehole, pipe, grout, soil)
+
+    def test_calc_sts_g_functions(self):
+        bh = self.get_single_u_tube()
         rn_bh = RadialNumericalBH(bh)
         rn_bh.calc_sts_g_functions(bh)
 
@@ -30,3 +35,16 @@ class TestRadialNumericalBorehole(unittest.TestCase):
         self.assertAlmostEqual(2.217, rn_bh.g[-1], delta=0.001)
         self.assertAlmostEqual(0.0, rn_bh.g_bhw[0], delta=0.001)
         self.assertAlmostEqual(2.094, rn_bh.g_bhw[-1], delta=0.001)
+
+    def test_modal_solver_matches_marching(self):
+        bh = self.get_single_u_tube()
+        marching = RadialNumericalBH(bh)
+        marching.calc_sts_g_functions(bh)
+        modal = RadialNumericalBH(bh, solver=STSSolverType.MODAL)
+        modal.calc_sts_g_functions(bh)
+
+        self.assertEqual(marching.lntts.tolist(), modal.lntts.tolist())
+        for g_marching, g_modal in zip(marching.g, modal.g):
+            self.assertAlmostEqual(g_marching, g_modal, delta=1e-6)
+        for g_marching, g_modal in zip(marching.g_bhw, modal.g_bhw):
+            self.assertAlmostEqual(g_marching, g_modal, delta=1e-6)
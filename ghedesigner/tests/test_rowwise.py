@@ -3,7 +3,19 @@ from math import pi
 import numpy as np
 import pandas as pd
 
-from ghedesigner.rowwise import field_optimization_fr, field_optimization_wp_space_fr, gen_borehole_config, gen_shape
+from ghedesigner.cache import worker_pool
+from ghedesigner.enums import RotationSearchType
+from ghedesigner.rowwise import (
+    coarse_to_fine_indices,
+    field_optimization_fr,
+    field_optimization_wp_space_fr,
+    find_duplicates,
+    gen_borehole_config,
+    gen_shape,
+    remove_duplicates,
+    remove_points_close_too_line,
+)
+from ghedesigner.shape import vector_intersect
 from ghedesigner.tests.test_base_case import GHEBaseTest
 
 
@@ -181,3 +193,193 @@ class TestRowWise(GHEBaseTest):
         reference_values = self.reference_values["test_perimeter_spacing_lengths"].to_list()
         for rv, nbh in zip(reference_values, num_bhs):
             self.assertAlmostEqual(rv, nbh, delta=0.001)
+
+    def test_parallel_rotation_sweep(self):
+        serial = field_optimization_fr(
+            self.target_spacing_start,
+            self.rotation_step,
+            self.property,
+            ng_zones=self.buildings,
+            rotate_start=self.rotation_start,
+            rotate_stop=self.rotation_stop,
+        )
+        parallel = field_optimization_fr(
+            self.target_spacing_start,
+            self.rotation_step,
+            self.property,
+            ng_zones=self.buildings,
+            rotate_start=self.rotation_start,
+            rotate_stop=self.rotation_stop,
+            workers=2,
+        )
+        self.assertEqual(serial[1], parallel[1])
+        self.assertTrue(np.array_equal(serial[0], parallel[0]))
+
+        serial = field_optimization_wp_space_fr(
+            self.perimeter_spacing_ratio,
+            self.target_spacing_start,
+            self.rotation_step,
+            self.property,
+            ng_zones=self.buildings,
+            rotate_start=self.rotation_start,
+            rotate_stop=self.rotation_stop,
+        )
+        parallel = field_optimization_wp_space_fr(
+            self.perimeter_spacing_ratio,
+            self.target_spacing_start,
+            self.rotation_step,
+            self.property,
+            ng_zones=self.buildings,
+            rotate_start=self.rotation_start,
+            rotate_stop=self.rotation_stop,
+            workers=2,
+        )
+        self.assertEqual(serial[1], parallel[1])
+        self.assertTrue(np.array_equal(serial[0], parallel[0]))
+
+        # one pool shared by several fields, as in a search
+        with worker_pool(2) as executor:
+            for target_spacing in (self.target_spacing_start, self.target_spacing_start + 1.0):
+                shared = field_optimization_fr(
+                    target_spacing,
+                    self.rotation_step,
+                    self.property,
+                    ng_zones=self.buildings,
+                    rotate_start=self.rotation_start,
+                    rotate_stop=self.rotation_stop,
+                    workers=2,
+                    executor=executor,
+                )
+                serial = field_optimization_fr(
+                    target_spacing,
+                    self.rotation_step,
+                    self.property,
+                    ng_zones=self.buildings,
+                    rotate_start=self.rotation_start,
+                    rotate_stop=self.rotation_stop,
+                )
+                self.assertEqual(serial[1], shared[1])
+                self.assertTrue(np.array_equal(serial[0], shared[0]))
+
+    def test_coarse_to_fine_indices(self):
+        # single peak: refinement has to land on it while visiting a fraction of the rotations
+        num_rotations = 180
+        evaluated = []
+
+        def evaluate(indices):
+            evaluated.extend(indices)
+            return [100 - abs(idx - 117) for idx in indices]
+
+        counts = coarse_to_fine_indices(num_rotations, evaluate)
+        self.assertEqual(len(evaluated), len(set(evaluated)))
+        self.assertIn(117, counts)
+        self.assertLess(len(counts), num_rotations // 4)
+
+    def test_coarse_to_fine_rotation_search(self):
+        exhaustive = field_optimization_fr(
+            self.target_spacing_start,
+            self.rotation_step,
+            self.property,
+            ng_zones=self.buildings,
+            rotate_start=self.rotation_start,
+            rotate_stop=self.rotation_stop,
+        )
+        coarse_to_fine = field_optimization_fr(
+            self.target_spacing_start,
+            self.rotation_step,
+            self.property,
+            ng_zones=self.buildings,
+            rotate_start=self.rotation_start,
+            rotate_stop=self.rotation_stop,
+            rotate_search=RotationSearchType.COARSETOFINE,
+        )
+        self.assertEqual(len(exhaustive[0]), len(coarse_to_fine[0]))
+        self.assertEqual("S_10.0_rt87.0", coarse_to_fine[1])
+
+        coarse_to_fine_parallel = field_optimization_fr(
+            self.target_spacing_start,
+            self.rotation_step,
+            self.property,
+            ng_zones=self.buildings,
+            rotate_start=self.rotation_start,
+            rotate_stop=self.rotation_stop,
+            rotate_search=RotationSearchType.COARSETOFINE,
+            workers=2,
+        )
+        self.assertEqual(coarse_to_fine[1], coarse_to_fine_parallel[1])
+        self.assertTrue(np.array_equal(coarse_to_fine[0], coarse_to_fine_parallel[0]))
+
+    def test_field_cache(self):
+        field_cache = {}
+        computed = field_optimization_wp_space_fr(
+            self.perimeter_spacing_ratio,
+            self.target_spacing_start,
+            self.rotation_step,
+            self.property,
+            ng_zones=self.buildings,
+            rotate_start=self.rotation_start,
+            rotate_stop=self.rotation_stop,
+            field_cache=field_cache,
+        )
+        self.assertEqual(len(field_cache), 1)
+
+        # the cached field is handed out as a copy
+        computed[0][0] = [-1.0, -1.0]
+        cached = field_optimization_wp_space_fr(
+            self.perimeter_spacing_ratio,
+            self.target_spacing_start,
+            self.rotation_step,
+            self.property,
+            ng_zones=self.buildings,
+            rotate_start=self.rotation_start,
+            rotate_stop=self.rotation_stop,
+            field_cache=field_cache,
+        )
+        reference = field_optimization_wp_space_fr(
+            self.perimeter_spacing_ratio,
+            self.target_spacing_start,
+            self.rotation_step,
+            self.property,
+            ng_zones=self.buildings,
+            rotate_start=self.rotation_start,
+            rotate_stop=self.rotation_stop,
+        )
+        self.assertEqual(len(field_cache), 1)
+        self.assertEqual(reference[1], cached[1])
+        self.assertTrue(np.array_equal(reference[0], cached[0]))
+
+    def test_lines_intersect(self):
+        # bulk intersections have to match intersecting each edge with vector_intersect one at a time
+        tol = 1e-5
+        lines = [
+            [60.0, 30.0, 110.0, 130.0],
+            [60.0, 55.0, 110.0, 50.0],
+            [20.0, 40.0, 60.0, 40.0],
+            [45.0, 0.0, 45.0, 1000.0],
+            [12.5, 33.3, 1012.5, -210.7],
+        ]
+        bulk = self.property.lines_intersect(lines, rotate=0.3, intersection_tolerance=tol)
+        c = self.property.c
+        for line, inters in zip(lines, bulk):
+            expected = []
+            for c1, c2 in zip(c, np.roll(c, -1, axis=0)):
+                r = vector_intersect([c1[0], c1[1], c2[0], c2[1]], line, tol)
+                if len(r) != 1:
+                    continue
+                rx, ry = r[0]
+                if min(c1[0], c2[0]) - tol <= rx <= max(c1[0], c2[0]) + tol and (
+                    min(c1[1], c2[1]) - tol <= ry <= max(c1[1], c2[1]) + tol
+                ):
+                    expected.append([rx, ry])
+            self.assertEqual(sorted(map(tuple, expected)), sorted(map(tuple, inters)))
+
+    def test_remove_duplicates(self):
+        field = [[0.0, 0.0], [10.0, 0.0], [10.5, 0.0], [20.0, 0.0], [0.2, 0.3], [10.0, 0.4], [30.0, 0.0]]
+        self.assertEqual(find_duplicates(field, 10.0), [(0, 4), (1, 2), (1, 5), (2, 5)])
+        self.assertEqual(remove_duplicates(field, 10.0), [[0.0, 0.0], [10.0, 0.0], [20.0, 0.0], [30.0, 0.0]])
+        self.assertEqual(remove_duplicates([], 10.0), [])
+
+    def test_remove_points_close_to_line(self):
+        holes = [[5.0, 1.0], [5.0, 6.0], [-3.0, 0.0], [-6.0, 0.0], [14.0, 4.0], [5.0, -2.0]]
+        remove_points_close_too_line([0.0, 0.0], [10.0, 0.0], holes, 5.0)
+        self.assertEqual(holes, [[5.0, 6.0], [-6.0, 0.0], [14.0, 4.0]])
@@ -1,7 +1,8 @@
 from math import sqrt
 from unittest import TestCase
 
-from ghedesigner.shape import point_polygon_check
+from ghedesigner.feature_recognition import remove_cutout
+from ghedesigner.shape import point_polygon_check, points_polygon_check
 
 
 class TestShapes(TestCase):
@@ -61,3 +62,45 @@ class TestShapes(TestCase):
         # below
         point = (-2, 2)
         self.assertEqual(point_polygon_check(l_shape, point), OUTSIDE)
+
+    def test_points_polygon_check(self):
+        hegaxon = [(2, 0), (1, sqrt(3)), (-1, sqrt(3)), (-2, 0), (-1, -sqrt(3)), (1, -sqrt(3))]
+        l_shape = [(0, 0), (4, 0), (4, 4), (3, 4), (3, 1), (0, 1)]
+        contours = [hegaxon, l_shape]
+
+        # grid through the vertices and along the edges of both shapes
+        points = [(x / 2, y / 2) for x in range(-6, 11) for y in range(-6, 11)]
+        points += [(0, sqrt(3)), (1, -sqrt(3)), (-1.5, sqrt(3) / 2)]
+
+        results = points_polygon_check(contours, points)
+        self.assertEqual(results.shape, (2, len(points)))
+        for contour, contour_results in zip(contours, results):
+            self.assertEqual(contour_results.tolist(), [point_polygon_check(contour, point) for point in points])
+
+    def test_remove_cutout(self):
+        l_shape = [(0, 0), (4, 0), (4, 4), (3, 4), (3, 1), (0, 1)]
+        points = [(0.5, 0.5), (2, 0), (2, 2), (3.5, 3), (5, 5)]
+        self.assertEqual(remove_cutout(points, l_shape), [(2, 0), (2, 2), (5, 5)])
+        self.assertEqual(remove_cutout(points, l_shape, keep_contour=False), [(2, 2), (5, 5)])
+        self.assertEqual(remove_cutout(points, l_shape, remove_inside=False), [(0.5, 0.5), (2, 0), (3.5, 3)])
+        self.assertEqual(
+            remove_cutout(points, l_shape, remove_inside=False, keep_contour=False), [(0.5, 0.5), (3.5, 3)]
+        )
+
+    def test_remove_cutout_cache(self):
+        l_shape = [(0, 0), (4, 0), (4, 4), (3, 4), (3, 1), (0, 1)]
+        fields = [[(x / 2, y / 2) for x in range(n) for y in range(n)] for n in range(1, 12)]
+        cache = {}
+        for field in fields:
+            for remove_inside in (True, False):
+                self.assertEqual(
+                    remove_cutout(field, l_shape, remove_inside=remove_inside, cache=cache),
+                    remove_cutout(field, l_shape, remove_inside=remove_inside),
+                )
+
+        # every distinct point is classified once, and a point computed differently still hits the cache
+        ((keys, results),) = cache.values()
+        self.assertEqual(len(keys), 11 * 11)
+        self.assertEqual(results.shape, (1, 11 * 11))
+        self.assertEqual(remove_cutout([(0.1 * 3 * 5, 0.5)], l_shape, cache=cache), [])
+        self.assertEqual(len(next(iter(cache.values()))[0]), 11 * 11)
@@ -1,5 +1,8 @@
+import numpy as np
+
 from ghedesigner.borehole import GHEBorehole
 from ghedesigner.borehole_heat_exchangers import CoaxialPipe, MultipleUTube, SingleUTube
+from ghedesigner.constants import TWO_PI
 from ghedesigner.coordinates import rectangle
 from ghedesigner.enums import BHPipeType, TimestepType
 from ghedesigner.gfunction import calc_g_func_for_multiple_lengths
@@ -265,3 +268,252 @@ class TestGHE(GHEBaseTest):
 
         self.assertEqual(156, ghe.nbh)
         self.assertAlmostEqual(114.2, ghe.bhe.b.H, delta=0.1)
+
+    def test_parallel_g_functions(self):
+        args = (
+            self.B,
+            self.H_values,
+            self.dia / 2.0,
+            self.bh_depth,
+            self.m_flow_borehole,
+            BHPipeType.SINGLEUTUBE,
+            self.log_time,
+            rectangle(3, 3, self.B, self.B),
+            self.fluid,
+            self.pipe_s,
+            self.grout,
+            self.soil,
+        )
+
+        g_serial = calc_g_func_for_multiple_lengths(*args)
+        g_parallel = calc_g_func_for_multiple_lengths(*args, workers=3)
+
+        self.assertEqual(g_serial.heights.tolist(), g_parallel.heights.tolist())
+        self.assertEqual(g_serial.g_lts.tolist(), g_parallel.g_lts.tolist())
+        self.assertEqual(g_serial.r_b_values, g_parallel.r_b_values)
+        self.assertEqual(g_serial.D_values, g_parallel.D_values)
+
+    def test_short_time_step_memo(self):
+        borehole = GHEBorehole(self.H, self.D, self.dia / 2.0, x=0.0, y=0.0)
+        coordinates = rectangle(3, 3, self.B, self.B)
+        g_function = calc_g_func_for_multiple_lengths(
+            self.B,
+            self.H_values,
+            self.dia / 2.0,
+            self.bh_depth,
+            self.m_flow_borehole,
+            BHPipeType.DOUBLEUTUBEPARALLEL,
+            self.log_time,
+            coordinates,
+            self.fluid,
+            self.pipe_d,
+            self.grout,
+            self.soil,
+        )
+        ghe = GHE(
+            self.m_flow_borehole / self.fluid.rho * 1000.0 * len(coordinates),
+            self.B,
+            BHPipeType.DOUBLEUTUBEPARALLEL,
+            self.fluid,
+            borehole,
+            self.pipe_d,
+            self.grout,
+            self.soil,
+            g_function,
+            self.sim_params,
+            self.hourly_extraction_ground_loads,
+        )
+
+        eft_100 = ghe.simulate(method=TimestepType.HYBRID)
+        bhe_eq_100 = ghe.bhe_eq
+        radial_numerical_100 = ghe.radial_numerical
+
+        ghe.bhe.b.H = 150.0
+        eft_150 = ghe.simulate(method=TimestepType.HYBRID)
+        self.assertIsNot(bhe_eq_100, ghe.bhe_eq)
+        self.assertAlmostEqual(150.0, ghe.bhe_eq.b.H)
+        self.assertNotAlmostEqual(eft_100[0], eft_150[0])
+
+        # returning to a previously seen height reuses the stored models
+        ghe.bhe.b.H = self.H
+        self.assertEqual(eft_100, ghe.simulate(method=TimestepType.HYBRID))
+        self.assertIs(bhe_eq_100, ghe.bhe_eq)
+        self.assertIs(radial_numerical_100, ghe.radial_numerical)
+
+    def test_hourly_convolution(self):
+        borehole = GHEBorehole(self.H, self.D, self.dia / 2.0, x=0.0, y=0.0)
+        coordinates = rectangle(3, 3, self.B, self.B)
+        g_function = calc_g_func_for_multiple_lengths(
+            self.B,
+            self.H_values,
+            self.dia / 2.0,
+            self.bh_depth,
+            self.m_flow_borehole,
+            BHPipeType.SINGLEUTUBE,
+            self.log_time,
+            coordinates,
+            self.fluid,
+            self.pipe_s,
+            self.grout,
+            self.soil,
+        )
+        ghe = GHE(
+            self.m_flow_borehole / self.fluid.rho * 1000.0 * len(coordinates),
+            self.B,
+            BHPipeType.SINGLEUTUBE,
+            self.fluid,
+            borehole,
+            self.pipe_s,
+            self.grout,
+            self.soil,
+            g_function,
+            self.sim_params,
+            self.hourly_extraction_ground_loads,
+        )
+
+        ghe.simulate(method=TimestepType.HOURLY)
+        self.assertEqual(len(ghe.hp_eft), 20 * 8760)
+
+        # the direct superposition sum over the first weeks gives the same borehole wall temperatures
+        n = 1000
+        g, _ = ghe.grab_g_function(self.B / self.H)
+        q_dot_b_dt = np.diff(np.hstack((0.0, ghe.loading[:n] / ghe.nbh))) / self.H / (TWO_PI * self.soil.k)
+        time_values = np.hstack((0.0, ghe.times[:n]))
+        d_tb = ghe._superpose(q_dot_b_dt, time_values, g, ghe.radial_numerical.t_s)
+        for d_tb_direct, d_tb_fft in zip(d_tb, ghe.dTb[:n]):
+            self.assertAlmostEqual(d_tb_direct, d_tb_fft, delta=1e-9)
+
+    def test_aggregated_hourly(self):
+        borehole = GHEBorehole(self.H, self.D, self.dia / 2.0, x=0.0, y=0.0)
+        g_function = calc_g_func_for_multiple_lengths(
+            self.B,
+            self.H_values,
+            self.dia / 2.0,
+            self.bh_depth,
+            self.m_flow_borehole,
+            BHPipeType.SINGLEUTUBE,
+            self.log_time,
+            self.coordinates,
+            self.fluid,
+            self.pipe_s,
+            self.grout,
+            self.soil,
+        )
+        ghe = GHE(
+            self.V_flow_system,
+            self.B,
+            BHPipeType.SINGLEUTUBE,
+            self.fluid,
+            borehole,
+            self.pipe_s,
+            self.grout,
+            self.soil,
+            g_function,
+            self.sim_params,
+            self.hourly_extraction_ground_loads,
+        )
+
+        max_hp_eft, min_hp_eft = ghe.simulate(method=TimestepType.HOURLY)
+        hp_eft = np.array(ghe.hp_eft)
+
+        max_hp_eft_agg, min_hp_eft_agg = ghe.simulate(method=TimestepType.AGGREGATEDHOURLY)
+        hp_eft_agg = np.array(ghe.hp_eft)
+
+        self.assertEqual(hp_eft.size, hp_eft_agg.size)
+        max_error = np.abs(hp_eft - hp_eft_agg).max()
+        self.assertLess(max_error, 0.1)
+        self.assertLess(max_error, ghe.aggregation_error_bound)
+        self.assertAlmostEqual(max_hp_eft, max_hp_eft_agg, delta=0.05)
+        self.assertAlmostEqual(min_hp_eft, min_hp_eft_agg, delta=0.05)
+
+    def test_shared_hybrid_load(self):
+        borehole = GHEBorehole(self.H, self.D, self.dia / 2.0, x=0.0, y=0.0)
+        coordinates = rectangle(3, 3, self.B, self.B)
+        g_function = calc_g_func_for_multiple_lengths(
+            self.B,
+            self.H_values,
+            self.dia / 2.0,
+            self.bh_depth,
+            self.m_flow_borehole,
+            BHPipeType.SINGLEUTUBE,
+            self.log_time,
+            coordinates,
+            self.fluid,
+            self.pipe_s,
+            self.grout,
+            self.soil,
+        )
+
+        hybrid_load_cache = {}
+
+        def make_ghe(v_flow_system):
+            return GHE(
+                v_flow_system,
+                self.B,
+                BHPipeType.SINGLEUTUBE,
+                self.fluid,
+                borehole,
+                self.pipe_s,
+                self.grout,
+                self.soil,
+                g_function,
+                self.sim_params,
+                self.hourly_extraction_ground_loads,
+                hybrid_load_cache=hybrid_load_cache,
+            )
+
+        v_flow_system = self.m_flow_borehole / self.fluid.rho * 1000.0 * len(coordinates)
+        ghe_1 = make_ghe(v_flow_system)
+        ghe_2 = make_ghe(v_flow_system)
+        self.assertIs(ghe_1.hybrid_load, ghe_2.hybrid_load)
+
+        # a different flow rate per borehole changes the borehole model
+        ghe_3 = make_ghe(2.0 * v_flow_system)
+        self.assertIsNot(ghe_1.hybrid_load, ghe_3.hybrid_load)
+        self.assertEqual(len(hybrid_load_cache), 2)
+
+    def small_field_ghe(self):
+        borehole = GHEBorehole(self.H, self.D, self.dia / 2.0, x=0.0, y=0.0)
+        coordinates = rectangle(3, 3, self.B, self.B)
+        g_function = calc_g_func_for_multiple_lengths(
+            self.B,
+            self.H_values,
+            self.dia / 2.0,
+            self.bh_depth,
+            self.m_flow_borehole,
+            BHPipeType.SINGLEUTUBE,
+            self.log_time,
+            coordinates,
+            self.fluid,
+            self.pipe_s,
+            self.grout,
+            self.soil,
+        )
+        return GHE(
+            self.m_flow_borehole / self.fluid.rho * 1000.0 * len(coordinates),
+            self.B,
+            BHPipeType.SINGLEUTUBE,
+            self.fluid,
+            borehole,
+            self.pipe_s,
+            self.grout,
+            self.soil,
+            g_function,
+            self.sim_params,
+            [0.08 * load for load in self.hourly_extraction_ground_loads],
+        )
+
+    def test_size_from_prior(self):
+        ghe = self.small_field_ghe()
+        ghe.size(method=TimestepType.HYBRID)
+        sized_height, slope = ghe.sizing_state
+        self.assertEqual(sized_height, ghe.bhe.b.H)
+        self.assertLess(slope, 0.0)
+
+        # a prior solution away from the root, as that of a neighbouring field
+        ghe.size(method=TimestepType.HYBRID, prior=(sized_height + 10.0, 0.8 * slope))
+        self.assertAlmostEqual(sized_height, ghe.bhe.b.H, delta=1.0e-3)
+        # a prior beyond the maximum height is cut to it
+        ghe.size(method=TimestepType.HYBRID, prior=(1000.0, slope))
+        self.assertAlmostEqual(sized_height, ghe.bhe.b.H, delta=1.0e-3)
+        self.assertIsNotNone(ghe.sizing_state)